@@ -0,0 +1,111 @@
+import importlib
+import threading
+import time
+
+
+# Se toma al importar este módulo; main.py lo importa antes que cualquier otro
+INICIO_PROCESO = time.perf_counter()
+
+
+# ==========================================
+#      IMPORTACIONES DIFERIDAS
+# ==========================================
+
+class _ModuloDiferido:
+    """
+    Sustituto de un módulo que solo se importa la primera vez que se usa uno de
+    sus atributos. Permite escribir `firestore.Increment(...)` o `fv.Video(...)`
+    como siempre sin pagar la importación (gRPC, protobuf, mpv...) al arrancar.
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = _sustitutos.get(nombre)
+        self.ms_import = None  # Lo que tardó la importación real, al cargarse
+        self._lock = threading.Lock()
+        _diferidos.append(self)
+
+    def _cargar(self):
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    inicio = time.perf_counter()
+                    self._modulo = _sustitutos.get(self._nombre) or importlib.import_module(self._nombre)
+                    self.ms_import = (time.perf_counter() - inicio) * 1000
+                    reporte = _reporte_activo
+                    if reporte is not None:
+                        reporte.diferidos.append((self._nombre, self.ms_import))
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "sin cargar"
+        return f"<módulo diferido '{self._nombre}' ({estado})>"
+
+
+_sustitutos = {}  # nombre -> módulo que lo reemplaza (ver sustituir_modulo)
+_diferidos = []
+
+
+def modulo_diferido(nombre):
+    return _ModuloDiferido(nombre)
+
+
+def sustituir_modulo(nombre, modulo):
+    """
+    Hace que todos los módulos diferidos `nombre` (los ya creados y los que se
+    creen) usen `modulo`. Lo usa el Firestore en memoria del benchmark para
+    correr sin firebase_admin ni credenciales.
+    """
+    _sustitutos[nombre] = modulo
+    for diferido in _diferidos:
+        if diferido._nombre == nombre:
+            diferido._modulo = modulo
+
+
+# ==========================================
+#      REPORTE DE TIEMPOS DE ARRANQUE
+# ==========================================
+
+_reporte_activo = None  # El ReporteArranque en curso; recibe los imports diferidos
+
+
+class ReporteArranque:
+    """
+    Mide las fases de arranque de main() (import, init y primer page.add) para
+    el caso de arranque elegido, e imprime el resumen al terminar. Los módulos
+    diferidos que se importen mientras está activo salen aparte en el resumen.
+    """
+
+    def __init__(self, caso):
+        global _reporte_activo
+        self.caso = caso
+        self.fases = []
+        self.diferidos = []  # (módulo, ms) importados durante el arranque
+        self._ultimo = time.perf_counter()
+        self._inicio_main = self._ultimo
+        _reporte_activo = self
+
+    def marcar(self, fase):
+        ahora = time.perf_counter()
+        self.fases.append((fase, (ahora - self._ultimo) * 1000))
+        self._ultimo = ahora
+
+    def resumen(self):
+        total_main = (self._ultimo - self._inicio_main) * 1000
+        desde_proceso = (self._ultimo - INICIO_PROCESO) * 1000
+        fases = ", ".join(f"{fase}={ms:.0f} ms" for fase, ms in self.fases)
+        resumen = (f"ARRANQUE [{self.caso}] {fases} | main={total_main:.0f} ms | "
+                   f"desde el proceso={desde_proceso:.0f} ms")
+        if self.diferidos:
+            resumen += " | diferidos: " + ", ".join(f"{nombre}={ms:.0f} ms" for nombre, ms in self.diferidos)
+        return resumen
+
+    def imprimir(self):
+        """Imprime el resumen y cierra el reporte: los imports posteriores ya no cuentan."""
+        global _reporte_activo
+        if _reporte_activo is self:
+            _reporte_activo = None
+        print(f"INFO: {self.resumen()}")
@@ -0,0 +1,429 @@
+import asyncio
+import os
+import threading
+
+from src.arranque import modulo_diferido
+from src.database import consultas
+from src.database.database import _inicializar_firebase, firestore, get_database_helper
+from src.database.metricas import medir_metodos
+from src.database.presupuesto import si_agotado
+
+firestore_async = modulo_diferido("firebase_admin.firestore_async")
+
+
+# --- CLIENTE ASÍNCRONO COMPARTIDO ---
+# El AsyncClient usa grpc.aio y queda ligado al event loop donde se crea; Flet
+# ejecuta todos los handlers async del proceso en un mismo loop, así que basta
+# con una instancia.
+
+_lock = threading.Lock()
+_shared_async_helper = None
+
+
+def get_async_database_helper():
+    """Devuelve el helper asíncrono compartido (Firestore o SQLite según el backend)."""
+    global _shared_async_helper
+    if _shared_async_helper is None:
+        with _lock:
+            if _shared_async_helper is None:
+                backend = os.environ.get("RUTA_LINCE_BACKEND", "firestore").strip().lower()
+                if backend == "sqlite":
+                    _shared_async_helper = AsyncBackendAdapter(get_database_helper())
+                else:
+                    _shared_async_helper = AsyncDatabaseHelper()
+    return _shared_async_helper
+
+
+async def close_async_database():
+    global _shared_async_helper
+    with _lock:
+        helper, _shared_async_helper = _shared_async_helper, None
+    if helper is not None:
+        await helper.close()
+
+
+def cerrar_async_database():
+    """Hook de apagado para código síncrono (main.py), cuando el loop de Flet ya terminó."""
+    if _shared_async_helper is None:
+        return
+    try:
+        asyncio.run(close_async_database())
+    except Exception as e:
+        print(f"ERROR al cerrar el cliente asíncrono de Firestore: {e}")
+
+
+class AsyncBackendAdapter:
+    """
+    Expone cualquier StorageBackend síncrono (por ejemplo SQLiteHelper) con la
+    misma interfaz que AsyncDatabaseHelper, ejecutando cada llamada en un hilo.
+    """
+
+    def __init__(self, helper):
+        self._helper = helper
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self._helper, nombre)
+        if not callable(metodo):
+            return metodo
+
+        async def llamada(*args, **kwargs):
+            return await asyncio.to_thread(metodo, *args, **kwargs)
+
+        return llamada
+
+    async def close(self):
+        # El helper síncrono es compartido; lo cierra close_database()
+        pass
+
+
+@medir_metodos
+class AsyncDatabaseHelper:
+    """
+    Versión asíncrona de DatabaseHelper sobre firestore.AsyncClient, con los
+    mismos métodos y los mismos registros de salida. Permite, por ejemplo:
+
+        campus, carrera = await asyncio.gather(
+            db.get_campus_by_id(id_campus), db.get_carrera_by_id(id_carrera))
+
+    Las consultas y los mapeos son los de consultas.py. Del helper síncrono se
+    toman la caché (con sus listeners on_snapshot), los paquetes offline, los
+    fragmentos y la cola diferida de contadores, para que exista un solo
+    camino de escritura y una sola copia del catálogo.
+    """
+
+    def __init__(self, client=None, helper=None):
+        if client is None:
+            _inicializar_firebase()
+            client = firestore_async.client()
+        self.db = client
+        self.helper = helper if helper is not None else get_database_helper()
+        self.cache = self.helper.cache
+
+    async def close(self):
+        # El helper síncrono (y su caché) los cierra close_database()
+        cerrar = getattr(self.db, 'close', None)
+        if cerrar is not None:
+            resultado = cerrar()
+            if asyncio.iscoroutine(resultado):
+                await resultado
+
+    def _desde_offline(self, metodo, *args):
+        return self.helper._desde_offline(metodo, *args)
+
+    @staticmethod
+    async def _lista(query):
+        return [doc async for doc in query.stream()]
+
+    async def _get_all(self, coleccion, ids, campos):
+        return [doc async for doc in self.db.get_all(consultas.refs(self.db, coleccion, ids), field_paths=campos)]
+
+    async def _muestra_aleatoria(self, query, k, clave=None):
+        # Misma estrategia que DatabaseHelper, ejecutando cada paso con await
+        pasos = consultas.muestra_aleatoria(query, k, clave)
+        try:
+            query = next(pasos)
+            while True:
+                query = pasos.send(await self._lista(query))
+        except StopIteration as fin:
+            return fin.value
+
+    # ==========================================
+    #      MÉTODOS DE LECTURA (GET)
+    # ==========================================
+
+    async def get_campus(self):
+        async def cargar():
+            return [consultas.mapear_campus(doc) for doc in await self._lista(consultas.q_campus_activos(self.db))]
+
+        return await self.cache.get_or_load_async('campus', 'activos', cargar)
+
+    async def get_campus_by_id(self, id_campus):
+        async def cargar():
+            return consultas.mapear_campus(await self.db.collection('campus').document(id_campus).get())
+
+        return await self.cache.get_or_load_async('campus', id_campus, cargar)
+
+    async def get_carrera(self):
+        return [consultas.mapear_carrera_completa(doc) for doc in await self._lista(self.db.collection('carreras'))]
+
+    async def get_carrera_by_id(self, id_carrera):
+        offline = self._desde_offline('get_carrera_by_id', id_carrera)
+        if offline is not None:
+            return offline
+
+        async def cargar():
+            return consultas.mapear_carrera(await self.db.collection('carreras').document(id_carrera).get())
+
+        return await self.cache.get_or_load_async('carreras', id_carrera, cargar)
+
+    async def get_carreras_por_id_campus(self, id_campus):
+        async def cargar():
+            ids_carreras = consultas.ids_carreras(await self._lista(consultas.q_carrera_campus(self.db, id_campus)))
+            if not ids_carreras:
+                return []
+            docs = await self._get_all('carreras', ids_carreras, ['nombre'])
+            return consultas.carreras_en_orden(ids_carreras, docs)
+
+        return await self.cache.get_or_load_async('carrera_campus', id_campus, cargar)
+
+    async def get_nombres_carrera_por_id_campus(self, id_campus):
+        return [nombre for _, nombre in await self.get_carreras_por_id_campus(id_campus)]
+
+    async def get_id_carrera_by_nombre(self, nombre_carrera):
+        for doc in await self._lista(consultas.q_carrera_por_nombre(self.db, nombre_carrera)):
+            return doc.id
+        return None
+
+    async def get_areas_id_carrera(self, id_carrera):
+        offline = self._desde_offline('get_areas_id_carrera', id_carrera)
+        if offline is not None:
+            return offline
+
+        async def cargar():
+            docs = await self._lista(consultas.q_areas_carrera(self.db, id_carrera))
+            return [consultas.mapear_area(doc) for doc in docs]
+
+        return await self.cache.get_or_load_async('areas', ('carrera', id_carrera), cargar)
+
+    async def get_nombres_areas_por_ids(self, ids_areas):
+        ids_unicos = list(dict.fromkeys(i for i in ids_areas if i))
+        if not ids_unicos:
+            return {}
+        offline = self._desde_offline('get_nombres_areas_por_ids', ids_unicos)
+        if offline is not None:
+            return offline
+
+        nombres = {}
+        faltantes = []
+        for id_area in ids_unicos:
+            nombre = self.cache.get('areas', ('nombre', id_area))
+            if isinstance(nombre, str):
+                nombres[id_area] = nombre
+            else:
+                faltantes.append(id_area)
+        if not faltantes:
+            return nombres
+
+        for doc in await self._get_all('areas', faltantes, ['nombre']):
+            if doc.exists:
+                nombres[doc.id] = doc.to_dict().get('nombre')
+                self.cache.set('areas', ('nombre', doc.id), nombres[doc.id])
+        return nombres
+
+    async def get_tema_by_id(self, id_tema):
+        offline = self._desde_offline('get_tema_by_id', id_tema)
+        if offline is not None:
+            return offline
+
+        async def cargar():
+            return consultas.mapear_tema(await self.db.collection('temas').document(id_tema).get())
+
+        return await self.cache.get_or_load_async('temas', id_tema, cargar)
+
+    # --- VIDEOS ---
+
+    async def get_videos_by_id_area(self, id_area):
+        videos = self._desde_offline('get_videos_by_id_area', id_area)
+        if videos is None:
+            async def cargar():
+                docs = await self._lista(consultas.q_videos_area(self.db, id_area))
+                cargados = [consultas.mapear_video(doc) for doc in docs]
+                self.cache.set('contadores', ('area', id_area), consultas.contadores_de_videos(cargados))
+                return cargados
+
+            videos = await self.cache.get_or_load_async('videos', ('area', id_area), cargar)
+        # Contadores al día con el helper síncrono (misma caché de 'contadores')
+        return await asyncio.to_thread(self.helper._aplicar_contadores, id_area, videos)
+
+    @si_agotado()
+    async def get_video_by_id(self, video_id):
+        doc = await self.db.collection('videos').document(video_id).get()
+        if not doc.exists:
+            return None
+        video = consultas.mapear_video(doc)
+        await self._aplicar_fragmentos([video])
+
+        # Lo que sigue en la cola diferida, para que el usuario vea su propio clic
+        if self.helper.contadores is not None:
+            for campo, delta in self.helper.contadores.pendientes(video_id).items():
+                video[campo] = video[campo] + delta
+        return consultas.mapear_contadores(video)
+
+    async def _aplicar_fragmentos(self, videos):
+        # Los fragmentos se suman con el helper síncrono (su total queda en caché)
+        fragmentos = self.helper.fragmentos
+        if fragmentos is not None and videos:
+            await asyncio.to_thread(fragmentos.aplicar, videos)
+            for video in videos:
+                consultas.mapear_contadores(video)
+        return videos
+
+    # --- PREGUNTAS ---
+
+    @si_agotado(list)
+    async def get_preguntas_por_id_video(self, video_id):
+        offline = self._desde_offline('get_preguntas_por_id_video', video_id)
+        if offline is not None:
+            return offline
+        docs = await self._lista(consultas.q_preguntas_video(self.db, video_id))
+        return [consultas.mapear_pregunta(doc) for doc in docs]
+
+    @si_agotado(list)
+    async def get_preguntas_por_id_area_activo(self, id_area, con_comentarios=True):
+        offline = self._desde_offline('get_preguntas_por_id_area_activo', id_area)
+        if offline is not None:
+            return offline
+        docs = await self._lista(consultas.q_preguntas_area(self.db, id_area, con_comentarios))
+        return [consultas.mapear_pregunta(doc) for doc in docs]
+
+    @si_agotado(list)
+    async def get_preguntas_aleatorias(self, id_area, k, con_comentarios=False):
+        offline = self._desde_offline('get_preguntas_aleatorias', id_area, k)
+        if offline is not None:
+            return offline
+        docs = await self._muestra_aleatoria(consultas.q_preguntas_area(self.db, id_area, con_comentarios), k,
+                                             ('preguntas', id_area, con_comentarios))
+        return [consultas.mapear_pregunta(doc) for doc in docs]
+
+    @si_agotado(dict)
+    async def get_comentarios_preguntas(self, ids_preguntas):
+        ids_unicos = list(dict.fromkeys(i for i in ids_preguntas if i))
+        if not ids_unicos:
+            return {}
+        offline = self._desde_offline('get_comentarios_preguntas', ids_unicos)
+        if offline is not None:
+            return offline
+        return consultas.comentarios_por_pregunta(await self._get_all('preguntas', ids_unicos, ['comentarios']))
+
+    # --- REACCIONES Y COMENTARIOS ---
+
+    @si_agotado()
+    async def get_user_reaction_for_video(self, video_id, user_id):
+        for doc in await self._lista(consultas.q_reacciones_usuario(self.db, video_id, user_id).limit(1)):
+            return doc.to_dict().get('tipo')
+        return None
+
+    @si_agotado(list)
+    async def get_comments_by_id_video(self, video_id):
+        docs = await self._lista(consultas.q_comentarios_video(self.db, video_id))
+        return [consultas.mapear_comentario(doc) for doc in docs]
+
+    @si_agotado(lambda: ([], None))
+    async def get_comments_page(self, video_id, limite=20, cursor=None):
+        query = consultas.q_comentarios_video(self.db, video_id)
+        if cursor is not None:
+            query = query.start_after(cursor)
+        return consultas.pagina_comentarios(await self._lista(query.limit(limite + 1)), limite)
+
+    # --- JUEGOS Y SIMULADORES ---
+
+    async def _juegos_por_carrera(self, coleccion, tipo, id_carrera):
+        offline = self._desde_offline('get_juegos_por_carrera', coleccion, tipo, id_carrera)
+        if offline is not None:
+            return offline
+
+        async def cargar():
+            docs = await self._lista(consultas.q_juegos_carrera(self.db, coleccion, id_carrera))
+            juegos = [consultas.mapear_juego(doc, tipo) for doc in docs]
+            nombres = await self.get_nombres_areas_por_ids(j.id_area for j in juegos)
+            for juego in juegos:
+                juego.nombre_area = nombres.get(juego.id_area, "N/A")
+            return juegos
+
+        # Misma entrada de caché que DatabaseHelper
+        return await self.cache.get_or_load_async(coleccion, id_carrera, cargar)
+
+    async def get_sopas_con_area_by_id_carrera(self, id_carrera):
+        return await self._juegos_por_carrera('sopa', 'sopa', id_carrera)
+
+    async def get_crucigramas_con_area_by_id_carrera(self, id_carrera):
+        return await self._juegos_por_carrera('crucigrama', 'crucigrama', id_carrera)
+
+    async def get_simuladores_con_area_by_id_carrera(self, id_carrera):
+        return await self._juegos_por_carrera('simuladores', 'simulador', id_carrera)
+
+    @si_agotado(list)
+    async def get_palabras_por_sopa(self, id_sopa):
+        offline = self._desde_offline('get_palabras_por_sopa', id_sopa)
+        if offline is not None:
+            return offline
+        return [doc.to_dict().get('palabra') for doc in await self._lista(consultas.q_palabras_sopa(self.db, id_sopa))]
+
+    async def palabra_crucigrama(self, id_crucigrama):
+        offline = self._desde_offline('palabra_crucigrama', id_crucigrama)
+        if offline is not None:
+            return offline
+        docs = await self._muestra_aleatoria(consultas.q_palabras_crucigrama(self.db, id_crucigrama), 1,
+                                             ('palabras', id_crucigrama))
+        return consultas.mapear_palabra_crucigrama(docs)
+
+    # ==========================================
+    #      MÉTODOS DE ESCRITURA (INSERT/UPDATE)
+    # ==========================================
+
+    async def insert_reaction(self, reaction_id, video_id, user_id, tipo):
+        await self.db.collection('reacciones').document(reaction_id).set(
+            consultas.datos_reaccion(video_id, user_id, tipo))
+        if tipo in ('like', 'dislike'):
+            self.helper._incrementar_contador(video_id, consultas.campo_reaccion(tipo), 1)
+
+    async def delete_reaction(self, video_id, user_id):
+        for doc in await self._lista(consultas.q_reacciones_usuario(self.db, video_id, user_id)):
+            tipo = doc.to_dict().get('tipo')
+            await doc.reference.delete()
+            campo = "cantidad_likes" if tipo == "like" else "cantidad_dislikes"
+            self.helper._incrementar_contador(video_id, campo, -1)
+
+    async def toggle_reaction(self, video_id, user_id, tipo):
+        reaccion_ref = self.db.collection('reacciones').document(consultas.id_reaccion(video_id, user_id))
+        legado_query = consultas.q_reacciones_usuario(self.db, video_id, user_id).limit(1)
+        fragmentos = self.helper.fragmentos
+
+        @firestore.async_transactional
+        async def aplicar(transaction):
+            snap = await reaccion_ref.get(transaction=transaction)
+            anterior_ref, anterior = None, None
+            if snap.exists:
+                anterior_ref, anterior = reaccion_ref, snap.to_dict().get('tipo')
+            else:
+                async for doc in legado_query.stream(transaction=transaction):
+                    anterior_ref, anterior = doc.reference, doc.to_dict().get('tipo')
+            return consultas.escribir_reaccion(transaction, self.db, reaccion_ref, anterior_ref, anterior,
+                                               video_id, user_id, tipo, fragmentos)
+
+        nuevo, deltas = await aplicar(self.db.transaction())
+        if fragmentos is not None and deltas:
+            fragmentos.registrar_local(video_id, deltas)
+        return nuevo
+
+    async def incrementar_visualizacion(self, id_video):
+        self.helper.incrementar_visualizacion(id_video)
+
+    async def update_video_counter(self, video_id, field, delta):
+        self.helper.update_video_counter(video_id, field, delta)
+
+    async def add_comment(self, comment_id, video_id, user_id, comment_text):
+        await self.db.collection('comentarios').document(comment_id).set(
+            consultas.datos_comentario(video_id, user_id, comment_text))
+
+    async def insert_or_update_usuario(self, id_usuario, id_campus, id_carrera):
+        await self.db.collection('usuarios').document(id_usuario).set({
+            "id_campus": id_campus,
+            "id_carrera": id_carrera
+        }, merge=True)
+
+    async def guardar_calificacion_por_tema(self, id_usuario, id_tema, calificacion, id_simulador, tiempo,
+                                            id_resultado, fecha):
+        await self.db.collection('resultados').document(id_resultado).set(
+            consultas.datos_resultado(id_usuario, id_tema, calificacion, id_simulador, tiempo, fecha))
+
+    async def guardar_resultados_simulador(self, id_usuario, id_simulador, tiempo, fecha, calificaciones,
+                                           resumen=None):
+        batch = self.db.batch()
+        id_intento = consultas.lote_resultados(self.db, batch, id_usuario, id_simulador, tiempo, fecha,
+                                               calificaciones, resumen)
+        await batch.commit()
+        return id_intento
+
+    async def refrescar_carrera(self, id_carrera):
+        return self.helper.refrescar_carrera(id_carrera)
@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+
+
+class StorageBackend(ABC):
+    """
+    Interfaz común de almacenamiento que usan las pantallas.
+
+    DatabaseHelper (Firestore) y SQLiteHelper (local) la implementan y
+    devuelven lo mismo: registros de registros.py (Video, Pregunta, Juego,
+    Comentario) para videos, preguntas, juegos y comentarios, y diccionarios
+    con las claves en mayúscula que espera la UI (ID_Campus, Nombre, ...)
+    para el catálogo. Un backend al que le falte algún método falla al crearse.
+    """
+
+    # ==========================================
+    #      CATÁLOGO
+    # ==========================================
+
+    @abstractmethod
+    def get_campus(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_campus_by_id(self, id_campus):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_carrera(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_carrera_by_id(self, id_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_carreras_por_id_campus(self, id_campus):
+        raise NotImplementedError
+
+    def get_nombres_carrera_por_id_campus(self, id_campus):
+        return [nombre for _, nombre in self.get_carreras_por_id_campus(id_campus)]
+
+    @abstractmethod
+    def get_id_carrera_by_nombre(self, nombre_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_areas_id_carrera(self, id_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_nombres_areas_por_ids(self, ids_areas):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_tema_by_id(self, id_tema):
+        raise NotImplementedError
+
+    # ==========================================
+    #      VIDEOS, PREGUNTAS Y COMENTARIOS
+    # ==========================================
+
+    @abstractmethod
+    def get_videos_by_id_area(self, id_area):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_video_by_id(self, video_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_preguntas_por_id_video(self, video_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_preguntas_por_id_area_activo(self, id_area, con_comentarios=True):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_comentarios_preguntas(self, ids_preguntas):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_preguntas_aleatorias(self, id_area, k, con_comentarios=False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_user_reaction_for_video(self, video_id, user_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_comments_by_id_video(self, video_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_comments_page(self, video_id, limite=20, cursor=None):
+        raise NotImplementedError
+
+    # ==========================================
+    #      JUEGOS Y SIMULADORES
+    # ==========================================
+
+    @abstractmethod
+    def get_sopas_con_area_by_id_carrera(self, id_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_crucigramas_con_area_by_id_carrera(self, id_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_simuladores_con_area_by_id_carrera(self, id_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_palabras_por_sopa(self, id_sopa):
+        raise NotImplementedError
+
+    @abstractmethod
+    def palabra_crucigrama(self, id_crucigrama):
+        raise NotImplementedError
+
+    # ==========================================
+    #      ESCRITURA
+    # ==========================================
+
+    @abstractmethod
+    def insert_reaction(self, reaction_id, video_id, user_id, tipo):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_reaction(self, video_id, user_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def toggle_reaction(self, video_id, user_id, tipo):
+        raise NotImplementedError
+
+    @abstractmethod
+    def incrementar_visualizacion(self, id_video):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_video_counter(self, video_id, field, delta):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_comment(self, comment_id, video_id, user_id, comment_text):
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_or_update_usuario(self, id_usuario, id_campus, id_carrera):
+        raise NotImplementedError
+
+    @abstractmethod
+    def guardar_calificacion_por_tema(self, id_usuario, id_tema, calificacion, id_simulador, tiempo, id_resultado,
+                                      fecha):
+        raise NotImplementedError
+
+    @abstractmethod
+    def guardar_resultados_simulador(self, id_usuario, id_simulador, tiempo, fecha, calificaciones, resumen=None):
+        raise NotImplementedError
+
+    # ==========================================
+    #      SINCRONIZACIÓN
+    # ==========================================
+
+    def refrescar_carrera(self, id_carrera):
+        # Solo los backends con copia local de Firestore tienen algo que refrescar
+        return None
+
+    # ==========================================
+    #      CICLO DE VIDA
+    # ==========================================
+
+    def close(self):
+        pass
@@ -0,0 +1,360 @@
+"""
+Benchmark de la capa de datos contra el Firestore en memoria (firestore_falso).
+
+    python -m src.database.benchmark                          # escalas 10, 100 y 1000
+    python -m src.database.benchmark --escalas 1,10 --latencia 30 --repeticiones 20
+    python -m src.database.benchmark --json benchmark.json    # además guarda los resultados
+
+Siembra el cliente falso con assets/csv (con el mismo mapeo del importador) y
+replica el contenido N veces: temas, videos, preguntas, palabras, juegos y
+comentarios se copian con IDs nuevos dentro de las mismas áreas y carreras,
+así a 100× cada área tiene cien veces los videos y preguntas de hoy. El
+catálogo (campus, carreras, áreas) no se replica.
+
+Se mide cada método del helper y la carga de datos de cada pantalla (las
+mismas llamadas, en el mismo orden que hace la pantalla; si una pantalla
+cambia lo que pide, hay que cambiar su recorrido en PANTALLAS). Cada operación
+corre `repeticiones` veces con la caché vacía y una vez más con la caché llena.
+Se reporta p50/p95 de latencia, documentos leídos y escritos por operación, y
+al final las operaciones cuyas lecturas crecen con el tamaño de los datos. La
+latencia es la de la app más la inyectada; el trabajo propio del falso
+(recorrer candidatos, ordenar) se descuenta.
+
+Con --latencia 0 el tiempo es solo CPU de la app (mapeo, caché, registros);
+para acercarse a producción, usar la latencia de un viaje real (30-80 ms).
+A 1000× el proceso usa unos 350 MB.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import time
+import types
+import uuid
+
+from src.database.firestore_falso import ClienteFalso, usar_firestore_falso
+from src.database.importador import CSV_DIR, _aleatorio_estable
+
+
+ESCALAS = (10, 100, 1000)
+
+# Colecciones que se replican y sus campos que apuntan a otra colección replicada
+REPLICADAS = {
+    'temas': (),
+    'videos': (),
+    'preguntas': ('id_video', 'id_tema'),
+    'simuladores': (),
+    'sopa': (),
+    'crucigrama': (),
+    'palabras': ('id_sopa', 'id_crucigrama'),
+    'comentarios': ('id_video',),
+}
+
+ID_USUARIO = 'benchmark-usuario'
+
+
+# ==========================================
+#      DATOS SEMBRADOS
+# ==========================================
+
+def sembrar(escala, csv_dir=CSV_DIR, latencia=0.0):
+    """ClienteFalso con los CSV importados y su contenido replicado `escala` veces."""
+    cliente = usar_firestore_falso(ClienteFalso())
+
+    # El importador escribe como lo haría en Firestore (huella, actualizado_en, aleatorio)
+    from src.database.importador import importar
+    with contextlib.redirect_stdout(io.StringIO()):
+        importar(csv_dir=csv_dir, db=cliente)
+
+    for coleccion, referencias in REPLICADAS.items():
+        originales = list(cliente.datos(coleccion).items())
+        copias = {}
+        for n in range(1, escala):
+            sufijo = f"~{n}"
+            for doc_id, datos in originales:
+                # Copia superficial: los mapas anidados (opciones, comentarios) se comparten
+                copia = dict(datos)
+                for campo in referencias:
+                    if copia.get(campo):
+                        copia[campo] += sufijo
+                if 'aleatorio' in copia:
+                    copia['aleatorio'] = _aleatorio_estable(doc_id + sufijo)
+                copias[doc_id + sufijo] = copia
+        cliente.sembrar(coleccion, copias)
+
+    cliente.latencia = latencia
+    cliente.reiniciar_contadores()
+    return cliente
+
+
+def _activos(cliente, coleccion):
+    return {doc_id: d for doc_id, d in cliente.datos(coleccion).items() if d.get('estado') == 'Activo'}
+
+
+def _mas_frecuente(valores, defecto=None):
+    conteo = {}
+    for valor in valores:
+        if valor:
+            conteo[valor] = conteo.get(valor, 0) + 1
+    return max(conteo, key=conteo.get) if conteo else defecto
+
+
+def elegir_muestra(cliente):
+    """IDs representativos (los de más contenido) leídos directo de los datos, sin cobrar lecturas."""
+    areas = _activos(cliente, 'areas')
+    videos = _activos(cliente, 'videos')
+    preguntas = _activos(cliente, 'preguntas')
+    palabras = _activos(cliente, 'palabras')
+
+    id_area = _mas_frecuente(v.get('id_area') for v in videos.values() if v.get('id_area') in areas)
+    id_carrera = areas.get(id_area, {}).get('id_carrera')
+    id_campus = _mas_frecuente(d.get('id_campus') for d in cliente.datos('carrera_campus').values()
+                               if d.get('id_carrera') == id_carrera)
+
+    simuladores = [(doc_id, d) for doc_id, d in _activos(cliente, 'simuladores').items()
+                   if d.get('id_carrera') == id_carrera]
+    id_simulador, simulador = min(simuladores, default=(None, {}))
+    id_area_simulador = simulador.get('id_area') or _mas_frecuente(p.get('id_area') for p in preguntas.values())
+
+    return types.SimpleNamespace(
+        id_campus=id_campus,
+        id_carrera=id_carrera,
+        id_area=id_area,
+        id_video=_mas_frecuente(p.get('id_video') for p in preguntas.values() if p.get('id_video') in videos)
+        or next((i for i, v in videos.items() if v.get('id_area') == id_area), None),
+        id_tema=_mas_frecuente(p.get('id_tema') for p in preguntas.values()),
+        id_simulador=id_simulador,
+        id_area_simulador=id_area_simulador,
+        longitud=simulador.get('longitud') or 10,
+        id_sopa=_mas_frecuente(p.get('id_sopa') for p in palabras.values()),
+        id_crucigrama=_mas_frecuente(p.get('id_crucigrama') for p in palabras.values()),
+        id_usuario=ID_USUARIO,
+    )
+
+
+# ==========================================
+#      OPERACIONES
+# ==========================================
+
+def _examen(h, m):
+    # PreguntasScreen: muestra aleatoria, nombres de temas y, al terminar, retroalimentación y resultados
+    preguntas = h.get_preguntas_aleatorias(m.id_area_simulador, int(m.longitud), con_comentarios=False)
+    for id_tema in {p.id_tema for p in preguntas if p.id_tema}:
+        h.get_tema_by_id(id_tema)
+    h.get_comentarios_preguntas(p.id for p in preguntas)
+    h.guardar_resultados_simulador(m.id_usuario, m.id_simulador, 120, '2025-01-01 00:00:00',
+                                   {p.id_tema: 100 for p in preguntas if p.id_tema},
+                                   resumen={"correctas": len(preguntas), "total": len(preguntas)})
+
+
+def _video(h, m):
+    # InicioScreen al abrir un video: la precarga pide lo mismo que los tres widgets
+    from concurrent.futures import wait
+    from src.database.prefetch import VideoPrefetcher
+    prefetcher = VideoPrefetcher(h, m.id_usuario)
+    try:
+        # Como si el usuario tardara en abrir los widgets lo que tarda la precarga
+        wait(prefetcher.precargar([m.id_video]))
+        prefetcher.tomar(m.id_video)
+    finally:
+        prefetcher.close()
+
+
+def _inicio(h, m):
+    h.insert_or_update_usuario(m.id_usuario, m.id_campus, m.id_carrera)
+    areas = h.get_areas_id_carrera(m.id_carrera)
+    if areas:
+        h.get_videos_by_id_area(areas[0]['ID_Area'])
+
+
+def _sopa(h, m):
+    h.get_sopas_con_area_by_id_carrera(m.id_carrera)
+    h.get_palabras_por_sopa(m.id_sopa)
+
+
+def _crucigrama(h, m):
+    h.get_crucigramas_con_area_by_id_carrera(m.id_carrera)
+    h.palabra_crucigrama(m.id_crucigrama)
+
+
+# (nombre, función(helper, muestra)). Las escrituras van al final para no
+# cambiar lo que leen las demás.
+METODOS = (
+    ('get_campus', lambda h, m: h.get_campus()),
+    ('get_campus_by_id', lambda h, m: h.get_campus_by_id(m.id_campus)),
+    ('get_carreras_por_id_campus', lambda h, m: h.get_carreras_por_id_campus(m.id_campus)),
+    ('get_carrera_by_id', lambda h, m: h.get_carrera_by_id(m.id_carrera)),
+    ('get_areas_id_carrera', lambda h, m: h.get_areas_id_carrera(m.id_carrera)),
+    ('get_videos_by_id_area', lambda h, m: h.get_videos_by_id_area(m.id_area)),
+    ('get_video_by_id', lambda h, m: h.get_video_by_id(m.id_video)),
+    ('get_user_reaction_for_video', lambda h, m: h.get_user_reaction_for_video(m.id_video, m.id_usuario)),
+    ('get_preguntas_por_id_video', lambda h, m: h.get_preguntas_por_id_video(m.id_video)),
+    ('get_preguntas_por_id_area_activo', lambda h, m: h.get_preguntas_por_id_area_activo(m.id_area_simulador)),
+    ('get_preguntas_aleatorias', lambda h, m: h.get_preguntas_aleatorias(m.id_area_simulador, int(m.longitud))),
+    ('get_comments_page', lambda h, m: h.get_comments_page(m.id_video)),
+    ('get_comments_by_id_video', lambda h, m: h.get_comments_by_id_video(m.id_video)),
+    ('get_tema_by_id', lambda h, m: h.get_tema_by_id(m.id_tema)),
+    ('get_simuladores_con_area_by_id_carrera', lambda h, m: h.get_simuladores_con_area_by_id_carrera(m.id_carrera)),
+    ('get_sopas_con_area_by_id_carrera', lambda h, m: h.get_sopas_con_area_by_id_carrera(m.id_carrera)),
+    ('get_crucigramas_con_area_by_id_carrera', lambda h, m: h.get_crucigramas_con_area_by_id_carrera(m.id_carrera)),
+    ('get_palabras_por_sopa', lambda h, m: h.get_palabras_por_sopa(m.id_sopa)),
+    ('palabra_crucigrama', lambda h, m: h.palabra_crucigrama(m.id_crucigrama)),
+    ('insert_or_update_usuario', lambda h, m: h.insert_or_update_usuario(m.id_usuario, m.id_campus, m.id_carrera)),
+    ('toggle_reaction', lambda h, m: h.toggle_reaction(m.id_video, m.id_usuario, 'Like')),
+    ('incrementar_visualizacion', lambda h, m: h.incrementar_visualizacion(m.id_video)),
+    ('add_comment', lambda h, m: h.add_comment(uuid.uuid4().hex, m.id_video, m.id_usuario, "Comentario de prueba")),
+)
+
+# Carga de datos de cada pantalla (did_mount y lo que piden sus widgets)
+PANTALLAS = (
+    ('SeleccionCampusScreen', lambda h, m: h.get_campus()),
+    ('SeleccionCarreraScreen', lambda h, m: h.get_carreras_por_id_campus(m.id_campus)),
+    ('InicioScreen', _inicio),
+    ('InicioScreen (video)', _video),
+    ('SimuladorScreen', lambda h, m: h.get_simuladores_con_area_by_id_carrera(m.id_carrera)),
+    ('PreguntasScreen', _examen),
+    ('SeleccionarSopaScreen + SopaDeLetrasScreen', _sopa),
+    ('SeleccionarCrucigramaScreen + CrucigramaScreen', _crucigrama),
+    ('AjustesScreen', lambda h, m: (h.get_campus_by_id(m.id_campus), h.get_carrera_by_id(m.id_carrera))),
+)
+
+
+# ==========================================
+#      MEDICIÓN
+# ==========================================
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def _correr(cliente, helper, funcion, muestra):
+    antes = cliente.contadores()
+    inicio = time.perf_counter()
+    error = None
+    try:
+        funcion(helper, muestra)
+    except Exception as e:
+        error = str(e)
+    despues = cliente.contadores()
+    # Lo que el falso tarda en filtrar y ordenar no cuenta: Firestore lo resuelve con índices
+    ms = (time.perf_counter() - inicio - (despues['tiempo_interno'] - antes['tiempo_interno'])) * 1000
+    return ms, despues['lecturas'] - antes['lecturas'], despues['escrituras'] - antes['escrituras'], error
+
+
+def medir(cliente, helper, muestra, nombre, funcion, repeticiones):
+    tiempos, lecturas, escrituras = [], [], []
+    error = None
+    for _ in range(repeticiones):
+        helper.cache.clear()
+        ms, leidas, escritas, error = _correr(cliente, helper, funcion, muestra)
+        tiempos.append(ms)
+        lecturas.append(leidas)
+        escrituras.append(escritas)
+    ms_caliente, lecturas_caliente, _, _ = _correr(cliente, helper, funcion, muestra)
+    return {
+        "operacion": nombre,
+        "p50_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(_percentil(tiempos, 0.95), 3),
+        "lecturas": round(statistics.mean(lecturas), 1),
+        "escrituras": round(statistics.mean(escrituras), 1),
+        "ms_caliente": round(ms_caliente, 3),
+        "lecturas_caliente": lecturas_caliente,
+        "error": error,
+    }
+
+
+def correr_escala(escala, repeticiones=10, latencia=0.0, csv_dir=CSV_DIR):
+    from src.database.cache import CatalogCache
+    from src.database.database import DatabaseHelper
+
+    inicio = time.perf_counter()
+    cliente = sembrar(escala, csv_dir=csv_dir, latencia=latencia)
+    segundos_siembra = time.perf_counter() - inicio
+    muestra = elegir_muestra(cliente)
+
+    # Sin cola diferida ni fragmentos: cada escritura se ve en la misma operación
+    helper = DatabaseHelper(client=cliente, cache=CatalogCache(), escritura_diferida=False, num_fragmentos=0)
+    resultados = {"escala": escala, "documentos": cliente.total_documentos(),
+                  "siembra_s": round(segundos_siembra, 2), "muestra": vars(muestra),
+                  "metodos": [], "pantallas": []}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for nombre, funcion in METODOS:
+                resultados["metodos"].append(medir(cliente, helper, muestra, nombre, funcion, repeticiones))
+            for nombre, funcion in PANTALLAS:
+                resultados["pantallas"].append(medir(cliente, helper, muestra, nombre, funcion, repeticiones))
+    finally:
+        helper.close()
+    return resultados
+
+
+# ==========================================
+#      REPORTE
+# ==========================================
+
+def imprimir(resultados):
+    print(f"\n=== Escala {resultados['escala']}× — {resultados['documentos']} documentos "
+          f"(sembrado en {resultados['siembra_s']} s) ===")
+    encabezado = f"{'operación':<48} {'p50 ms':>9} {'p95 ms':>9} {'lecturas':>9} {'escrit.':>8} " \
+                 f"{'caliente':>9} {'lect. cal.':>10}"
+    for titulo in ("metodos", "pantallas"):
+        print(f"\n[{titulo}]")
+        print(encabezado)
+        for r in resultados[titulo]:
+            linea = f"{r['operacion']:<48} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['lecturas']:>9} " \
+                    f"{r['escrituras']:>8} {r['ms_caliente']:>9.2f} {r['lecturas_caliente']:>10}"
+            if r['error']:
+                linea += f"  ERROR: {r['error']}"
+            print(linea)
+
+
+def crecimiento(todas):
+    """[(operación, lecturas en la escala menor, lecturas en la mayor)] de lo que no lee una cantidad fija."""
+    if len(todas) < 2:
+        return []
+    primera, ultima = todas[0], todas[-1]
+    resultado = []
+    for titulo in ("metodos", "pantallas"):
+        for antes, despues in zip(primera[titulo], ultima[titulo]):
+            if despues['lecturas'] > 2 * max(antes['lecturas'], 1):
+                resultado.append((antes['operacion'], antes['lecturas'], despues['lecturas']))
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latencia y lecturas por operación contra un Firestore en memoria.")
+    parser.add_argument('--escalas', default=','.join(map(str, ESCALAS)),
+                        help="Multiplicadores del contenido de assets/csv, separados por coma")
+    parser.add_argument('--repeticiones', type=int, default=10, help="Corridas con caché vacía por operación")
+    parser.add_argument('--latencia', type=float, default=0.0, help="Milisegundos por viaje a la base")
+    parser.add_argument('--csv-dir', default=CSV_DIR, help="Carpeta con los CSV y el .xlsx")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla de random (muestras aleatorias)")
+    parser.add_argument('--json', help="Ruta donde guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    random.seed(args.semilla)
+    escalas = [int(e) for e in args.escalas.split(',') if e.strip()]
+    todas = []
+    for escala in escalas:
+        resultados = correr_escala(escala, repeticiones=args.repeticiones, latencia=args.latencia / 1000,
+                                   csv_dir=args.csv_dir)
+        imprimir(resultados)
+        todas.append(resultados)
+
+    for operacion, antes, despues in crecimiento(todas):
+        print(f"ADVERTENCIA: '{operacion}' pasa de {antes} a {despues} lecturas entre "
+              f"{escalas[0]}× y {escalas[-1]}×: lee en proporción a los datos.")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(todas, f, ensure_ascii=False, indent=2, default=str)
+        print(f"INFO: Resultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+"""
+Paquetes de contenido offline por carrera.
+
+    python -m src.database.bundle CA002            # genera assets/bundles/bundle_CA002.json.gz
+    python -m src.database.bundle --todas          # una por cada carrera activa
+
+Un paquete es un JSON comprimido con gzip que guarda, tal como están en
+Firestore, las áreas, temas, videos (metadatos), preguntas, juegos y palabras
+de una carrera. DatabaseHelper lo consulta antes que a Firestore (ver
+ContenidoOffline), así las pantallas de contenido no hacen lecturas de red.
+Reacciones y comentarios siguen siendo en vivo, y los contadores que trae
+cada video se reemplazan al leerlo (DatabaseHelper._aplicar_contadores).
+
+Mientras la app corre, SincronizadorDelta (sincronizacion.py) trae solo lo que
+cambió desde el `actualizado_en` más reciente de cada colección del paquete y
+lo aplica aquí con aplicar_cambios.
+"""
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+
+from src.database.consultas import mapear_comentarios
+from src.database.registros import Juego, Pregunta, Video
+from src.database.sharded_counter import MAX_VALORES_IN
+
+
+# Cambia cuando cambia la estructura del archivo; los paquetes de otro formato se ignoran
+FORMATO_BUNDLE = 1
+
+BUNDLES_DIR = os.environ.get(
+    "RUTA_LINCE_BUNDLES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'assets', 'bundles'))
+
+
+def ruta_bundle(id_carrera, directorio=BUNDLES_DIR):
+    return os.path.join(directorio, f"bundle_{id_carrera}.json.gz")
+
+
+# ==========================================
+#      CONSTRUCCIÓN (lee de Firestore)
+# ==========================================
+
+def _documentos(db, coleccion, campo, valores):
+    """{id: datos} de los documentos con campo IN valores (en bloques de 30)."""
+    valores = [v for v in dict.fromkeys(valores) if v]
+    resultado = {}
+    for inicio in range(0, len(valores), MAX_VALORES_IN):
+        bloque = valores[inicio:inicio + MAX_VALORES_IN]
+        for doc in db.collection(coleccion).where(campo, 'in', bloque).stream():
+            resultado[doc.id] = doc.to_dict()
+    return resultado
+
+
+def _activos(docs):
+    return {doc_id: d for doc_id, d in docs.items() if d.get('estado', 'Activo') == 'Activo'}
+
+
+def _marca_mas_reciente(docs):
+    """El actualizado_en (hora del servidor) más reciente de los documentos, o None."""
+    marcas = []
+    for d in docs.values():
+        try:
+            fecha = datetime.datetime.fromisoformat(str(d.get('actualizado_en')))
+        except ValueError:
+            continue
+        marcas.append((fecha if fecha.tzinfo else fecha.replace(tzinfo=datetime.timezone.utc), d['actualizado_en']))
+    return max(marcas)[1] if marcas else None
+
+
+def construir_bundle(id_carrera, db=None, directorio=BUNDLES_DIR):
+    """Descarga el contenido de una carrera y lo escribe comprimido. Devuelve la ruta."""
+    if db is None:
+        from src.database.database import get_firestore_client
+        db = get_firestore_client()
+
+    # Solo informativo (reloj local): la sincronización parte del actualizado_en de los documentos
+    inicio = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    carrera = db.collection('carreras').document(id_carrera).get()
+    if not carrera.exists:
+        raise ValueError(f"No existe la carrera '{id_carrera}'.")
+
+    areas = _activos(_documentos(db, 'areas', 'id_carrera', [id_carrera]))
+    ids_areas = list(areas)
+    sopas = _activos(_documentos(db, 'sopa', 'id_carrera', [id_carrera]))
+    crucigramas = _activos(_documentos(db, 'crucigrama', 'id_carrera', [id_carrera]))
+
+    palabras = _documentos(db, 'palabras', 'id_sopa', list(sopas))
+    palabras.update(_documentos(db, 'palabras', 'id_crucigrama', list(crucigramas)))
+
+    colecciones = {
+        'carreras': {carrera.id: carrera.to_dict()},
+        'areas': areas,
+        'temas': _documentos(db, 'temas', 'id_area', ids_areas),
+        'videos': _activos(_documentos(db, 'videos', 'id_area', ids_areas)),
+        'preguntas': _activos(_documentos(db, 'preguntas', 'id_area', ids_areas)),
+        'simuladores': _activos(_documentos(db, 'simuladores', 'id_carrera', [id_carrera])),
+        'sopa': sopas,
+        'crucigrama': crucigramas,
+        'palabras': palabras,
+    }
+
+    # Timestamps y demás tipos de Firestore se guardan como texto
+    contenido = json.dumps(colecciones, ensure_ascii=False, sort_keys=True, default=str)
+    paquete = {
+        'formato': FORMATO_BUNDLE,
+        'id_carrera': id_carrera,
+        'version': hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16],
+        'generado_en': inicio,
+        'colecciones': json.loads(contenido),
+    }
+
+    os.makedirs(directorio, exist_ok=True)
+    ruta = ruta_bundle(id_carrera, directorio)
+    temporal = ruta + ".tmp"
+    with gzip.open(temporal, 'wt', encoding='utf-8', compresslevel=9) as f:
+        json.dump(paquete, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporal, ruta)  # Nunca dejamos un paquete a medio escribir
+
+    total = sum(len(docs) for docs in colecciones.values())
+    print(f"Paquete {id_carrera} v{paquete['version']}: {total} documentos, "
+          f"{os.path.getsize(ruta) / 1024:.1f} KB -> {os.path.abspath(ruta)}")
+    return ruta
+
+
+# ==========================================
+#      LECTURA (sirve a DatabaseHelper)
+# ==========================================
+
+class ContenidoOffline:
+    """
+    Índices en memoria de todos los paquetes de un directorio.
+
+    Cada get_* devuelve lo mismo que el método homónimo de DatabaseHelper, o
+    None si el dato no está en ningún paquete (entonces se consulta Firestore).
+    """
+
+    COLECCIONES = ('carreras', 'areas', 'temas', 'videos', 'preguntas',
+                   'simuladores', 'sopa', 'crucigrama', 'palabras')
+
+    def __init__(self, paquetes=()):
+        self._lock = threading.Lock()
+        self.versiones = {}  # id_carrera -> version
+        self.generado_en = {}  # id_carrera -> inicio de la descarga del paquete (ISO, reloj local)
+        self.marcas = {}  # (coleccion, id_carrera) -> última marca sincronizada (ISO)
+        self.marcas_paquete = {}  # (coleccion, id_carrera) -> actualizado_en más reciente del paquete
+
+        # Documentos tal como vienen de Firestore; los índices se derivan de aquí
+        self.documentos = {coleccion: {} for coleccion in self.COLECCIONES}
+        self.carreras = self.documentos['carreras']
+        self.areas = self.documentos['areas']
+        self.temas = self.documentos['temas']
+        self.videos = self.documentos['videos']
+        self.preguntas = self.documentos['preguntas']
+        self.palabras = self.documentos['palabras']
+        self.juegos = {coleccion: self.documentos[coleccion] for coleccion in ('simuladores', 'sopa', 'crucigrama')}
+
+        self.areas_por_carrera = {}
+        self.videos_por_area = {}
+        self.preguntas_por_area = {}
+        self.preguntas_por_video = {}
+        self.juegos_por_carrera = {}  # (coleccion, id_carrera) -> [ids]
+        self.palabras_por_sopa = {}
+        self.palabras_por_crucigrama = {}
+
+        for paquete in paquetes:
+            self.agregar(paquete)
+
+    @classmethod
+    def desde_directorio(cls, directorio=BUNDLES_DIR):
+        """Carga todos los bundle_*.json.gz del directorio; None si no hay ninguno válido."""
+        if not os.path.isdir(directorio):
+            return None
+        paquetes = []
+        for nombre in sorted(os.listdir(directorio)):
+            if not (nombre.startswith("bundle_") and nombre.endswith(".json.gz")):
+                continue
+            ruta = os.path.join(directorio, nombre)
+            try:
+                with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+                    paquete = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"ERROR al leer el paquete {ruta}: {e}")
+                continue
+            if paquete.get('formato') != FORMATO_BUNDLE:
+                print(f"ADVERTENCIA: {nombre} tiene formato {paquete.get('formato')}, se ignora.")
+                continue
+            paquetes.append(paquete)
+        if not paquetes:
+            return None
+        contenido = cls(paquetes)
+        print(f"INFO: Contenido offline cargado: {contenido.versiones}")
+        return contenido
+
+    def agregar(self, paquete):
+        colecciones = paquete['colecciones']
+        id_carrera = paquete['id_carrera']
+        with self._lock:
+            self.versiones[id_carrera] = paquete.get('version')
+            self.generado_en[id_carrera] = paquete.get('generado_en')
+            for coleccion in self.COLECCIONES:
+                docs = colecciones.get(coleccion, {})
+                self.documentos[coleccion].update(docs)
+                self.marcas_paquete[(coleccion, id_carrera)] = _marca_mas_reciente(docs)
+            self._reindexar()
+
+    def _reindexar(self):
+        """
+        Reconstruye los índices desde self.documentos (solo memoria, sin lecturas).
+        Los documentos dados de baja (estado != 'Activo') se quedan en
+        self.documentos pero salen de los índices: así una lectura que tomó el
+        índice anterior todavía encuentra sus documentos.
+        """
+        carreras = set(self.versiones)
+        areas_por_carrera = {id_carrera: [] for id_carrera in carreras}
+        videos_por_area = {}
+        preguntas_por_area = {}
+        for id_area, d in _activos(self.areas).items():
+            if d.get('id_carrera') in areas_por_carrera:
+                areas_por_carrera[d['id_carrera']].append(id_area)
+            videos_por_area[id_area] = []
+            preguntas_por_area[id_area] = []
+
+        preguntas_por_video = {}
+        for id_video, d in _activos(self.videos).items():
+            videos_por_area.setdefault(d.get('id_area'), []).append(id_video)
+            preguntas_por_video[id_video] = []
+
+        for id_pregunta, d in _activos(self.preguntas).items():
+            preguntas_por_area.setdefault(d.get('id_area'), []).append(id_pregunta)
+            if d.get('id_video') in preguntas_por_video:
+                preguntas_por_video[d['id_video']].append(id_pregunta)
+
+        juegos_por_carrera = {(coleccion, id_carrera): [] for coleccion in self.juegos for id_carrera in carreras}
+        for coleccion, docs in self.juegos.items():
+            for id_juego, d in _activos(docs).items():
+                if (coleccion, d.get('id_carrera')) in juegos_por_carrera:
+                    juegos_por_carrera[(coleccion, d['id_carrera'])].append(id_juego)
+
+        palabras_por_sopa = {id_sopa: [] for id_sopa in _activos(self.juegos['sopa'])}
+        palabras_por_crucigrama = {id_crucigrama: [] for id_crucigrama in _activos(self.juegos['crucigrama'])}
+        for id_palabra, d in self.palabras.items():
+            if d.get('id_sopa') in palabras_por_sopa:
+                palabras_por_sopa[d['id_sopa']].append(id_palabra)
+            if d.get('id_crucigrama') in palabras_por_crucigrama:
+                palabras_por_crucigrama[d['id_crucigrama']].append(id_palabra)
+
+        # Se reemplazan de una vez: las lecturas concurrentes ven el índice viejo o el nuevo
+        self.areas_por_carrera = areas_por_carrera
+        self.videos_por_area = videos_por_area
+        self.preguntas_por_area = preguntas_por_area
+        self.preguntas_por_video = preguntas_por_video
+        self.juegos_por_carrera = juegos_por_carrera
+        self.palabras_por_sopa = palabras_por_sopa
+        self.palabras_por_crucigrama = palabras_por_crucigrama
+
+    # --- ALMACÉN PARA LA SINCRONIZACIÓN (ver sincronizacion.py) ---
+
+    def ids_areas(self, id_carrera):
+        return list(self.areas_por_carrera.get(id_carrera, []))
+
+    def leer_marca(self, coleccion, id_carrera):
+        # Sin sincronizaciones previas, el paquete está al día hasta su documento
+        # más reciente. generado_en no sirve: es la hora del equipo que lo generó.
+        return self.marcas.get((coleccion, id_carrera)) or self.marcas_paquete.get((coleccion, id_carrera))
+
+    def guardar_marca(self, coleccion, id_carrera, marca):
+        self.marcas[(coleccion, id_carrera)] = marca
+
+    def aplicar_cambios(self, coleccion, cambios):
+        """cambios: [(doc_id, datos)]. Las bajas llegan como estado != 'Activo'."""
+        documentos = self.documentos.get(coleccion)
+        if documentos is None or not cambios:
+            return
+        with self._lock:
+            documentos.update(cambios)
+            self._reindexar()
+
+    # --- CATÁLOGO ---
+
+    def get_carrera_by_id(self, id_carrera):
+        d = self.carreras.get(id_carrera)
+        return {"ID_Carrera": id_carrera, "Nombre": d.get('nombre')} if d is not None else None
+
+    def get_areas_id_carrera(self, id_carrera):
+        ids = self.areas_por_carrera.get(id_carrera)
+        if ids is None:
+            return None
+        return [{"ID_Area": id_area, "Nombre": self.areas[id_area].get('nombre')} for id_area in ids]
+
+    def get_nombres_areas_por_ids(self, ids_areas):
+        ids = [i for i in dict.fromkeys(ids_areas) if i]
+        if not all(i in self.areas for i in ids):
+            return None
+        return {i: self.areas[i].get('nombre') for i in ids}
+
+    def get_tema_by_id(self, id_tema):
+        d = self.temas.get(id_tema)
+        if d is None:
+            return None
+        tema = dict(d)
+        tema['ID_Tema'] = id_tema
+        tema['Nombre'] = d.get('nombre')
+        return tema
+
+    # --- VIDEOS Y PREGUNTAS ---
+
+    def get_videos_by_id_area(self, id_area):
+        ids = self.videos_por_area.get(id_area)
+        if ids is None:
+            return None
+        return [Video.desde_firestore(id_video, self.videos[id_video]) for id_video in ids]
+
+    def get_preguntas_por_id_video(self, video_id):
+        ids = self.preguntas_por_video.get(video_id)
+        if ids is None:
+            return None
+        return [Pregunta.desde_firestore(i, self.preguntas[i]) for i in ids]
+
+    def get_preguntas_por_id_area_activo(self, id_area):
+        ids = self.preguntas_por_area.get(id_area)
+        if ids is None:
+            return None
+        return [Pregunta.desde_firestore(i, self.preguntas[i]) for i in ids]
+
+    def get_preguntas_aleatorias(self, id_area, k):
+        ids = self.preguntas_por_area.get(id_area)
+        if ids is None:
+            return None
+        elegidas = random.sample(ids, min(max(k, 0), len(ids)))
+        return [Pregunta.desde_firestore(i, self.preguntas[i]) for i in elegidas]
+
+    def get_comentarios_preguntas(self, ids_preguntas):
+        ids = [i for i in dict.fromkeys(ids_preguntas) if i]
+        if not all(i in self.preguntas for i in ids):
+            return None
+        return {i: mapear_comentarios(self.preguntas[i].get('comentarios') or {}) for i in ids}
+
+    # --- JUEGOS ---
+
+    def get_juegos_por_carrera(self, coleccion, tipo, id_carrera):
+        ids = self.juegos_por_carrera.get((coleccion, id_carrera))
+        if ids is None:
+            return None
+        juegos = []
+        for id_juego in ids:
+            juego = Juego.desde_firestore(id_juego, self.juegos[coleccion][id_juego], tipo=tipo)
+            area = self.areas.get(juego.id_area)
+            juego.nombre_area = area.get('nombre') if area else "N/A"
+            juegos.append(juego)
+        return juegos
+
+    def get_palabras_por_sopa(self, id_sopa):
+        ids = self.palabras_por_sopa.get(id_sopa)
+        if ids is None:
+            return None
+        return [self.palabras[i].get('palabra') for i in ids]
+
+    def palabra_crucigrama(self, id_crucigrama):
+        ids = self.palabras_por_crucigrama.get(id_crucigrama)
+        if ids is None:
+            return None
+        activas = [i for i in ids if self.palabras[i].get('estado') == 'Activo']
+        if not activas:
+            return None
+        d = self.palabras[random.choice(activas)]
+        return {'palabra': d.get('palabra'), 'descripcion': d.get('descripcion')}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera paquetes de contenido offline por carrera.")
+    parser.add_argument('carreras', nargs='*', help="IDs de carrera (p. ej. CA002)")
+    parser.add_argument('--todas', action='store_true', help="Genera un paquete por cada carrera activa")
+    parser.add_argument('--destino', default=BUNDLES_DIR, help="Carpeta de salida")
+    args = parser.parse_args(argv)
+
+    from src.database.database import get_firestore_client
+    db = get_firestore_client()
+    carreras = list(args.carreras)
+    if args.todas:
+        carreras += [doc.id for doc in db.collection('carreras').where('estado', '==', 'Activo').stream()]
+    if not carreras:
+        parser.error("Indica al menos una carrera o --todas.")
+    for id_carrera in dict.fromkeys(carreras):
+        construir_bundle(id_carrera, db=db, directorio=args.destino)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.database.metricas import contar
+from src.database.presupuesto import PresupuestoAgotado
+from src.database.registros import Registro
+
+
+# TTL por colección (segundos). El catálogo casi no cambia durante un semestre.
+# Las listas de videos se guardan sin contadores: vistas y likes van aparte en
+# 'contadores', con el mismo TTL corto que los totales de ShardedCounters.
+TTL_POR_COLECCION = {
+    'campus': 6 * 3600,
+    'carreras': 6 * 3600,
+    'carrera_campus': 6 * 3600,
+    'areas': 3600,
+    'temas': 3600,
+    'videos': 300,
+    'contadores': 30,
+}
+TTL_DEFAULT = 600
+
+# Marca interna para distinguir "no está en caché" de "se guardó None"
+_NO_ENCONTRADO = object()
+
+
+def _copiar(valor):
+    # Copia lo que una pantalla puede modificar (listas, dicts, registros); el
+    # resto (texto, números, tuplas de texto) es inmutable. Más barata que deepcopy.
+    if isinstance(valor, list):
+        return [_copiar(v) for v in valor]
+    if isinstance(valor, dict):
+        return {k: _copiar(v) for k, v in valor.items()}
+    if isinstance(valor, Registro):
+        return valor.copia()
+    return valor
+
+
+class CatalogCache:
+    """
+    Caché read-through con LRU acotado y TTL por colección.
+    Las entradas se indexan por (colección, clave) para poder invalidar
+    una colección completa cuando Firestore avisa de un cambio.
+
+    Las entradas vencidas no se borran al leerlas: si el presupuesto de
+    lecturas se agotó, get_or_load responde con el último valor conocido.
+
+    Se copia una sola vez por lectura: get entrega una copia para que la
+    pantalla pueda modificarla sin ensuciar la caché, y set guarda el valor tal
+    cual (quien lo guarda ya no debe modificarlo).
+    """
+
+    def __init__(self, max_entradas=512, ttls=None, ttl_default=TTL_DEFAULT):
+        self.max_entradas = max_entradas
+        self.ttls = dict(TTL_POR_COLECCION if ttls is None else ttls)
+        self.ttl_default = ttl_default
+
+        self._lock = threading.RLock()
+        self._entradas = OrderedDict()  # (coleccion, clave) -> (expira_en, valor)
+        self._listeners = {}  # coleccion -> watch de on_snapshot
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.vencidos_servidos = 0
+
+    # ------------------------------------------
+    #      LECTURA
+    # ------------------------------------------
+
+    def get_or_load(self, coleccion, clave, loader):
+        """Devuelve el valor en caché o llama a loader() y lo guarda."""
+        valor = self.get(coleccion, clave)
+        if valor is not _NO_ENCONTRADO:
+            return valor
+
+        try:
+            valor = loader()
+        except PresupuestoAgotado as e:
+            return self._respaldo(coleccion, clave, e)
+        self.set(coleccion, clave, valor)
+        # Lo guardado es el original: a la pantalla le toca una copia
+        return _copiar(valor)
+
+    async def get_or_load_async(self, coleccion, clave, loader):
+        """Igual que get_or_load, con un loader async (AsyncDatabaseHelper)."""
+        valor = self.get(coleccion, clave)
+        if valor is not _NO_ENCONTRADO:
+            return valor
+
+        try:
+            valor = await loader()
+        except PresupuestoAgotado as e:
+            return self._respaldo(coleccion, clave, e)
+        self.set(coleccion, clave, valor)
+        return _copiar(valor)
+
+    def _respaldo(self, coleccion, clave, error):
+        # Sin cuota de lecturas: el último valor conocido, o la excepción si no hay
+        vencido = self.get_vencido(coleccion, clave)
+        if vencido is _NO_ENCONTRADO:
+            raise error
+        contar(f"cache_vencido.{coleccion}")
+        return vencido
+
+    def get(self, coleccion, clave):
+        llave = (coleccion, clave)
+        with self._lock:
+            entrada = self._entradas.get(llave)
+            if entrada is None:
+                self.misses += 1
+                return _NO_ENCONTRADO
+
+            expira_en, valor = entrada
+            if expira_en < time.monotonic():
+                # Se conserva como respaldo (ver get_vencido); el LRU la saca si hace falta
+                self.misses += 1
+                return _NO_ENCONTRADO
+
+            self._entradas.move_to_end(llave)
+            self.hits += 1
+        return _copiar(valor)
+
+    def get_vencido(self, coleccion, clave):
+        """Último valor guardado aunque haya vencido; _NO_ENCONTRADO si no hay."""
+        with self._lock:
+            entrada = self._entradas.get((coleccion, clave))
+            if entrada is None:
+                return _NO_ENCONTRADO
+            self.vencidos_servidos += 1
+        return _copiar(entrada[1])
+
+    def set(self, coleccion, clave, valor):
+        ttl = self.ttls.get(coleccion, self.ttl_default)
+        llave = (coleccion, clave)
+        with self._lock:
+            self._entradas[llave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(llave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.evictions += 1
+
+    # ------------------------------------------
+    #      INVALIDACIÓN
+    # ------------------------------------------
+
+    def invalidate(self, coleccion, clave=None):
+        """Borra una entrada o, si clave es None, todas las de la colección."""
+        with self._lock:
+            if clave is not None:
+                self._entradas.pop((coleccion, clave), None)
+                return
+            for llave in [k for k in self._entradas if k[0] == coleccion]:
+                del self._entradas[llave]
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def watch(self, db, coleccion):
+        """
+        Registra un listener on_snapshot que invalida la colección cuando cambia.
+        El primer snapshot trae todos los documentos como ADDED y se ignora.
+        """
+        with self._lock:
+            if coleccion in self._listeners:
+                return
+
+        estado = {'inicial': True}
+
+        def on_cambio(docs, cambios, read_time):
+            if estado['inicial']:
+                estado['inicial'] = False
+                return
+            if cambios:
+                self.invalidate(coleccion)
+
+        watch = db.collection(coleccion).on_snapshot(on_cambio)
+        with self._lock:
+            self._listeners[coleccion] = watch
+
+    def stop_watching(self):
+        with self._lock:
+            listeners = list(self._listeners.values())
+            self._listeners.clear()
+        for watch in listeners:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                print(f"ERROR al cerrar listener de caché: {e}")
+
+    # ------------------------------------------
+    #      MÉTRICAS
+    # ------------------------------------------
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "vencidos_servidos": self.vencidos_servidos,
+                "entradas": len(self._entradas),
+                "listeners": list(self._listeners),
+            }
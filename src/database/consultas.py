@@ -0,0 +1,401 @@
+"""
+Consultas y mapeos de Firestore compartidos por DatabaseHelper y AsyncDatabaseHelper.
+
+Las funciones q_* arman la consulta sin ejecutarla y sirven igual con el
+Client que con el AsyncClient; las mapear_* convierten los documentos en lo
+que reciben las pantallas. Cada helper solo decide cómo ejecutar (stream o
+async for), así los dos devuelven exactamente lo mismo.
+"""
+import random
+import threading
+import time
+
+from src.arranque import modulo_diferido
+from src.database.metricas import contar
+from src.database.registros import Comentario, Juego, Pregunta, Video
+from src.database.sharded_counter import CAMPOS_CONTADOR
+
+firestore = modulo_diferido("firebase_admin.firestore")
+
+
+# Proyecciones (Firestore select) para no bajar documentos completos en listas
+CAMPOS_VIDEO_LISTA = ['nombre', 'descripcion', 'url_video', 'id_area',
+                      'visualizaciones', 'cantidad_likes', 'cantidad_dislikes']
+CAMPOS_COMENTARIO = ['comentario', 'fecha', 'id_usuario']
+# El quiz solo muestra texto y opciones, más el comentario de la correcta
+CAMPOS_PREGUNTA_VIDEO = ['pregunta', 'opciones', 'opcion_correcta', 'comentarios.correcta']
+
+
+# ==========================================
+#      CONSULTAS
+# ==========================================
+
+def refs(db, coleccion, ids):
+    return [db.collection(coleccion).document(i) for i in ids]
+
+
+def q_campus_activos(db):
+    return db.collection('campus').where('estado', '==', 'Activo')
+
+
+def q_carrera_campus(db, id_campus):
+    return db.collection('carrera_campus').where('id_campus', '==', id_campus)
+
+
+def q_carrera_por_nombre(db, nombre_carrera):
+    return db.collection('carreras') \
+        .where(field_path='nombre', op_string='==', value=nombre_carrera).limit(1)
+
+
+def q_areas_carrera(db, id_carrera):
+    return db.collection('areas') \
+        .where('id_carrera', '==', id_carrera) \
+        .where('estado', '==', 'Activo')
+
+
+def q_videos_area(db, id_area):
+    return db.collection('videos') \
+        .where('id_area', '==', id_area) \
+        .where('estado', '==', 'Activo') \
+        .select(CAMPOS_VIDEO_LISTA)
+
+
+def q_contadores_area(db, id_area):
+    # Solo los contadores: las listas en caché se ponen al día con esto
+    return db.collection('videos') \
+        .where('id_area', '==', id_area) \
+        .where('estado', '==', 'Activo') \
+        .select(list(CAMPOS_CONTADOR))
+
+
+def q_preguntas_video(db, video_id):
+    return db.collection('preguntas') \
+        .where('id_video', '==', video_id) \
+        .where('estado', '==', 'Activo') \
+        .select(CAMPOS_PREGUNTA_VIDEO)
+
+
+def q_preguntas_area(db, id_area, con_comentarios):
+    # Sin 'comentarios' en la proyección los comentario_* quedan en None
+    campos = ['pregunta', 'opciones', 'opcion_correcta', 'id_tema']
+    if con_comentarios:
+        campos.append('comentarios')
+    return db.collection('preguntas') \
+        .where('id_area', '==', id_area) \
+        .where('estado', '==', 'Activo') \
+        .select(campos)
+
+
+def q_reacciones_usuario(db, video_id, user_id):
+    return db.collection('reacciones') \
+        .where('id_video', '==', video_id) \
+        .where('id_usuario', '==', user_id)
+
+
+def q_comentarios_video(db, video_id, ordenados=True):
+    # Ordenar por fecha requiere el índice compuesto (id_video, estado, fecha DESC)
+    query = db.collection('comentarios') \
+        .where('id_video', '==', video_id) \
+        .where('estado', '==', 'Activo')
+    if ordenados:
+        query = query.order_by('fecha', direction=firestore.Query.DESCENDING)
+    return query.select(CAMPOS_COMENTARIO)
+
+
+def q_juegos_carrera(db, coleccion, id_carrera):
+    return db.collection(coleccion) \
+        .where('id_carrera', '==', id_carrera) \
+        .where('estado', '==', 'Activo')
+
+
+def q_palabras_sopa(db, id_sopa):
+    return db.collection('palabras').where('id_sopa', '==', id_sopa)
+
+
+def q_palabras_crucigrama(db, id_crucigrama):
+    return db.collection('palabras') \
+        .where('id_crucigrama', '==', id_crucigrama) \
+        .where('estado', '==', 'Activo')
+
+
+# ==========================================
+#      MUESTRA ALEATORIA
+# ==========================================
+
+# Documentos sin 'aleatorio' por consulta: se leen una vez y se recuerdan este
+# tiempo o hasta que asignar_claves_aleatorias llame a olvidar_sin_clave
+TTL_SIN_CLAVE = 600
+_sin_clave = {}  # clave -> (expira_en, [documentos])
+_lock_sin_clave = threading.Lock()
+
+
+def olvidar_sin_clave():
+    with _lock_sin_clave:
+        _sin_clave.clear()
+
+
+def _sin_clave_guardados(clave):
+    with _lock_sin_clave:
+        guardado = _sin_clave.get(clave)
+    if guardado is None or guardado[0] < time.monotonic():
+        return None
+    return guardado[1]
+
+
+def muestra_aleatoria(query, k, clave=None):
+    """
+    Pasos para tomar k documentos a partir de un punto al azar sobre el campo
+    'aleatorio'. Es un generador: entrega cada consulta a ejecutar y recibe sus
+    documentos (ver ejecutar_pasos); al terminar devuelve la muestra.
+
+    Si desde el pivote no alcanzan, se da la vuelta y se completa desde el
+    inicio. Si aun así faltan, esas dos consultas ya trajeron todos los
+    documentos con 'aleatorio' y solo pueden faltar los que no lo tienen
+    (anteriores al importador): se leen con la consulta sin filtro una sola vez
+    por `clave` y se completa con random.sample sobre ellos.
+    """
+    if k <= 0:
+        return []
+    pivote = random.random()
+    docs = yield query.where('aleatorio', '>=', pivote).order_by('aleatorio').limit(k)
+    if len(docs) < k:
+        docs += yield query.where('aleatorio', '<', pivote).order_by('aleatorio').limit(k - len(docs))
+    if len(docs) < k:
+        elegidos = {doc.id for doc in docs}
+        resto = _sin_clave_guardados(clave) if clave is not None else None
+        if resto is None:
+            resto = [doc for doc in (yield query) if doc.id not in elegidos]
+            if clave is not None:
+                with _lock_sin_clave:
+                    _sin_clave[clave] = (time.monotonic() + TTL_SIN_CLAVE, resto)
+        # Tras asignar claves en otro proceso, lo guardado puede repetir lo elegido
+        resto = [doc for doc in resto if doc.id not in elegidos]
+        if resto:
+            contar('muestra_sin_aleatorio')
+            docs += random.sample(resto, min(k - len(docs), len(resto)))
+    random.shuffle(docs)
+    return docs
+
+
+def ejecutar_pasos(pasos, leer):
+    """Corre un generador de pasos con leer(query) -> lista de documentos."""
+    try:
+        query = next(pasos)
+        while True:
+            query = pasos.send(leer(query))
+    except StopIteration as fin:
+        return fin.value
+
+
+# ==========================================
+#      MAPEOS
+# ==========================================
+
+def mapear_campus(doc):
+    if not doc.exists:
+        return None
+    return {"ID_Campus": doc.id, "Nombre": doc.to_dict().get('nombre')}
+
+
+def mapear_carrera(doc):
+    if not doc.exists:
+        return None
+    return {"ID_Carrera": doc.id, "Nombre": doc.to_dict().get('nombre')}
+
+
+def mapear_carrera_completa(doc):
+    d = doc.to_dict()
+    d['ID_Carrera'] = doc.id
+    d['Nombre'] = d.get('nombre')  # Mapeo para Flet
+    return d
+
+
+def mapear_area(doc):
+    return {"ID_Area": doc.id, "Nombre": doc.to_dict().get('nombre')}
+
+
+def mapear_tema(doc):
+    if not doc.exists:
+        return None
+    d = doc.to_dict()
+    d['ID_Tema'] = doc.id
+    d['Nombre'] = d.get('nombre')
+    return d
+
+
+def ids_carreras(docs):
+    """IDs de carrera de los documentos de carrera_campus, sin repetir y en orden."""
+    return list(dict.fromkeys(
+        doc.to_dict().get('id_carrera') for doc in docs if doc.to_dict().get('id_carrera')
+    ))
+
+
+def carreras_en_orden(ids, docs):
+    # get_all no garantiza el orden, respetamos el de carrera_campus
+    nombres = {doc.id: doc.to_dict().get('nombre') for doc in docs if doc.exists}
+    return [(id_carrera, nombres[id_carrera]) for id_carrera in ids if id_carrera in nombres]
+
+
+def mapear_contadores(video):
+    # --- PARCHE DE SEGURIDAD ---
+    # Evitamos números negativos con max(0, valor)
+    video.cantidad_likes = max(0, video.cantidad_likes)
+    video.cantidad_dislikes = max(0, video.cantidad_dislikes)
+    return video
+
+
+def mapear_video(doc):
+    return mapear_contadores(Video.desde_firestore(doc.id, doc.to_dict()))
+
+
+def contadores_por_video(docs):
+    """{id_video: {campo: valor}} de documentos de video (completos o de q_contadores_area)."""
+    return {doc.id: {campo: doc.to_dict().get(campo) or 0 for campo in CAMPOS_CONTADOR} for doc in docs}
+
+
+def contadores_de_videos(videos):
+    return {video.id: {campo: getattr(video, campo) for campo in CAMPOS_CONTADOR} for video in videos}
+
+
+def mapear_pregunta(doc):
+    return Pregunta.desde_firestore(doc.id, doc.to_dict())
+
+
+def mapear_comentarios(comentarios):
+    return {
+        "Comentario_A": comentarios.get('a'),
+        "Comentario_B": comentarios.get('b'),
+        "Comentario_C": comentarios.get('c'),
+        "Comentario_Correcta": comentarios.get('correcta'),
+    }
+
+
+def comentarios_por_pregunta(docs):
+    return {doc.id: mapear_comentarios(doc.to_dict().get('comentarios', {})) for doc in docs if doc.exists}
+
+
+def mapear_comentario(doc):
+    comentario = Comentario.desde_firestore(doc.id, doc.to_dict())
+    # Convertir Timestamp a string para Flet
+    if comentario.fecha:
+        comentario.fecha = str(comentario.fecha)
+    return comentario
+
+
+def pagina_comentarios(docs, limite):
+    """(comentarios, siguiente_cursor) de una consulta pedida con limit(limite + 1)."""
+    hay_mas = len(docs) > limite
+    docs = docs[:limite]
+    siguiente = docs[-1] if hay_mas and docs else None
+    return [mapear_comentario(doc) for doc in docs], siguiente
+
+
+def mapear_juego(doc, tipo):
+    return Juego.desde_firestore(doc.id, doc.to_dict(), tipo=tipo)
+
+
+def mapear_palabra_crucigrama(docs):
+    if not docs:
+        raise Exception("No se encontró una palabra para este crucigrama.")
+    d = docs[0].to_dict()
+    return {'palabra': d.get('palabra'), 'descripcion': d.get('descripcion')}
+
+
+# ==========================================
+#      ESCRITURAS
+# ==========================================
+
+def id_reaccion(video_id, user_id):
+    # Un documento por (video, usuario): la transacción sabe exactamente qué leer
+    return f"{video_id}_{user_id}"
+
+
+def campo_reaccion(tipo):
+    return "cantidad_likes" if tipo.lower() == "like" else "cantidad_dislikes"
+
+
+def datos_reaccion(video_id, user_id, tipo):
+    return {
+        "id_video": video_id,
+        "id_usuario": user_id,
+        "tipo": tipo,
+        "fecha": firestore.SERVER_TIMESTAMP,
+        "estado": "Activo"
+    }
+
+
+def datos_comentario(video_id, user_id, comment_text):
+    return {
+        "comentario": comment_text,
+        "id_usuario": user_id,
+        "id_video": video_id,
+        "fecha": firestore.SERVER_TIMESTAMP,
+        "estado": "Activo"
+    }
+
+
+def datos_resultado(id_usuario, id_tema, calificacion, id_simulador, tiempo, fecha):
+    return {
+        "id_usuario": id_usuario,
+        "id_tema": id_tema,
+        "calificacion": calificacion,
+        "id_simulador": id_simulador,
+        "tiempo": tiempo,
+        "fecha": fecha
+    }
+
+
+def escribir_reaccion(transaction, db, reaccion_ref, anterior_ref, anterior, video_id, user_id, tipo,
+                      fragmentos=None):
+    """
+    Escrituras de toggle_reaction una vez leída la reacción anterior: pone,
+    cambia o quita la reacción y ajusta los contadores en la misma transacción.
+    Devuelve (reacción resultante, {campo: delta}).
+    """
+    deltas = {}
+    if anterior:
+        deltas[campo_reaccion(anterior)] = -1
+
+    if anterior and anterior.lower() == tipo.lower():
+        transaction.delete(anterior_ref)
+        nuevo = None
+    else:
+        if anterior_ref is not None and anterior_ref.id != reaccion_ref.id:
+            transaction.delete(anterior_ref)
+        transaction.set(reaccion_ref, datos_reaccion(video_id, user_id, tipo))
+        campo = campo_reaccion(tipo)
+        deltas[campo] = deltas.get(campo, 0) + 1
+        nuevo = tipo
+
+    deltas = {campo: delta for campo, delta in deltas.items() if delta}
+    if deltas:
+        if fragmentos is not None:
+            transaction.set(fragmentos.ref_aleatoria(video_id, db=db),
+                            fragmentos.datos_incremento(video_id, deltas), merge=True)
+        else:
+            transaction.update(db.collection('videos').document(video_id),
+                               {campo: firestore.Increment(delta) for campo, delta in deltas.items()})
+    return nuevo, deltas
+
+
+def lote_resultados(db, batch, id_usuario, id_simulador, tiempo, fecha, calificaciones, resumen=None):
+    """
+    Agrega al batch la calificación de cada tema y, si hay resumen, el intento.
+    Devuelve el ID del intento o None si no se pidió resumen.
+    """
+    for id_tema, calificacion in calificaciones.items():
+        batch.set(db.collection('resultados').document(),
+                  datos_resultado(id_usuario, id_tema, calificacion, id_simulador, tiempo, fecha))
+
+    if resumen is None:
+        return None
+    intento_ref = db.collection('intentos').document()
+    batch.set(intento_ref, {
+        **resumen,
+        "id_usuario": id_usuario,
+        "id_simulador": id_simulador,
+        "tiempo": tiempo,
+        "fecha": fecha,
+        "temas": dict(calificaciones)
+    })
+    return intento_ref.id
@@ -2,6 +2,17 @@ import csv
 import os
 
 
+def reparar_texto(valor):
+    """Texto de una celda de CSV sin espacios sobrantes ni acentos mal codificados."""
+    # Algunos CSV se exportaron como UTF-8 leído en latin-1 ("DescripciÃ³n").
+    # Si el texto no tiene ese problema, encode/decode falla y se deja igual.
+    valor = valor.strip()
+    try:
+        return valor.encode('latin-1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return valor
+
+
 def populate_from_csv_if_empty(db_helper, conn):  # Recibe la conexión
     """
     Revisa si la base de datos está vacía y, de ser así, la puebla
@@ -21,9 +32,14 @@ def populate_from_csv_if_empty(db_helper, conn):  # Recibe la conexión
         'tema.csv': db_helper.insert_tema, 'video.csv': db_helper.insert_video,
         'pregunta.csv': db_helper.insert_pregunta, 'simulador.csv': db_helper.insert_simulador,
         'sopa.csv': db_helper.insert_sopa, 'crucigrama.csv': db_helper.insert_crucigrama,
-        'palabra.csv': db_helper.insert_palabra,
+        'palabra.csv': db_helper.insert_palabra, 'comentario.csv': db_helper.insert_comentario,
     }
+    cargar_csv(db_helper, conn, csv_map)
+    print("Carga de datos desde CSV completada.")
+
 
+def cargar_csv(db_helper, conn, csv_map):
+    """Inserta cada fila de los CSV indicados ({archivo: método de inserción}) y hace commit."""
     csv_dir = os.path.join(db_helper.base_dir, '..', '..', 'assets', 'csv')
     print(f"\n>>> DEBUG: Buscando archivos CSV en la carpeta: {os.path.abspath(csv_dir)}\n")
 
@@ -42,5 +58,4 @@ def populate_from_csv_if_empty(db_helper, conn):  # Recibe la conexión
         except Exception as e:
             print(f" - ERROR al cargar '{file_name}': {e}")
 
-    conn.commit()  # Usa la conexión recibida
-    print("Carga de datos desde CSV completada.")
\ No newline at end of file
+    conn.commit()  # Usa la conexión recibida
\ No newline at end of file
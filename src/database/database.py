@@ -1,318 +1,570 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 import os
 import random
 import datetime
+import threading
+
+from src.arranque import modulo_diferido
+from src.database import consultas
+from src.database.backend import StorageBackend
+from src.database.bundle import ContenidoOffline
+from src.database.cache import CatalogCache
+from src.database.metricas import (iniciar_desde_entorno, instrumentar_firestore, medir_metodos, sesion_actual,
+                                   vigilar, volcar_desde_entorno)
+from src.database.presupuesto import PresupuestoAgotado, get_presupuesto, si_agotado
+from src.database.sharded_counter import ShardedCounters
+from src.database.write_behind import RUTA_PENDIENTES, CounterWriteBehind
+
+# firebase_admin arrastra gRPC y protobuf: se importa la primera vez que se usa,
+# así las pantallas que no tocan la base (Bienvenida) arrancan sin pagarlo.
+firebase_admin = modulo_diferido("firebase_admin")
+firestore = modulo_diferido("firebase_admin.firestore")
+
 
 # --- CONFIGURACIÓN DE CONEXIÓN ---
 
-if not firebase_admin._apps:
-    # Ajustamos la ruta para buscar credenciales.json en la misma carpeta que este archivo
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    cred_path = os.path.join(base_dir, "credenciales.json")
+_lock_firebase = threading.Lock()
 
-    if os.path.exists(cred_path):
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-    else:
-        print(f"ERROR: No se encontró el archivo {cred_path}")
 
+def _inicializar_firebase():
+    """Inicializa la app de Firebase con credenciales.json la primera vez que se necesita."""
+    with _lock_firebase:
+        if firebase_admin._apps:
+            return
+        # Ajustamos la ruta para buscar credenciales.json en la misma carpeta que este archivo
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        cred_path = os.path.join(base_dir, "credenciales.json")
 
-class DatabaseHelper:
-    def __init__(self, db_name=None):
+        if os.path.exists(cred_path):
+            from firebase_admin import credentials
+            cred = credentials.Certificate(cred_path)
+            firebase_admin.initialize_app(cred)
+            # Cuenta lecturas, escrituras y bytes de cada llamada (ver metricas.py)
+            instrumentar_firestore()
+        else:
+            print(f"ERROR: No se encontró el archivo {cred_path}")
+
+
+# --- CLIENTE COMPARTIDO ---
+# En modo web, Flet atiende todas las sesiones desde un mismo proceso. Crear un
+# firestore.client() por pantalla reconstruye los canales gRPC en cada navegación,
+# así que mantenemos un único cliente (y un único helper) por proceso.
+
+_lock = threading.Lock()
+_shared_client = None
+_shared_helper = None
+
+
+def get_firestore_client():
+    """Devuelve el cliente de Firestore del proceso, creándolo la primera vez."""
+    global _shared_client
+    if _shared_client is None:
+        with _lock:
+            if _shared_client is None:
+                _inicializar_firebase()
+                _shared_client = firestore.client()
+    return _shared_client
+
+
+def _crear_helper():
+    # RUTA_LINCE_BACKEND=sqlite usa la base local alimentada desde assets/csv
+    backend = os.environ.get("RUTA_LINCE_BACKEND", "firestore").strip().lower()
+    if backend == "sqlite":
+        from src.database.sqlite_helper import SQLiteHelper
+        return SQLiteHelper()
+    # Si hay paquetes en assets/bundles, el contenido de sus carreras se lee de ahí
+    return DatabaseHelper(offline=ContenidoOffline.desde_directorio(), ruta_pendientes=RUTA_PENDIENTES)
+
+
+def get_database_helper():
+    """Devuelve el helper compartido por todas las sesiones (Firestore o SQLite)."""
+    global _shared_helper
+    if _shared_helper is None:
+        with _lock:
+            if _shared_helper is None:
+                _shared_helper = _crear_helper()
+    return _shared_helper
+
+
+def init_database():
+    # Hook de arranque: abre el cliente antes de la primera pantalla
+    iniciar_desde_entorno()
+    return get_database_helper()
+
+
+def close_database():
+    # Hook de apagado: cierra los canales gRPC y olvida las instancias compartidas
+    global _shared_client, _shared_helper
+    with _lock:
+        if _shared_helper is not None:
+            _shared_helper.close()
+        if _shared_client is not None:
+            try:
+                _shared_client.close()
+            except Exception as e:
+                print(f"ERROR al cerrar el cliente de Firestore: {e}")
+        _shared_client = None
+        _shared_helper = None
+    volcar_desde_entorno()
+
+
+@medir_metodos
+class DatabaseHelper(StorageBackend):
+    # Colecciones del catálogo que se pueden vigilar con on_snapshot
+    COLECCIONES_CATALOGO = ('campus', 'carreras', 'carrera_campus', 'areas', 'temas', 'videos')
+
+    # Nombres de columnas SQL que usa la app -> campos de Firestore
+    CAMPOS_CONTADOR = {
+        "Cantidad_Likes": "cantidad_likes",
+        "Cantidad_Dislikes": "cantidad_dislikes",
+        "Visualizaciones": "visualizaciones"
+    }
+
+    def __init__(self, db_name=None, client=None, cache=None, escuchar_cambios=False, escritura_diferida=True,
+                 num_fragmentos=None, offline=None, presupuesto=None, ruta_pendientes=None):
         # db_name se mantiene por compatibilidad, pero no se usa en Firebase
-        self.db = firestore.client()
+        self.db = client if client is not None else get_firestore_client()
+        self.cache = cache if cache is not None else CatalogCache()
+        # ContenidoOffline (paquetes por carrera); None = todo se lee de Firestore
+        self.offline = offline
+        self._sincronizador = None
+
+        # Contadores fragmentados: RUTA_LINCE_FRAGMENTOS=0 (o sin definir) los desactiva
+        if num_fragmentos is None:
+            num_fragmentos = int(os.environ.get("RUTA_LINCE_FRAGMENTOS", "0"))
+        self.fragmentos = ShardedCounters(self.db, num_fragmentos) if num_fragmentos > 0 else None
+
+        # Cuotas de lecturas/escrituras (RUTA_LINCE_PRESUPUESTO_*); None = sin límite
+        self.presupuesto = presupuesto if presupuesto is not None else get_presupuesto()
+        if self.presupuesto is not None:
+            vigilar(self.presupuesto)
+            escritura_diferida = True  # Sin cola no hay dónde retener los contadores
+
+        # Vistas y reacciones se acumulan y se envían en lote desde un hilo aparte;
+        # con ruta_pendientes, lo que no salga al cerrar se reenvía en el siguiente arranque
+        self.contadores = CounterWriteBehind(self.db, fragmentos=self.fragmentos, presupuesto=self.presupuesto,
+                                             ruta_pendientes=ruta_pendientes) \
+            if escritura_diferida else None
+        if escuchar_cambios:
+            self.escuchar_cambios_catalogo()
+
+    def escuchar_cambios_catalogo(self, colecciones=None):
+        """Invalida la caché en cuanto cambia un documento del catálogo."""
+        for coleccion in colecciones or self.COLECCIONES_CATALOGO:
+            self.cache.watch(self.db, coleccion)
+
+    def get_cache_stats(self):
+        return self.cache.stats()
+
+    def get_presupuesto_stats(self):
+        return self.presupuesto.stats() if self.presupuesto is not None else None
+
+    def refrescar_carrera(self, id_carrera):
+        """Trae en un hilo aparte lo que cambió de la carrera desde su paquete offline."""
+        if self.offline is None:
+            return None
+        with _lock:
+            if self._sincronizador is None:
+                from src.database.sincronizacion import SincronizadorDelta
+                self._sincronizador = SincronizadorDelta(self.offline, db=self.db)
+        return self._sincronizador.refrescar_en_segundo_plano(id_carrera)
+
+    def _desde_offline(self, metodo, *args):
+        # None si no hay paquetes o el dato no está en ninguno
+        if self.offline is None:
+            return None
+        return getattr(self.offline, metodo)(*args)
+
+    def close(self):
+        # El cliente es compartido: close_database() se encarga de cerrarlo
+        self.cache.stop_watching()
+        if self.presupuesto is not None:
+            for id_video, campo, retenido in self.presupuesto.liberar(todos=True):
+                self.contadores.incrementar(id_video, campo, retenido)
+        if self.contadores is not None:
+            self.contadores.close()
+
+    def _incrementar_contador(self, video_id, campo_firestore, delta):
+        if self.presupuesto is not None:
+            # Lo retenido de sesiones que ya renovaron su cuota pasa a la cola
+            for id_video, campo, retenido in self.presupuesto.liberar():
+                self.contadores.incrementar(id_video, campo, retenido)
+            sesion = sesion_actual()
+            if sesion is not None:
+                if not self.presupuesto.puede_escribir(sesion=sesion):
+                    self.presupuesto.diferir(sesion, video_id, campo_firestore, delta)
+                    return
+                self.presupuesto.registrar(sesion, escrituras=1, solo_sesion=True)
+
+        if self.contadores is not None:
+            self.contadores.incrementar(video_id, campo_firestore, delta)
+        elif self.fragmentos is not None:
+            campos = {campo_firestore: delta}
+            self.fragmentos.ref_aleatoria(video_id).set(
+                self.fragmentos.datos_incremento(video_id, campos), merge=True)
+            self.fragmentos.registrar_local(video_id, campos)
+        else:
+            self.db.collection('videos').document(video_id).update({
+                campo_firestore: firestore.Increment(delta)
+            })
 
     # ==========================================
     #      MÉTODOS DE LECTURA (GET)
     # ==========================================
 
     def get_campus(self):
-        docs = self.db.collection('campus').where('estado', '==', 'Activo').stream()
-        return [{"ID_Campus": doc.id, "Nombre": doc.to_dict().get('nombre')} for doc in docs]
+        def cargar():
+            return [consultas.mapear_campus(doc) for doc in consultas.q_campus_activos(self.db).stream()]
+
+        return self.cache.get_or_load('campus', 'activos', cargar)
 
     def get_carrera(self):
-        docs = self.db.collection('carreras').stream()
-        resultado = []
-        for doc in docs:
-            d = doc.to_dict()
-            d['ID_Carrera'] = doc.id
-            d['Nombre'] = d.get('nombre')  # Mapeo para Flet
-            resultado.append(d)
-        return resultado
-
-    def get_nombres_carrera_por_id_campus(self, id_campus):
+        return [consultas.mapear_carrera_completa(doc) for doc in self.db.collection('carreras').stream()]
+
+    def get_carreras_por_id_campus(self, id_campus):
+        """
+        Devuelve [(id_carrera, nombre), ...] de las carreras de un campus.
+        Son dos lecturas: la colección intermedia y un get_all de las carreras.
+        """
+        return self.cache.get_or_load('carrera_campus', id_campus,
+                                      lambda: self._cargar_carreras_por_id_campus(id_campus))
+
+    def _cargar_carreras_por_id_campus(self, id_campus):
         # 1. Buscar en la colección intermedia
-        docs = self.db.collection('carrera_campus').where('id_campus', '==', id_campus).stream()
-        nombres = []
-        for doc in docs:
-            id_carrera = doc.to_dict().get('id_carrera')
-            if id_carrera:
-                carrera_doc = self.db.collection('carreras').document(id_carrera).get()
-                if carrera_doc.exists:
-                    nombres.append(carrera_doc.to_dict().get('nombre'))
-        return nombres
+        ids_carreras = consultas.ids_carreras(consultas.q_carrera_campus(self.db, id_campus).stream())
+        if not ids_carreras:
+            return []
+
+        # 2. Traer todas las carreras en un solo viaje
+        docs = self.db.get_all(consultas.refs(self.db, 'carreras', ids_carreras), field_paths=['nombre'])
+        return consultas.carreras_en_orden(ids_carreras, docs)
 
     def get_areas_id_carrera(self, id_carrera):
-        docs = self.db.collection('areas') \
-            .where('id_carrera', '==', id_carrera) \
-            .where('estado', '==', 'Activo').stream()
-        return [{"ID_Area": doc.id, "Nombre": doc.to_dict().get('nombre')} for doc in docs]
+        offline = self._desde_offline('get_areas_id_carrera', id_carrera)
+        if offline is not None:
+            return offline
+
+        def cargar():
+            return [consultas.mapear_area(doc) for doc in consultas.q_areas_carrera(self.db, id_carrera).stream()]
+
+        return self.cache.get_or_load('areas', ('carrera', id_carrera), cargar)
 
     def get_videos_by_id_area(self, id_area):
-        docs = self.db.collection('videos') \
-            .where('id_area', '==', id_area) \
-            .where('estado', '==', 'Activo').stream()
-
-        videos = []
-        for doc in docs:
-            data = doc.to_dict()
-            data['ID_Video'] = doc.id
-            # Mapeo de campos a Mayúsculas como espera tu app antigua
-            data['Nombre'] = data.get('nombre')
-            data['Descripción'] = data.get('descripcion')
-            data['URL_Video'] = data.get('url_video')
-            data['Visualizaciones'] = data.get('visualizaciones', 0)
-
-            # --- PARCHE DE SEGURIDAD ---
-            # Evitamos números negativos con max(0, valor)
-            data['Cantidad_Likes'] = max(0, data.get('cantidad_likes', 0))
-
-            videos.append(data)
+        videos = self._desde_offline('get_videos_by_id_area', id_area)
+        if videos is None:
+            videos = self.cache.get_or_load('videos', ('area', id_area),
+                                            lambda: self._cargar_videos_by_id_area(id_area))
+        # Los del paquete traen los contadores del día en que se generó
+        return self._aplicar_contadores(id_area, videos)
+
+    def _cargar_videos_by_id_area(self, id_area):
+        videos = [consultas.mapear_video(doc) for doc in consultas.q_videos_area(self.db, id_area).stream()]
+        # La misma lectura sirve de primera versión de los contadores
+        self.cache.set('contadores', ('area', id_area), consultas.contadores_de_videos(videos))
         return videos
 
+    def _aplicar_contadores(self, id_area, videos):
+        """
+        Pone al día vistas y likes de una lista de videos en caché o del paquete.
+        Con fragmentos se suman sus totales; sin ellos se releen solo los campos
+        contador del área, con su propio TTL corto ('contadores' en cache.py).
+        """
+        if self.fragmentos is not None:
+            self.fragmentos.aplicar(videos)
+        else:
+            try:
+                contadores = self.cache.get_or_load(
+                    'contadores', ('area', id_area),
+                    lambda: consultas.contadores_por_video(consultas.q_contadores_area(self.db, id_area).stream()))
+            except PresupuestoAgotado:
+                contadores = {}  # Sin cuota se quedan los de la lista
+            for video in videos:
+                video.actualizar(contadores.get(video.id, {}))
+        for video in videos:
+            consultas.mapear_contadores(video)
+        return videos
+
+    @si_agotado()
     def get_video_by_id(self, video_id):
         doc = self.db.collection('videos').document(video_id).get()
         if doc.exists:
-            data = doc.to_dict()
-            data['ID_Video'] = doc.id
-            data['Nombre'] = data.get('nombre')
-            data['Descripción'] = data.get('descripcion')
-            data['URL_Video'] = data.get('url_video')
-            data['Visualizaciones'] = data.get('visualizaciones', 0)
-
-            # --- PARCHE DE SEGURIDAD ---
-            # Evitamos números negativos con max(0, valor)
-            data['Cantidad_Likes'] = max(0, data.get('cantidad_likes', 0))
-            data['Cantidad_Dislikes'] = max(0, data.get('cantidad_dislikes', 0))
-
-            return data
+            video = consultas.mapear_video(doc)
+
+            if self.fragmentos is not None:
+                self.fragmentos.aplicar([video])
+
+            # Sumamos lo que sigue en la cola diferida para que el usuario vea su propio clic
+            if self.contadores is not None:
+                for campo, delta in self.contadores.pendientes(video_id).items():
+                    video[campo] = video[campo] + delta
+
+            return consultas.mapear_contadores(video)
         return None
 
+    @si_agotado(list)
     def get_preguntas_por_id_video(self, video_id):
-        docs = self.db.collection('preguntas') \
-            .where('id_video', '==', video_id) \
-            .where('estado', '==', 'Activo').stream()
-
-        lista = []
-        for doc in docs:
-            d = doc.to_dict()
-            opciones = d.get('opciones', {})
-            comentarios = d.get('comentarios', {})
-
-            lista.append({
-                "ID_Pregunta": doc.id,
-                "Pregunta": d.get('pregunta'),
-                "Opcion_A": opciones.get('a'),
-                "Opcion_B": opciones.get('b'),
-                "Opcion_C": opciones.get('c'),  # Por si acaso
-                "Opcion_Correcta": d.get('opcion_correcta'),
-                "Comentario_Correcta": comentarios.get('correcta'),
-                # Agrega más campos si tu UI los pide
-            })
-        return lista
-
-    def get_preguntas_por_id_area_activo(self, id_area):
-        docs = self.db.collection('preguntas') \
-            .where('id_area', '==', id_area) \
-            .where('estado', '==', 'Activo').stream()
-
-        lista = []
-        for doc in docs:
-            d = doc.to_dict()
-            opciones = d.get('opciones', {})
-            comentarios = d.get('comentarios', {})
-            lista.append({
-                "ID_Pregunta": doc.id,
-                "Pregunta": d.get('pregunta'),
-                "Opcion_A": opciones.get('a'),
-                "Opcion_B": opciones.get('b'),
-                "Opcion_C": opciones.get('c'),
-                "Opcion_Correcta": d.get('opcion_correcta'),
-                "Comentario_A": comentarios.get('a'),
-                "Comentario_B": comentarios.get('b'),
-                "Comentario_C": comentarios.get('c'),
-                "Comentario_Correcta": comentarios.get('correcta'),
-                "ID_Tema": d.get('id_tema')
-            })
-        return lista
+        offline = self._desde_offline('get_preguntas_por_id_video', video_id)
+        if offline is not None:
+            return offline
+
+        return [consultas.mapear_pregunta(doc) for doc in consultas.q_preguntas_video(self.db, video_id).stream()]
 
+    @si_agotado(list)
+    def get_preguntas_por_id_area_activo(self, id_area, con_comentarios=True):
+        """
+        Preguntas activas de un área. Con con_comentarios=False no se descarga el
+        mapa 'comentarios' (la retroalimentación se pide después con
+        get_comentarios_preguntas, solo para las preguntas que se usaron).
+        """
+        offline = self._desde_offline('get_preguntas_por_id_area_activo', id_area)
+        if offline is not None:
+            return offline
+
+        docs = consultas.q_preguntas_area(self.db, id_area, con_comentarios).stream()
+        return [consultas.mapear_pregunta(doc) for doc in docs]
+
+    @si_agotado(list)
+    def get_preguntas_aleatorias(self, id_area, k, con_comentarios=False):
+        """
+        k preguntas activas al azar de un área, leyendo solo k documentos.
+        Requiere el campo 'aleatorio' (ver asignar_claves_aleatorias) y un índice
+        compuesto (id_area, estado, aleatorio).
+        """
+        offline = self._desde_offline('get_preguntas_aleatorias', id_area, k)
+        if offline is not None:
+            return offline
+
+        docs = self._muestra_aleatoria(consultas.q_preguntas_area(self.db, id_area, con_comentarios), k,
+                                       ('preguntas', id_area, con_comentarios))
+        return [consultas.mapear_pregunta(doc) for doc in docs]
+
+    @staticmethod
+    def _muestra_aleatoria(query, k, clave=None):
+        """k documentos al azar de la consulta (ver consultas.muestra_aleatoria)."""
+        return consultas.ejecutar_pasos(consultas.muestra_aleatoria(query, k, clave), lambda q: list(q.stream()))
+
+    def asignar_claves_aleatorias(self, coleccion):
+        """
+        Mantenimiento: agrega 'aleatorio' a los documentos que no lo tienen.
+        Devuelve cuántos documentos se actualizaron.
+        """
+        batch = self.db.batch()
+        pendientes = 0
+        total = 0
+        for doc in self.db.collection(coleccion).select(['aleatorio']).stream():
+            if 'aleatorio' in doc.to_dict():
+                continue
+            batch.update(doc.reference, {'aleatorio': random.random()})
+            pendientes += 1
+            total += 1
+            if pendientes == 500:
+                batch.commit()
+                batch = self.db.batch()
+                pendientes = 0
+        if pendientes:
+            batch.commit()
+        consultas.olvidar_sin_clave()
+        return total
+
+    @si_agotado(dict)
+    def get_comentarios_preguntas(self, ids_preguntas):
+        """Devuelve {id_pregunta: {Comentario_A, ..., Comentario_Correcta}} con un solo get_all."""
+        ids_unicos = list(dict.fromkeys(i for i in ids_preguntas if i))
+        if not ids_unicos:
+            return {}
+        offline = self._desde_offline('get_comentarios_preguntas', ids_unicos)
+        if offline is not None:
+            return offline
+
+        refs = consultas.refs(self.db, 'preguntas', ids_unicos)
+        return consultas.comentarios_por_pregunta(self.db.get_all(refs, field_paths=['comentarios']))
+
+    @si_agotado()
     def get_user_reaction_for_video(self, video_id, user_id):
-        docs = self.db.collection('reacciones') \
-            .where('id_video', '==', video_id) \
-            .where('id_usuario', '==', user_id).limit(1).stream()
-        for doc in docs:
+        for doc in consultas.q_reacciones_usuario(self.db, video_id, user_id).limit(1).stream():
             return doc.to_dict().get('tipo')
         return None
 
+    @si_agotado(list)
     def get_comments_by_id_video(self, video_id):
         # Nota: Ordenar por fecha requiere un índice en Firebase.
         # Si falla, remueve el .order_by o crea el índice en la consola.
         try:
-            docs = self.db.collection('comentarios') \
-                .where('id_video', '==', video_id) \
-                .where('estado', '==', 'Activo') \
-                .order_by('fecha', direction=firestore.Query.DESCENDING).stream()
+            docs = consultas.q_comentarios_video(self.db, video_id).stream()
         except Exception:
             # Fallback si no hay índice
-            docs = self.db.collection('comentarios') \
-                .where('id_video', '==', video_id) \
-                .where('estado', '==', 'Activo').stream()
-
-        comentarios = []
-        for doc in docs:
-            d = doc.to_dict()
-            d['ID_Comentario'] = doc.id
-            d['Comentario'] = d.get('comentario')
-            # Convertir Timestamp a string para Flet
-            fecha = d.get('fecha')
-            if fecha:
-                d['Fecha'] = str(fecha)
-            comentarios.append(d)
-        return comentarios
+            docs = consultas.q_comentarios_video(self.db, video_id, ordenados=False).stream()
 
-    # --- JUEGOS Y SIMULADORES ---
+        return [consultas.mapear_comentario(doc) for doc in docs]
 
-    def get_sopas_con_area_by_id_carrera(self, id_carrera):
-        docs = self.db.collection('sopa') \
-            .where('id_carrera', '==', id_carrera) \
-            .where('estado', '==', 'Activo').stream()
+    @si_agotado(lambda: ([], None))
+    def get_comments_page(self, video_id, limite=20, cursor=None):
+        """
+        Una página de comentarios, del más reciente al más antiguo.
+        cursor es el valor devuelto por la página anterior (None para la primera).
+        Devuelve (comentarios, siguiente_cursor); siguiente_cursor es None al final.
+        Requiere el índice compuesto (id_video, estado, fecha DESC).
+        """
+        query = consultas.q_comentarios_video(self.db, video_id)
+        if cursor is not None:
+            query = query.start_after(cursor)
+
+        # Pedimos uno de más para saber si hay otra página sin hacer otra lectura vacía
+        return consultas.pagina_comentarios(list(query.limit(limite + 1).stream()), limite)
 
-        resultado = []
-        for doc in docs:
-            data = doc.to_dict()
-            data['ID_Sopa'] = doc.id
-            data['Cantidad_Palabras'] = data.get('cantidad_palabras')
+    # --- JUEGOS Y SIMULADORES ---
 
-            # Simular JOIN con Area
-            id_area = data.get('id_area')
-            if id_area:
-                area_doc = self.db.collection('areas').document(id_area).get()
-                data['NombreArea'] = area_doc.to_dict().get('nombre') if area_doc.exists else "N/A"
+    def get_sopas_con_area_by_id_carrera(self, id_carrera):
+        offline = self._desde_offline('get_juegos_por_carrera', 'sopa', 'sopa', id_carrera)
+        if offline is not None:
+            return offline
 
-            resultado.append(data)
-        return resultado
+        # En caché: ir y volver entre la lista y el juego no vuelve a leer el catálogo
+        return self.cache.get_or_load('sopa', id_carrera,
+                                      lambda: self._cargar_juegos('sopa', 'sopa', id_carrera))
 
     def get_crucigramas_con_area_by_id_carrera(self, id_carrera):
-        docs = self.db.collection('crucigrama') \
-            .where('id_carrera', '==', id_carrera) \
-            .where('estado', '==', 'Activo').stream()
+        offline = self._desde_offline('get_juegos_por_carrera', 'crucigrama', 'crucigrama', id_carrera)
+        if offline is not None:
+            return offline
 
-        resultado = []
-        for doc in docs:
-            data = doc.to_dict()
-            data['ID_Crucigrama'] = doc.id
-            data['Cantidad_Palabras'] = data.get('cantidad_palabras')
+        # En caché: ir y volver entre la lista y el juego no vuelve a leer el catálogo
+        return self.cache.get_or_load('crucigrama', id_carrera,
+                                      lambda: self._cargar_juegos('crucigrama', 'crucigrama', id_carrera))
 
-            id_area = data.get('id_area')
-            if id_area:
-                area_doc = self.db.collection('areas').document(id_area).get()
-                data['NombreArea'] = area_doc.to_dict().get('nombre') if area_doc.exists else "N/A"
+    def get_simuladores_con_area_by_id_carrera(self, id_carrera):
+        offline = self._desde_offline('get_juegos_por_carrera', 'simuladores', 'simulador', id_carrera)
+        if offline is not None:
+            return offline
 
-            resultado.append(data)
-        return resultado
+        # En caché: ir y volver entre la lista y el juego no vuelve a leer el catálogo
+        return self.cache.get_or_load('simuladores', id_carrera,
+                                      lambda: self._cargar_juegos('simuladores', 'simulador', id_carrera))
 
-    def get_simuladores_con_area_by_id_carrera(self, id_carrera):
-        docs = self.db.collection('simuladores') \
-            .where('id_carrera', '==', id_carrera) \
-            .where('estado', '==', 'Activo').stream()
+    def _cargar_juegos(self, coleccion, tipo, id_carrera):
+        docs = consultas.q_juegos_carrera(self.db, coleccion, id_carrera).stream()
+        resultado = [consultas.mapear_juego(doc, tipo) for doc in docs]
 
-        resultado = []
-        for doc in docs:
-            data = doc.to_dict()
-            data['ID_Simulador'] = doc.id
-            data['Longitud'] = data.get('longitud')
+        # Simular JOIN con Area (una sola lectura en lote)
+        return self._join_nombre_area(resultado)
 
-            id_area = data.get('id_area')
-            if id_area:
-                area_doc = self.db.collection('areas').document(id_area).get()
-                data['NombreArea'] = area_doc.to_dict().get('nombre') if area_doc.exists else "N/A"
+    def get_nombres_areas_por_ids(self, ids_areas):
+        """
+        Resuelve {id_area: nombre} para varios IDs con un solo get_all.
+        Los IDs que no existen en Firestore se omiten del resultado.
+        """
+        ids_unicos = list(dict.fromkeys(i for i in ids_areas if i))
+        if not ids_unicos:
+            return {}
+        offline = self._desde_offline('get_nombres_areas_por_ids', ids_unicos)
+        if offline is not None:
+            return offline
+
+        # Primero lo que ya está en caché, solo pedimos a Firestore lo que falte
+        nombres = {}
+        faltantes = []
+        for id_area in ids_unicos:
+            nombre = self.cache.get('areas', ('nombre', id_area))
+            if isinstance(nombre, str):
+                nombres[id_area] = nombre
+            else:
+                faltantes.append(id_area)
+        if not faltantes:
+            return nombres
+
+        for doc in self.db.get_all(consultas.refs(self.db, 'areas', faltantes), field_paths=['nombre']):
+            if doc.exists:
+                nombres[doc.id] = doc.to_dict().get('nombre')
+                self.cache.set('areas', ('nombre', doc.id), nombres[doc.id])
+        return nombres
 
-            resultado.append(data)
-        return resultado
+    def _join_nombre_area(self, juegos):
+        # Llena nombre_area de cada juego usando una sola consulta para todas las áreas
+        nombres = self.get_nombres_areas_por_ids(j.id_area for j in juegos)
+        for juego in juegos:
+            juego.nombre_area = nombres.get(juego.id_area, "N/A")
+        return juegos
 
+    @si_agotado(list)
     def get_palabras_por_sopa(self, id_sopa):
-        docs = self.db.collection('palabras') \
-            .where('id_sopa', '==', id_sopa).stream()
-        return [doc.to_dict().get('palabra') for doc in docs]
+        offline = self._desde_offline('get_palabras_por_sopa', id_sopa)
+        if offline is not None:
+            return offline
+
+        return [doc.to_dict().get('palabra') for doc in consultas.q_palabras_sopa(self.db, id_sopa).stream()]
 
     def palabra_crucigrama(self, id_crucigrama):
-        # Traer todas las palabras y elegir una al azar en Python
-        docs = list(self.db.collection('palabras') \
-                    .where('id_crucigrama', '==', id_crucigrama) \
-                    .where('estado', '==', 'Activo').stream())
-
-        if docs:
-            elegida = random.choice(docs)
-            d = elegida.to_dict()
-            return {'palabra': d.get('palabra'), 'descripcion': d.get('descripcion')}
-        else:
-            raise Exception("No se encontró una palabra para este crucigrama.")
+        offline = self._desde_offline('palabra_crucigrama', id_crucigrama)
+        if offline is not None:
+            return offline
+
+        # Una sola palabra al azar usando el campo 'aleatorio'
+        docs = self._muestra_aleatoria(consultas.q_palabras_crucigrama(self.db, id_crucigrama), 1,
+                                       ('palabras', id_crucigrama))
+        return consultas.mapear_palabra_crucigrama(docs)
 
     def get_tema_by_id(self, id_tema):
-        doc = self.db.collection('temas').document(id_tema).get()
-        if doc.exists:
-            d = doc.to_dict()
-            d['ID_Tema'] = doc.id
-            d['Nombre'] = d.get('nombre')
-            return d
-        return None
+        offline = self._desde_offline('get_tema_by_id', id_tema)
+        if offline is not None:
+            return offline
+
+        def cargar():
+            return consultas.mapear_tema(self.db.collection('temas').document(id_tema).get())
+
+        return self.cache.get_or_load('temas', id_tema, cargar)
 
     # ==========================================
     #      MÉTODOS DE ESCRITURA (INSERT/UPDATE)
     # ==========================================
 
     def insert_reaction(self, reaction_id, video_id, user_id, tipo):
-        self.db.collection('reacciones').document(reaction_id).set({
-            "id_video": video_id,
-            "id_usuario": user_id,
-            "tipo": tipo,
-            "fecha": firestore.SERVER_TIMESTAMP,
-            "estado": "Activo"
-        })
-        # Actualización atómica de contador
+        self.db.collection('reacciones').document(reaction_id).set(consultas.datos_reaccion(video_id, user_id, tipo))
+        # Actualización atómica de contador (diferida si hay cola)
         if tipo == 'like':
-            self.db.collection('videos').document(video_id) \
-                .update({"cantidad_likes": firestore.Increment(1)})
+            self._incrementar_contador(video_id, "cantidad_likes", 1)
         elif tipo == 'dislike':
-            self.db.collection('videos').document(video_id) \
-                .update({"cantidad_dislikes": firestore.Increment(1)})
+            self._incrementar_contador(video_id, "cantidad_dislikes", 1)
 
     def delete_reaction(self, video_id, user_id):
-        docs = self.db.collection('reacciones') \
-            .where('id_video', '==', video_id) \
-            .where('id_usuario', '==', user_id).stream()
-
-        for doc in docs:
+        for doc in consultas.q_reacciones_usuario(self.db, video_id, user_id).stream():
             tipo = doc.to_dict().get('tipo')
             self.db.collection('reacciones').document(doc.id).delete()
 
             campo = "cantidad_likes" if tipo == "like" else "cantidad_dislikes"
-            self.db.collection('videos').document(video_id) \
-                .update({campo: firestore.Increment(-1)})
+            self._incrementar_contador(video_id, campo, -1)
+
+    def toggle_reaction(self, video_id, user_id, tipo):
+        """
+        Pone, cambia o quita la reacción del usuario en una sola transacción.
+        Los contadores se actualizan en el mismo commit, así no se desfasan.
+        Devuelve la reacción resultante ('Like', 'Dislike' o None).
+        """
+        reaccion_ref = self.db.collection('reacciones').document(consultas.id_reaccion(video_id, user_id))
+        # Reacciones creadas antes con un uuid como ID
+        legado_query = consultas.q_reacciones_usuario(self.db, video_id, user_id).limit(1)
+
+        @firestore.transactional
+        def aplicar(transaction):
+            snap = reaccion_ref.get(transaction=transaction)
+            anterior_ref, anterior = None, None
+            if snap.exists:
+                anterior_ref, anterior = reaccion_ref, snap.to_dict().get('tipo')
+            else:
+                for doc in legado_query.stream(transaction=transaction):
+                    anterior_ref, anterior = doc.reference, doc.to_dict().get('tipo')
+            return consultas.escribir_reaccion(transaction, self.db, reaccion_ref, anterior_ref, anterior,
+                                               video_id, user_id, tipo, self.fragmentos)
+
+        nuevo, deltas = aplicar(self.db.transaction())
+        if self.fragmentos is not None and deltas:
+            self.fragmentos.registrar_local(video_id, deltas)
+        return nuevo
 
     def incrementar_visualizacion(self, id_video):
-        self.db.collection('videos').document(id_video) \
-            .update({"visualizaciones": firestore.Increment(1)})
+        self._incrementar_contador(id_video, "visualizaciones", 1)
 
     def add_comment(self, comment_id, video_id, user_id, comment_text):
-        self.db.collection('comentarios').document(comment_id).set({
-            "comentario": comment_text,
-            "id_usuario": user_id,
-            "id_video": video_id,
-            "fecha": firestore.SERVER_TIMESTAMP,
-            "estado": "Activo"
-        })
+        self.db.collection('comentarios').document(comment_id).set(
+            consultas.datos_comentario(video_id, user_id, comment_text))
 
     def insert_or_update_usuario(self, id_usuario, id_campus, id_carrera):
         self.db.collection('usuarios').document(id_usuario).set({
@@ -322,41 +574,45 @@ class DatabaseHelper:
 
     def guardar_calificacion_por_tema(self, id_usuario, id_tema, calificacion, id_simulador, tiempo, id_resultado,
                                       fecha):
-        self.db.collection('resultados').document(id_resultado).set({
-            "id_usuario": id_usuario,
-            "id_tema": id_tema,
-            "calificacion": calificacion,
-            "id_simulador": id_simulador,
-            "tiempo": tiempo,
-            "fecha": fecha
-        })
+        self.db.collection('resultados').document(id_resultado).set(
+            consultas.datos_resultado(id_usuario, id_tema, calificacion, id_simulador, tiempo, fecha))
+
+    def guardar_resultados_simulador(self, id_usuario, id_simulador, tiempo, fecha, calificaciones, resumen=None):
+        """
+        Guarda la calificación de cada tema y, opcionalmente, un resumen del intento
+        en un solo WriteBatch. calificaciones: {id_tema: porcentaje}.
+        resumen: dict con datos extra del intento (correctas, total, calificacion...).
+        Devuelve el ID del intento o None si no se pidió resumen.
+        """
+        batch = self.db.batch()
+        id_intento = consultas.lote_resultados(self.db, batch, id_usuario, id_simulador, tiempo, fecha,
+                                               calificaciones, resumen)
+        batch.commit()
+        return id_intento
 
     def get_campus_by_id(self, id_campus):
-        # Busca el documento específico por ID
-        doc = self.db.collection('campus').document(id_campus).get()
-        if doc.exists:
-            d = doc.to_dict()
-            # Retornamos estructura compatible con tu main
-            return {"ID_Campus": doc.id, "Nombre": d.get('nombre')}
-        return None
+        def cargar():
+            # Busca el documento específico por ID; estructura compatible con tu main
+            return consultas.mapear_campus(self.db.collection('campus').document(id_campus).get())
+
+        return self.cache.get_or_load('campus', id_campus, cargar)
 
     def get_id_carrera_by_nombre(self, nombre_carrera):
         # Busca en la colección 'carreras' el documento que tenga ese nombre
-        docs = self.db.collection('carreras') \
-            .where(field_path='nombre', op_string='==', value=nombre_carrera) \
-            .limit(1).stream()
-
-        for doc in docs:
+        for doc in consultas.q_carrera_por_nombre(self.db, nombre_carrera).stream():
             return doc.id  # Retorna el ID del documento (ej: "ISO")
         return None
 
     def get_carrera_by_id(self, id_carrera):
-        doc = self.db.collection('carreras').document(id_carrera).get()
-        if doc.exists:
-            d = doc.to_dict()
-            # Retornamos el diccionario con 'Nombre' en mayúscula para compatibilidad
-            return {"ID_Carrera": doc.id, "Nombre": d.get('nombre')}
-        return None
+        offline = self._desde_offline('get_carrera_by_id', id_carrera)
+        if offline is not None:
+            return offline
+
+        def cargar():
+            # Diccionario con 'Nombre' en mayúscula para compatibilidad
+            return consultas.mapear_carrera(self.db.collection('carreras').document(id_carrera).get())
+
+        return self.cache.get_or_load('carreras', id_carrera, cargar)
 
     def update_video_counter(self, video_id, field, delta):
         """
@@ -364,20 +620,12 @@ class DatabaseHelper:
         field: Nombre del campo que venía de SQL (ej: 'Cantidad_Likes')
         delta: +1 o -1
         """
-        # Mapeo de nombres de columnas SQL a campos Firestore (minúsculas)
-        mapa_campos = {
-            "Cantidad_Likes": "cantidad_likes",
-            "Cantidad_Dislikes": "cantidad_dislikes",
-            "Visualizaciones": "visualizaciones"
-        }
-
         # Obtenemos el nombre correcto en Firestore
-        campo_firestore = mapa_campos.get(field)
+        campo_firestore = self.CAMPOS_CONTADOR.get(field)
 
         if campo_firestore:
-            self.db.collection('videos').document(video_id).update({
-                campo_firestore: firestore.Increment(delta)
-            })
+            # Se encola; el envío real ocurre en lote (ver CounterWriteBehind)
+            self._incrementar_contador(video_id, campo_firestore, delta)
         else:
             print(f"ERROR: Campo desconocido para contador: {field}")
 
@@ -0,0 +1,684 @@
+"""
+Firestore en memoria, para medir la capa de datos sin red ni credenciales.
+
+    from src.database.firestore_falso import ClienteFalso, usar_firestore_falso
+    db = usar_firestore_falso(ClienteFalso(latencia=0.03))  # 30 ms por viaje
+    helper = DatabaseHelper(client=db, escritura_diferida=False)
+
+usar_firestore_falso() también reemplaza firebase_admin y firebase_admin.firestore
+en los módulos diferidos (Increment, SERVER_TIMESTAMP, transactional,
+Query.DESCENDING, firestore.client()), así que get_firestore_client(), el
+importador y la sincronización funcionan contra el mismo cliente falso.
+
+Cubre lo que usan los helpers: collection/document/collection_group, where
+(==, !=, <, <=, >, >=, in, not-in, array_contains, array_contains_any),
+order_by, limit, start_after, select, stream/get, get_all, batch, transaction
+y on_snapshot. No exige índices ni aplica reglas; el cliente async no está.
+
+Las lecturas se cuentan como las cobra Firestore: una por documento devuelto,
+una por consulta vacía y una por referencia de get_all. La latencia se duerme
+una vez por viaje (consulta, get, get_all, commit) más `latencia_por_doc` por
+documento devuelto. El falso filtra recorriendo los candidatos (Firestore usa
+índices): lo que tarda en eso se acumula en `tiempo_interno` para poder
+descontarlo de las mediciones.
+"""
+import datetime
+import functools
+import threading
+import time
+import types
+import uuid
+
+
+# ==========================================
+#      CENTINELAS Y TRANSFORMACIONES
+# ==========================================
+
+class _Centinela:
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __repr__(self):
+        return self.nombre
+
+
+SERVER_TIMESTAMP = _Centinela("SERVER_TIMESTAMP")
+DELETE_FIELD = _Centinela("DELETE_FIELD")
+_FALTA = _Centinela("FALTA")
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+class NoEncontrado(Exception):
+    """update() sobre un documento que no existe (el SDK levanta NotFound)."""
+
+
+class ArgumentoInvalido(Exception):
+    """Lo que Firestore rechazaría, p. ej. un batch de más de 500 operaciones."""
+
+
+MAX_OPERACIONES_BATCH = 500
+
+
+def _copiar(valor):
+    # Copia de dicts y listas (los valores hoja son inmutables); más barata que deepcopy
+    if isinstance(valor, dict):
+        return {k: _copiar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_copiar(v) for v in valor]
+    return valor
+
+
+def _leer_ruta(datos, campo):
+    valor = datos
+    for clave in campo.split('.'):
+        if not isinstance(valor, dict) or clave not in valor:
+            return _FALTA
+        valor = valor[clave]
+    return valor
+
+
+def _proyectar(datos, campos):
+    resultado = {}
+    for campo in campos:
+        valor = _leer_ruta(datos, campo)
+        if valor is _FALTA:
+            continue
+        destino = resultado
+        *ruta, ultima = campo.split('.')
+        for clave in ruta:
+            destino = destino.setdefault(clave, {})
+        destino[ultima] = _copiar(valor)
+    return resultado
+
+
+def _resolver(valor, anterior, ahora):
+    if valor is SERVER_TIMESTAMP:
+        return ahora
+    if isinstance(valor, Increment):
+        base = anterior if isinstance(anterior, (int, float)) and not isinstance(anterior, bool) else 0
+        return base + valor.value
+    if isinstance(valor, dict):
+        return {k: _resolver(v, _FALTA, ahora) for k, v in valor.items() if v is not DELETE_FIELD}
+    return valor
+
+
+def _fusionar(destino, cambios, ahora):
+    """set(merge=True): los mapas se mezclan campo a campo; devuelve un dict nuevo."""
+    resultado = dict(destino)
+    for clave, valor in cambios.items():
+        if valor is DELETE_FIELD:
+            resultado.pop(clave, None)
+        elif isinstance(valor, dict) and isinstance(resultado.get(clave), dict):
+            resultado[clave] = _fusionar(resultado[clave], valor, ahora)
+        else:
+            resultado[clave] = _resolver(valor, resultado.get(clave, _FALTA), ahora)
+    return resultado
+
+
+def _actualizar(destino, cambios, ahora):
+    """update(): las claves son rutas ('opciones.a') y un mapa reemplaza al anterior."""
+    resultado = dict(destino)
+    for campo, valor in cambios.items():
+        *ruta, ultima = campo.split('.')
+        nodo = resultado
+        for clave in ruta:
+            hijo = nodo.get(clave)
+            nodo[clave] = dict(hijo) if isinstance(hijo, dict) else {}
+            nodo = nodo[clave]
+        if valor is DELETE_FIELD:
+            nodo.pop(ultima, None)
+        else:
+            nodo[ultima] = _resolver(valor, nodo.get(ultima, _FALTA), ahora)
+    return resultado
+
+
+# ==========================================
+#      COMPARACIÓN (ORDEN DE TIPOS DE FIRESTORE)
+# ==========================================
+
+def _clave_valor(valor):
+    if valor is None:
+        return (0, 0)
+    if isinstance(valor, bool):
+        return (1, valor)
+    if isinstance(valor, (int, float)):
+        return (2, valor)
+    if isinstance(valor, datetime.datetime):
+        if valor.tzinfo is None:
+            valor = valor.replace(tzinfo=datetime.timezone.utc)
+        return (3, valor)
+    if isinstance(valor, str):
+        return (4, valor)
+    if isinstance(valor, bytes):
+        return (5, valor)
+    if isinstance(valor, list):
+        return (8, [_clave_valor(v) for v in valor])
+    return (9, repr(valor))
+
+
+def _comparar(a, b):
+    return (a > b) - (a < b)
+
+
+def _cumple(valor, operador, esperado):
+    if valor is _FALTA:
+        return False
+    if operador == '==':
+        return _clave_valor(valor) == _clave_valor(esperado)
+    if operador == '!=':
+        return valor is not None and _clave_valor(valor) != _clave_valor(esperado)
+    if operador in ('<', '<=', '>', '>='):
+        a, b = _clave_valor(valor), _clave_valor(esperado)
+        if a[0] != b[0]:
+            return False
+        return {'<': a < b, '<=': a <= b, '>': a > b, '>=': a >= b}[operador]
+    if operador == 'in':
+        return any(_clave_valor(valor) == _clave_valor(e) for e in esperado)
+    if operador == 'not-in':
+        return valor is not None and all(_clave_valor(valor) != _clave_valor(e) for e in esperado)
+    if operador in ('array_contains', 'array-contains'):
+        return isinstance(valor, list) and esperado in valor
+    if operador in ('array_contains_any', 'array-contains-any'):
+        return isinstance(valor, list) and any(e in valor for e in esperado)
+    raise ArgumentoInvalido(f"Operador no soportado: {operador}")
+
+
+def _hashable(valor):
+    try:
+        hash(valor)
+    except TypeError:
+        return False
+    return not isinstance(valor, (bool, float))  # True == 1 y 1.0 == 1 mezclarían buckets
+
+
+# ==========================================
+#      DOCUMENTOS Y SNAPSHOTS
+# ==========================================
+
+class SnapshotFalso:
+    def __init__(self, reference, datos):
+        self.reference = reference
+        self._data = datos
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return _copiar(self._data) if self._data is not None else None
+
+    def get(self, campo):
+        valor = _leer_ruta(self._data or {}, campo)
+        if valor is _FALTA:
+            raise KeyError(campo)
+        return _copiar(valor)
+
+
+class DocumentoFalso:
+    def __init__(self, cliente, ruta_coleccion, doc_id):
+        self._cliente = cliente
+        self._ruta_coleccion = ruta_coleccion
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._ruta_coleccion}/{self.id}"
+
+    @property
+    def parent(self):
+        return ColeccionFalsa(self._cliente, self._ruta_coleccion)
+
+    def collection(self, nombre):
+        return ColeccionFalsa(self._cliente, f"{self.path}/{nombre}")
+
+    def get(self, field_paths=None, transaction=None):
+        return next(self._cliente._leer_documentos([self], field_paths))
+
+    def set(self, datos, merge=False):
+        self._cliente._escribir([('set', self, datos, merge)])
+
+    def create(self, datos):
+        self._cliente._escribir([('create', self, datos, False)])
+
+    def update(self, datos):
+        self._cliente._escribir([('update', self, datos, False)])
+
+    def delete(self):
+        self._cliente._escribir([('delete', self, None, False)])
+
+    def __eq__(self, otro):
+        return isinstance(otro, DocumentoFalso) and otro._cliente is self._cliente and otro.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"<DocumentoFalso {self.path}>"
+
+
+# ==========================================
+#      CONSULTAS
+# ==========================================
+
+class ConsultaFalsa:
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, cliente, ruta, grupo=False, filtros=(), orden=(), limite=None, despues_de=None,
+                 campos=None):
+        self._cliente = cliente
+        self._ruta = ruta      # ruta de la colección, o su nombre si grupo=True
+        self._grupo = grupo
+        self._filtros = filtros
+        self._orden = orden
+        self._limite = limite
+        self._despues_de = despues_de
+        self._campos = campos
+
+    def _con(self, **cambios):
+        actual = dict(filtros=self._filtros, orden=self._orden, limite=self._limite,
+                      despues_de=self._despues_de, campos=self._campos)
+        actual.update(cambios)
+        return ConsultaFalsa(self._cliente, self._ruta, self._grupo, **actual)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._con(filtros=self._filtros + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._con(orden=self._orden + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._con(limite=count)
+
+    def start_after(self, cursor):
+        return self._con(despues_de=cursor)
+
+    def select(self, field_paths):
+        return self._con(campos=tuple(field_paths))
+
+    def stream(self, transaction=None):
+        docs = self._cliente._consultar(self)
+        for doc in docs:
+            yield doc
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction=transaction))
+
+
+class ColeccionFalsa(ConsultaFalsa):
+    def __init__(self, cliente, ruta):
+        super().__init__(cliente, ruta)
+
+    @property
+    def id(self):
+        return self._ruta.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return DocumentoFalso(self._cliente, self._ruta, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, datos, document_id=None):
+        ref = self.document(document_id)
+        ref.set(datos)
+        return datetime.datetime.now(datetime.timezone.utc), ref
+
+    def on_snapshot(self, callback):
+        """Avisa de cada commit que toque la colección (el primer aviso trae todo como ADDED)."""
+        return self._cliente._escuchar(self._ruta, callback)
+
+
+class _Cambio:
+    def __init__(self, tipo, documento):
+        self.type = tipo
+        self.document = documento
+
+
+class _Escucha:
+    def __init__(self, cliente, ruta, callback):
+        self._cliente = cliente
+        self.ruta = ruta
+        self.callback = callback
+
+    def unsubscribe(self):
+        with self._cliente._lock:
+            if self in self._cliente._escuchas:
+                self._cliente._escuchas.remove(self)
+
+
+# ==========================================
+#      ESCRITURAS AGRUPADAS
+# ==========================================
+
+class LoteFalso:
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self._write_pbs = []  # Mismo nombre que en el SDK: metricas cuenta las escrituras con él
+
+    def set(self, referencia, datos, merge=False):
+        self._write_pbs.append(('set', referencia, datos, merge))
+
+    def create(self, referencia, datos):
+        self._write_pbs.append(('create', referencia, datos, False))
+
+    def update(self, referencia, datos):
+        self._write_pbs.append(('update', referencia, datos, False))
+
+    def delete(self, referencia):
+        self._write_pbs.append(('delete', referencia, None, False))
+
+    def commit(self):
+        if len(self._write_pbs) > MAX_OPERACIONES_BATCH:
+            raise ArgumentoInvalido(f"Un batch admite {MAX_OPERACIONES_BATCH} operaciones "
+                                    f"(llegaron {len(self._write_pbs)}).")
+        operaciones, self._write_pbs = self._write_pbs, []
+        return self._cliente._escribir(operaciones)
+
+
+class TransaccionFalsa(LoteFalso):
+    def _commit(self):
+        return self.commit()
+
+
+def transactional(funcion):
+    """Como firestore.transactional; sin reintentos: las transacciones del falso se serializan."""
+    @functools.wraps(funcion)
+    def envoltura(transaccion, *args, **kwargs):
+        with transaccion._cliente._lock_transacciones:
+            resultado = funcion(transaccion, *args, **kwargs)
+            transaccion._commit()
+        return resultado
+    return envoltura
+
+
+# ==========================================
+#      CLIENTE
+# ==========================================
+
+class ClienteFalso:
+    def __init__(self, latencia=0.0, latencia_por_doc=0.0):
+        self.latencia = latencia
+        self.latencia_por_doc = latencia_por_doc
+
+        self._lock = threading.RLock()
+        self._lock_transacciones = threading.RLock()
+        # ruta de colección -> {doc_id: datos}. Los datos guardados nunca se modifican
+        # en su lugar (cada escritura arma un dict nuevo): los snapshots los comparten
+        # y to_dict() entrega la copia.
+        self._colecciones = {}
+        self._indices = {}      # ruta -> {campo: {valor: set(doc_ids)}}, se llenan al consultar
+        self._escuchas = []
+
+        # Métricas
+        self.lecturas = 0
+        self.escrituras = 0
+        self.viajes = 0
+        self.tiempo_interno = 0.0  # segundos de trabajo propio del falso (sin la latencia inyectada)
+
+    # --- API del SDK ---
+
+    def collection(self, ruta):
+        return ColeccionFalsa(self, ruta.strip('/'))
+
+    def document(self, ruta):
+        ruta_coleccion, doc_id = ruta.strip('/').rsplit('/', 1)
+        return DocumentoFalso(self, ruta_coleccion, doc_id)
+
+    def collection_group(self, nombre):
+        return ConsultaFalsa(self, nombre, grupo=True)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        yield from self._leer_documentos(list(references), field_paths)
+
+    def batch(self):
+        return LoteFalso(self)
+
+    def transaction(self, **kwargs):
+        return TransaccionFalsa(self)
+
+    def close(self):
+        pass
+
+    # --- Carga directa y contadores (para sembrar y medir) ---
+
+    def sembrar(self, ruta, documentos):
+        """Guarda {doc_id: datos} tal cual, sin cobrar escrituras ni avisar a las escuchas."""
+        with self._lock:
+            coleccion = self._colecciones.setdefault(ruta, {})
+            coleccion.update(documentos)
+            self._indices.pop(ruta, None)
+
+    def datos(self, ruta):
+        """Documentos guardados de una colección ({doc_id: datos}); no copiar ni modificar."""
+        return self._colecciones.get(ruta, {})
+
+    def contadores(self):
+        return {"lecturas": self.lecturas, "escrituras": self.escrituras, "viajes": self.viajes,
+                "tiempo_interno": self.tiempo_interno}
+
+    def reiniciar_contadores(self):
+        with self._lock:
+            self.lecturas = self.escrituras = self.viajes = 0
+            self.tiempo_interno = 0.0
+
+    def total_documentos(self):
+        with self._lock:
+            return sum(len(docs) for docs in self._colecciones.values())
+
+    # --- Implementación ---
+
+    def _esperar(self, documentos):
+        demora = self.latencia + self.latencia_por_doc * documentos
+        if demora > 0:
+            time.sleep(demora)
+
+    def _leer_documentos(self, refs, campos):
+        with self._lock:
+            inicio = time.perf_counter()
+            snapshots = []
+            for ref in refs:
+                datos = self._colecciones.get(ref._ruta_coleccion, {}).get(ref.id)
+                if datos is not None:
+                    datos = _proyectar(datos, campos) if campos is not None else datos
+                snapshots.append(SnapshotFalso(ref, datos))
+            self.lecturas += len(refs)
+            self.viajes += 1
+            self.tiempo_interno += time.perf_counter() - inicio
+        self._esperar(len(refs))
+        return iter(snapshots)
+
+    def _indice(self, ruta, campo):
+        # Se llama con el lock tomado
+        por_campo = self._indices.setdefault(ruta, {})
+        indice = por_campo.get(campo)
+        if indice is None:
+            indice = por_campo[campo] = {}
+            for doc_id, datos in self._colecciones.get(ruta, {}).items():
+                valor = _leer_ruta(datos, campo)
+                if valor is not _FALTA and _hashable(valor):
+                    indice.setdefault(valor, set()).add(doc_id)
+        return indice
+
+    def _candidatos(self, ruta, filtros):
+        # Usa el primer filtro de igualdad (o 'in') para no recorrer toda la colección
+        for campo, operador, valor in filtros:
+            if operador == '==' and _hashable(valor):
+                return self._indice(ruta, campo).get(valor, ())
+            if operador == 'in' and all(_hashable(v) for v in valor):
+                indice = self._indice(ruta, campo)
+                return set().union(*(indice.get(v, ()) for v in valor))
+        return self._colecciones.get(ruta, {}).keys()
+
+    def _consultar(self, consulta):
+        with self._lock:
+            inicio = time.perf_counter()
+            if consulta._grupo:
+                rutas = [r for r in self._colecciones if r.rsplit('/', 1)[-1] == consulta._ruta]
+            else:
+                rutas = [consulta._ruta]
+
+            encontrados = []
+            for ruta in rutas:
+                documentos = self._colecciones.get(ruta, {})
+                for doc_id in self._candidatos(ruta, consulta._filtros):
+                    datos = documentos[doc_id]
+                    if all(_cumple(_leer_ruta(datos, c), op, v) for c, op, v in consulta._filtros):
+                        encontrados.append((ruta, doc_id, datos))
+
+            # Firestore deja fuera los documentos sin el campo de orden y desempata por ruta
+            orden = consulta._orden
+            if orden:
+                encontrados = [e for e in encontrados if all(_leer_ruta(e[2], c) is not _FALTA for c, _ in orden)]
+            self._ordenar(encontrados, orden)
+
+            if consulta._despues_de is not None:
+                cursor = self._posicion_cursor(consulta._despues_de, orden)
+                encontrados = [e for e in encontrados if self._comparar_docs(e, cursor, orden) > 0]
+            if consulta._limite is not None:
+                encontrados = encontrados[:consulta._limite]
+
+            snapshots = []
+            for ruta, doc_id, datos in encontrados:
+                datos = _proyectar(datos, consulta._campos) if consulta._campos is not None else datos
+                snapshots.append(SnapshotFalso(DocumentoFalso(self, ruta, doc_id), datos))
+            self.lecturas += max(len(snapshots), 1)
+            self.viajes += 1
+            self.tiempo_interno += time.perf_counter() - inicio
+        self._esperar(len(snapshots))
+        return snapshots
+
+    @staticmethod
+    def _ordenar(encontrados, orden):
+        # Ordenamientos estables del último criterio al primero (más barato que cmp_to_key)
+        descendente = bool(orden) and orden[-1][1] == ConsultaFalsa.DESCENDING
+        encontrados.sort(key=lambda e: (e[0], e[1]), reverse=descendente)
+        for campo, direccion in reversed(orden):
+            encontrados.sort(key=lambda e: _clave_valor(_leer_ruta(e[2], campo)),
+                             reverse=direccion == ConsultaFalsa.DESCENDING)
+
+    @staticmethod
+    def _comparar_docs(a, b, orden):
+        for campo, direccion in orden:
+            resultado = _comparar(_clave_valor(_leer_ruta(a[2], campo)), _clave_valor(_leer_ruta(b[2], campo)))
+            if resultado:
+                return -resultado if direccion == ConsultaFalsa.DESCENDING else resultado
+        resultado = _comparar((a[0], a[1]), (b[0], b[1]))
+        if orden and orden[-1][1] == ConsultaFalsa.DESCENDING:
+            return -resultado
+        return resultado
+
+    def _posicion_cursor(self, cursor, orden):
+        if isinstance(cursor, SnapshotFalso):
+            ref = cursor.reference
+            # Un snapshot de una proyección puede no traer el campo de orden: se toma el guardado
+            datos = self._colecciones.get(ref._ruta_coleccion, {}).get(ref.id) or cursor._data or {}
+            return ref._ruta_coleccion, ref.id, datos
+        return '', '', dict(cursor)
+
+    def _escribir(self, operaciones):
+        ahora = datetime.datetime.now(datetime.timezone.utc)
+        avisos = []
+        with self._lock:
+            inicio = time.perf_counter()
+            # Se valida todo antes de aplicar: un commit es todo o nada
+            for tipo, ref, _, _ in operaciones:
+                existe = ref.id in self._colecciones.get(ref._ruta_coleccion, {})
+                if tipo == 'update' and not existe:
+                    raise NoEncontrado(f"404 No document to update: {ref.path}")
+                if tipo == 'create' and existe:
+                    raise ArgumentoInvalido(f"409 Document already exists: {ref.path}")
+
+            for tipo, ref, datos, merge in operaciones:
+                coleccion = self._colecciones.setdefault(ref._ruta_coleccion, {})
+                anterior = coleccion.get(ref.id)
+                if tipo == 'delete':
+                    nuevo = None
+                elif tipo == 'update':
+                    nuevo = _actualizar(anterior, datos, ahora)
+                elif merge and anterior is not None:
+                    nuevo = _fusionar(anterior, datos, ahora)
+                else:
+                    nuevo = _resolver(datos, _FALTA, ahora)
+
+                if nuevo is None:
+                    coleccion.pop(ref.id, None)
+                else:
+                    coleccion[ref.id] = nuevo
+                self._reindexar(ref._ruta_coleccion, ref.id, anterior, nuevo)
+
+                if anterior is not None or nuevo is not None:
+                    cambio = 'REMOVED' if nuevo is None else ('ADDED' if anterior is None else 'MODIFIED')
+                    avisos.extend((escucha, _Cambio(cambio, SnapshotFalso(ref, _copiar(nuevo))))
+                                  for escucha in self._escuchas if escucha.ruta == ref._ruta_coleccion)
+            self.escrituras += len(operaciones)
+            self.viajes += 1
+            self.tiempo_interno += time.perf_counter() - inicio
+        self._esperar(0)
+
+        for escucha, cambio in avisos:
+            escucha.callback([], [cambio], ahora)
+        return [ahora] * len(operaciones)
+
+    def _reindexar(self, ruta, doc_id, anterior, nuevo):
+        # Se llama con el lock tomado
+        for campo, indice in self._indices.get(ruta, {}).items():
+            for datos, agregar in ((anterior, False), (nuevo, True)):
+                if datos is None:
+                    continue
+                valor = _leer_ruta(datos, campo)
+                if valor is _FALTA or not _hashable(valor):
+                    continue
+                if agregar:
+                    indice.setdefault(valor, set()).add(doc_id)
+                else:
+                    ids = indice.get(valor)
+                    if ids is not None:
+                        ids.discard(doc_id)
+
+    def _escuchar(self, ruta, callback):
+        escucha = _Escucha(self, ruta, callback)
+        with self._lock:
+            self._escuchas.append(escucha)
+            docs = [SnapshotFalso(DocumentoFalso(self, ruta, doc_id), _copiar(datos))
+                    for doc_id, datos in self._colecciones.get(ruta, {}).items()]
+        callback(docs, [_Cambio('ADDED', doc) for doc in docs], datetime.datetime.now(datetime.timezone.utc))
+        return escucha
+
+
+# ==========================================
+#      SUSTITUCIÓN DE firebase_admin
+# ==========================================
+
+def usar_firestore_falso(cliente=None):
+    """
+    Hace que los módulos diferidos firebase_admin y firebase_admin.firestore
+    apunten a este módulo y que firestore.client() devuelva `cliente`.
+    Devuelve el cliente (uno nuevo sin latencia si no se pasa).
+    """
+    from src.arranque import sustituir_modulo
+
+    cliente = cliente if cliente is not None else ClienteFalso()
+
+    modulo_firestore = types.ModuleType("firebase_admin.firestore")
+    modulo_firestore.Increment = Increment
+    modulo_firestore.SERVER_TIMESTAMP = SERVER_TIMESTAMP
+    modulo_firestore.DELETE_FIELD = DELETE_FIELD
+    modulo_firestore.Query = ConsultaFalsa
+    modulo_firestore.transactional = transactional
+    modulo_firestore.client = lambda app=None: cliente
+
+    modulo_firebase = types.ModuleType("firebase_admin")
+    modulo_firebase._apps = {"[DEFAULT]": None}  # _inicializar_firebase no busca credenciales
+    modulo_firebase.firestore = modulo_firestore
+
+    sustituir_modulo("firebase_admin", modulo_firebase)
+    sustituir_modulo("firebase_admin.firestore", modulo_firestore)
+    return cliente
@@ -0,0 +1,293 @@
+"""
+Generador de contenido sintético con el esquema de assets/csv, para pruebas de escala.
+
+    python -m src.database.generador /tmp/egel --perfil egel      # 100k preguntas, 5k videos, 1M comentarios, 10M resultados
+    python -m src.database.generador /tmp/demo --preguntas 20000 --comentarios 50000 --semilla 7
+
+El catálogo (campus, carreras, carrera_campus, áreas) se copia de assets/csv
+para que la app se pueda navegar igual; lo demás se genera sobre esas áreas:
+tema, video, pregunta, simulador, sopa, crucigrama, palabra, comentario y
+resultado. Todo es referencialmente consistente (cada pregunta, video,
+palabra y juego cae en un área que existe; cada comentario en un video
+generado; cada resultado en un tema del área de su simulador).
+
+La popularidad es sesgada (Zipf): unas pocas áreas concentran la mayoría de
+videos y preguntas, y unos pocos videos la mayoría de vistas, likes y
+comentarios; lo mismo con los usuarios que más comentan y más exámenes hacen.
+Los textos se toman de los CSV reales (con un sufijo de variante) para que el
+tamaño de los documentos se parezca al de producción.
+
+Las filas se escriben en streaming: 10M resultados no se guardan en memoria.
+La salida se carga con el importador o el benchmark (resultado.csv no está en
+las FUENTES del importador: queda para cargarlo aparte cuando se necesite):
+
+    python -m src.database.importador --csv-dir /tmp/egel
+    python -m src.database.benchmark --csv-dir /tmp/egel --escalas 1
+"""
+import argparse
+import bisect
+import csv
+import datetime
+import os
+import random
+import shutil
+import time
+
+from src.database.importador import CSV_DIR, _leer
+
+
+PERFILES = {
+    'demo': dict(preguntas=10_000, videos=500, palabras=2_000, comentarios=50_000, resultados=200_000,
+                 usuarios=2_000, temas_por_area=8),
+    'egel': dict(preguntas=100_000, videos=5_000, palabras=20_000, comentarios=1_000_000, resultados=10_000_000,
+                 usuarios=100_000, temas_por_area=12),
+}
+
+# Exponentes de Zipf: más alto = más concentrado en los primeros del ranking
+SESGO_AREAS = 0.8
+SESGO_VIDEOS = 1.1
+SESGO_USUARIOS = 1.0
+
+# Se copian tal cual: sin ellos la app no tiene qué mostrar en la bienvenida
+CATALOGO = ('campus.csv', 'carrera.csv', 'carrera_campus.csv', 'area.csv')
+
+PALABRAS_JUEGO = 4          # Cantidad_Palabras de cada sopa y crucigrama, como en los CSV actuales
+LONGITUD_SIMULADOR = 50
+DIAS_HISTORIA = 730         # Fechas de comentarios y resultados: últimos dos años, más densas al final
+PROPORCION_INACTIVOS = 0.02
+PROPORCION_PREGUNTAS_CON_VIDEO = 0.4
+
+ENCABEZADOS = {
+    'tema.csv': ['ID_Tema', 'Nombre', 'ID_Area', 'Estado'],
+    'video.csv': ['ID_Video', 'Nombre', 'Descripción', 'URL_Video', 'Duración', 'Visualizaciones',
+                  'Cantidad_Likes', 'Cantidad_Dislikes', 'Estado', 'ID_Area'],
+    'pregunta.csv': ['ID_Pregunta', 'Pregunta', 'Opcion_A', 'Opcion_B', 'Opcion_C', 'Opcion_Correcta',
+                     'Comentario_A', 'Comentario_B', 'Comentario_C', 'Comentario_Correcta', 'Estado',
+                     'ID_Video', 'ID_Area', 'ID_Tema'],
+    'simulador.csv': ['ID_Simulador', 'Longitud', 'Estado', 'ID_Carrera', 'ID_Area'],
+    'sopa.csv': ['ID_Sopa', 'Cantidad_Palabras', 'Estado', 'ID_Area', 'ID_Carrera'],
+    'crucigrama.csv': ['ID_Crucigrama', 'Cantidad_Palabras', 'Estado', 'ID_Area', 'ID_Carrera'],
+    'palabra.csv': ['ID_Palabra', 'Longitud', 'Palabra', 'Descripción', 'Estado', 'ID_Area', 'ID_Sopa',
+                    'ID_Crucigrama'],
+    'comentario.csv': ['ID_Comentario', 'Comentario', 'Fecha', 'Estado', 'ID_Usuario', 'ID_Video'],
+    'resultado.csv': ['ID_Resultado', 'Calificacion', 'Tiempo', 'Fecha', 'ID_Tema', 'ID_Usuario', 'ID_Simulador'],
+}
+
+
+class _Zipf:
+    """Elige índices 0..n-1 con probabilidad proporcional a 1 / (rango + 1) ** s."""
+
+    def __init__(self, n, s, rng):
+        self._rng = rng
+        self._acumulado = []
+        total = 0.0
+        for rango in range(1, n + 1):
+            total += 1.0 / rango ** s
+            self._acumulado.append(total)
+        self._total = total
+
+    def elegir(self):
+        return bisect.bisect_left(self._acumulado, self._rng.random() * self._total)
+
+
+class GeneradorContenido:
+    def __init__(self, destino, preguntas, videos, palabras, comentarios, resultados, usuarios, temas_por_area,
+                 semilla=0, origen=CSV_DIR):
+        self.destino = destino
+        self.origen = origen
+        self.cantidades = dict(preguntas=preguntas, videos=videos, palabras=palabras, comentarios=comentarios,
+                               resultados=resultados)
+        self.usuarios = usuarios
+        self.temas_por_area = temas_por_area
+        self.rng = random.Random(semilla)
+        self.hoy = datetime.date.today()
+
+        # Textos reales que sirven de semilla
+        self.semillas_pregunta = list(self._leer('pregunta.csv'))
+        self.semillas_video = list(self._leer('video.csv'))
+        self.semillas_palabra = [f for f in self._leer('palabra.csv') if f.get('Palabra')]
+        self.semillas_comentario = [f['Comentario'] for f in self._leer('comentario.csv') if f.get('Comentario')]
+        self.semillas_tema = list(self._leer('tema.csv'))
+
+        self.areas = [(f['ID_Area'], f.get('ID_Carrera')) for f in self._leer('area.csv')
+                      if f.get('ID_Area') and f.get('Estado') == 'Activo']
+        if not self.areas:
+            raise ValueError(f"No hay áreas activas en {self.origen}/area.csv")
+        self.zipf_areas = _Zipf(len(self.areas), SESGO_AREAS, self.rng)
+        self.zipf_usuarios = _Zipf(usuarios, SESGO_USUARIOS, self.rng)
+
+        # Se llenan al generar; lo justo para mantener las referencias
+        self.temas_por_area_id = {}
+        self.videos_por_area = {}
+        self.ranking_videos = []   # IDs de video, del más popular al menos
+        self.simuladores = []      # (id_simulador, id_area)
+
+    def _leer(self, archivo):
+        ruta = os.path.join(self.origen, archivo)
+        return _leer(ruta) if os.path.exists(ruta) else iter(())
+
+    # --- utilidades ---
+
+    def _estado(self):
+        return 'Inactivo' if self.rng.random() < PROPORCION_INACTIVOS else 'Activo'
+
+    def _area(self):
+        return self.areas[self.zipf_areas.elegir()]
+
+    def _usuario(self):
+        return f"US{self.zipf_usuarios.elegir() + 1:07d}"
+
+    def _fecha(self):
+        # rng ** 2 junta las fechas hacia hoy: hay más actividad reciente
+        return (self.hoy - datetime.timedelta(days=int(DIAS_HISTORIA * self.rng.random() ** 2))).isoformat()
+
+    def _escribir(self, archivo, filas):
+        inicio = time.perf_counter()
+        n = 0
+        with open(os.path.join(self.destino, archivo), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(ENCABEZADOS[archivo])
+            for fila in filas:
+                writer.writerow(fila)
+                n += 1
+                if n % 1_000_000 == 0:
+                    print(f"   ... {archivo}: {n} filas")
+        print(f" - {archivo}: {n} filas en {time.perf_counter() - inicio:.1f} s")
+        return n
+
+    # --- generadores por archivo ---
+
+    def _temas(self):
+        for id_area, _ in self.areas:
+            reales = [f for f in self.semillas_tema if f.get('ID_Area') == id_area]
+            ids = []
+            for n in range(self.temas_por_area):
+                if n < len(reales):
+                    id_tema, nombre = reales[n]['ID_Tema'], reales[n]['Nombre']
+                else:
+                    id_tema, nombre = f"TEM-{id_area}-{n + 1:02d}", f"Tema {n + 1} de {id_area}"
+                ids.append(id_tema)
+                yield [id_tema, nombre, id_area, 'Activo']
+            self.temas_por_area_id[id_area] = ids
+
+    def _videos(self):
+        total = self.cantidades['videos']
+        ids = [f"VID{n + 1:06d}" for n in range(total)]
+        self.ranking_videos = self.rng.sample(ids, len(ids))
+        rango = {id_video: r for r, id_video in enumerate(self.ranking_videos)}
+        for id_video in ids:
+            id_area, _ = self._area()
+            semilla = self.rng.choice(self.semillas_video)
+            # Vistas según el lugar en el ranking (ley de potencia), likes/dislikes en proporción
+            vistas = int(200_000 / (rango[id_video] + 1) ** SESGO_VIDEOS) + self.rng.randint(0, 20)
+            likes = int(vistas * self.rng.uniform(0.02, 0.1))
+            dislikes = int(likes * self.rng.uniform(0.0, 0.2))
+            estado = self._estado()
+            if estado == 'Activo':
+                self.videos_por_area.setdefault(id_area, []).append(id_video)
+            yield [id_video, f"{semilla.get('Nombre')} ({id_video})", semilla.get('Descripción'),
+                   f"Video{id_video}", self.rng.randint(3, 45), vistas, likes, dislikes, estado, id_area]
+
+    def _preguntas(self):
+        # Dentro de un área, las preguntas se cuelgan más de los videos populares
+        zipf_por_area = {id_area: _Zipf(len(videos), SESGO_VIDEOS, self.rng)
+                         for id_area, videos in self.videos_por_area.items()}
+        for n in range(self.cantidades['preguntas']):
+            id_area, _ = self._area()
+            s = self.rng.choice(self.semillas_pregunta)
+            id_video = 'no aplica'
+            videos = self.videos_por_area.get(id_area)
+            if videos and self.rng.random() < PROPORCION_PREGUNTAS_CON_VIDEO:
+                id_video = videos[zipf_por_area[id_area].elegir()]
+            yield [f"PREG{n + 1:07d}", f"{(s.get('Pregunta') or '').strip()} (v{n + 1})",
+                   s.get('Opcion_A'), s.get('Opcion_B'), s.get('Opcion_C'), s.get('Opcion_Correcta'),
+                   s.get('Comentario_A'), s.get('Comentario_B'), s.get('Comentario_C'), s.get('Comentario_Correcta'),
+                   self._estado(), id_video, id_area, self.rng.choice(self.temas_por_area_id[id_area])]
+
+    def _simuladores(self):
+        for n, (id_area, id_carrera) in enumerate(self.areas):
+            id_simulador = f"SIM{n + 1:04d}"
+            self.simuladores.append((id_simulador, id_area))
+            yield [id_simulador, LONGITUD_SIMULADOR, 'Activo', id_carrera, id_area]
+
+    def _juegos_y_palabras(self):
+        """Agrupa las palabras de a PALABRAS_JUEGO; cada grupo es una sopa y un crucigrama de la misma área."""
+        sopas, crucigramas, palabras = [], [], []
+        for n in range(self.cantidades['palabras']):
+            if n % PALABRAS_JUEGO == 0:
+                id_area, id_carrera = self._area()
+                grupo = n // PALABRAS_JUEGO + 1
+                id_sopa, id_crucigrama = f"SOP{grupo:06d}", f"CRUC{grupo:06d}"
+                estado = self._estado()
+                sopas.append([id_sopa, PALABRAS_JUEGO, estado, id_area, id_carrera])
+                crucigramas.append([id_crucigrama, PALABRAS_JUEGO, estado, id_area, id_carrera])
+            s = self.rng.choice(self.semillas_palabra)
+            palabra = s['Palabra'].strip().upper()
+            palabras.append([f"PALB{n + 1:07d}", len(palabra), palabra, s.get('Descripción'), 'Activo',
+                             id_area, id_sopa, id_crucigrama])
+        return sopas, crucigramas, palabras
+
+    def _comentarios(self):
+        if not self.ranking_videos:
+            return
+        zipf_videos = _Zipf(len(self.ranking_videos), SESGO_VIDEOS, self.rng)
+        for n in range(self.cantidades['comentarios']):
+            yield [f"COM{n + 1:08d}", self.rng.choice(self.semillas_comentario).strip(), self._fecha(),
+                   self._estado(), self._usuario(), self.ranking_videos[zipf_videos.elegir()]]
+
+    def _resultados(self):
+        zipf_simuladores = _Zipf(len(self.simuladores), SESGO_AREAS, self.rng)
+        for n in range(self.cantidades['resultados']):
+            id_simulador, id_area = self.simuladores[zipf_simuladores.elegir()]
+            calificacion = max(0, min(100, int(self.rng.gauss(68, 18))))
+            yield [f"RE{n + 1:08d}", calificacion, self.rng.randint(60, 3600), self._fecha(),
+                   self.rng.choice(self.temas_por_area_id[id_area]), self._usuario(), id_simulador]
+
+    # --- orquestación ---
+
+    def generar(self):
+        os.makedirs(self.destino, exist_ok=True)
+        inicio = time.perf_counter()
+        for archivo in CATALOGO:
+            shutil.copyfile(os.path.join(self.origen, archivo), os.path.join(self.destino, archivo))
+
+        # El orden importa: cada archivo usa los IDs que dejaron los anteriores
+        resumen = {
+            'tema.csv': self._escribir('tema.csv', self._temas()),
+            'video.csv': self._escribir('video.csv', self._videos()),
+            'pregunta.csv': self._escribir('pregunta.csv', self._preguntas()),
+            'simulador.csv': self._escribir('simulador.csv', self._simuladores()),
+        }
+        sopas, crucigramas, palabras = self._juegos_y_palabras()
+        resumen['sopa.csv'] = self._escribir('sopa.csv', sopas)
+        resumen['crucigrama.csv'] = self._escribir('crucigrama.csv', crucigramas)
+        resumen['palabra.csv'] = self._escribir('palabra.csv', palabras)
+        resumen['comentario.csv'] = self._escribir('comentario.csv', self._comentarios())
+        resumen['resultado.csv'] = self._escribir('resultado.csv', self._resultados())
+
+        print(f"Contenido generado en {os.path.abspath(self.destino)}: {sum(resumen.values())} filas "
+              f"en {time.perf_counter() - inicio:.1f} s.")
+        return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera CSV sintéticos (esquema de assets/csv) para pruebas de escala.")
+    parser.add_argument('destino', help="Carpeta de salida (se crea si no existe)")
+    parser.add_argument('--perfil', choices=sorted(PERFILES), default='demo', help="Tamaños base")
+    for campo in PERFILES['demo']:
+        parser.add_argument(f"--{campo.replace('_', '-')}", type=int, help=f"Sobrescribe '{campo}' del perfil")
+    parser.add_argument('--semilla', type=int, default=0, help="Misma semilla, mismos archivos")
+    parser.add_argument('--origen', default=CSV_DIR, help="CSV reales de los que se copian catálogo y textos")
+    args = parser.parse_args(argv)
+
+    cantidades = dict(PERFILES[args.perfil])
+    for campo in cantidades:
+        valor = getattr(args, campo)
+        if valor is not None:
+            cantidades[campo] = valor
+
+    GeneradorContenido(args.destino, semilla=args.semilla, origen=args.origen, **cantidades).generar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+"""
+Importador masivo de contenido (assets/csv y el libro .xlsx) hacia Firestore.
+
+    python -m src.database.importador                  # todo
+    python -m src.database.importador --solo preguntas # una colección
+    python -m src.database.importador --simular        # lee y mapea sin escribir
+
+Cada fila se escribe con set(merge=True) sobre su ID natural (ID_Pregunta,
+ID_Video, ...), así que correrlo dos veces deja la base igual. Los contadores
+de videos solo se siembran en videos nuevos para no pisar vistas y likes reales.
+
+Cada documento guarda la `huella` de su contenido: si no cambió no se vuelve a
+escribir, y si cambió se marca `actualizado_en` para la sincronización delta
+(ver sincronizacion.py). Reimportar lo mismo no hace que los clientes bajen nada.
+"""
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import os
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database.csv_loader import reparar_texto
+from src.database.database import firestore, get_firestore_client
+from src.database.write_behind import MAX_OPERACIONES_BATCH
+
+
+CSV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'assets', 'csv')
+
+
+# ==========================================
+#      MAPEO CSV -> ESQUEMA DE FIRESTORE
+# ==========================================
+
+def _entero(valor, defecto=0):
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return defecto
+
+
+def _fecha(valor):
+    try:
+        return datetime.datetime.strptime(valor, '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def _aleatorio_estable(doc_id):
+    # Mismo valor en cada importación: reimportar no reordena el muestreo aleatorio
+    return int(hashlib.sha1(doc_id.encode('utf-8')).hexdigest()[:13], 16) / 16 ** 13
+
+
+def _campus(f):
+    return {"nombre": f.get('Nombre'), "estado": f.get('Estado')}
+
+
+def _carrera(f):
+    return {"nombre": f.get('Nombre'), "estado": f.get('Estado')}
+
+
+def _carrera_campus(f):
+    return {"id_carrera": f.get('ID_Carrera'), "id_campus": f.get('ID_Campus')}
+
+
+def _area(f):
+    return {"nombre": f.get('Nombre'), "estado": f.get('Estado'), "id_carrera": f.get('ID_Carrera')}
+
+
+def _tema(f):
+    return {"nombre": f.get('Nombre'), "estado": f.get('Estado'), "id_area": f.get('ID_Area')}
+
+
+def _video(f):
+    return {
+        "nombre": f.get('Nombre'),
+        "descripcion": f.get('Descripción'),
+        "url_video": f.get('URL_Video'),
+        "duracion": _entero(f.get('Duración')),
+        "estado": f.get('Estado'),
+        "id_area": f.get('ID_Area'),
+        # Contadores: solo se escriben si el video no existía (ver CONTADORES)
+        "visualizaciones": _entero(f.get('Visualizaciones')),
+        "cantidad_likes": _entero(f.get('Cantidad_Likes')),
+        "cantidad_dislikes": _entero(f.get('Cantidad_Dislikes')),
+    }
+
+
+def _pregunta(f):
+    return {
+        "pregunta": f.get('Pregunta'),
+        "opciones": {"a": f.get('Opcion_A'), "b": f.get('Opcion_B'), "c": f.get('Opcion_C')},
+        "opcion_correcta": f.get('Opcion_Correcta'),
+        "comentarios": {
+            "a": f.get('Comentario_A'),
+            "b": f.get('Comentario_B'),
+            "c": f.get('Comentario_C'),
+            # El libro .xlsx trae una sola columna 'Comentario'
+            "correcta": f.get('Comentario_Correcta', f.get('Comentario')),
+        },
+        "estado": f.get('Estado'),
+        "id_video": f.get('ID_Video'),
+        "id_area": f.get('ID_Area'),
+        "id_tema": f.get('ID_Tema'),
+    }
+
+
+def _simulador(f):
+    return {"longitud": _entero(f.get('Longitud')), "estado": f.get('Estado'),
+            "id_carrera": f.get('ID_Carrera'), "id_area": f.get('ID_Area')}
+
+
+def _juego(f):
+    return {"cantidad_palabras": _entero(f.get('Cantidad_Palabras')), "estado": f.get('Estado'),
+            "id_area": f.get('ID_Area'), "id_carrera": f.get('ID_Carrera')}
+
+
+def _palabra(f):
+    return {
+        "palabra": f.get('Palabra'),
+        "descripcion": f.get('Descripción'),
+        "longitud": _entero(f.get('Longitud')),
+        "estado": f.get('Estado'),
+        "id_area": f.get('ID_Area'),
+        "id_sopa": f.get('ID_Sopa'),
+        "id_crucigrama": f.get('ID_Crucigrama'),
+    }
+
+
+def _comentario(f):
+    return {"comentario": f.get('Comentario'), "fecha": _fecha(f.get('Fecha')), "estado": f.get('Estado'),
+            "id_usuario": f.get('ID_Usuario'), "id_video": f.get('ID_Video')}
+
+
+# (archivo, colección, columna con el ID natural, mapeo). Con columna None el
+# ID se deriva del contenido: el .xlsx repite 'PREGUNTACIV' en todas las filas.
+FUENTES = [
+    ('campus.csv', 'campus', 'ID_Campus', _campus),
+    ('carrera.csv', 'carreras', 'ID_Carrera', _carrera),
+    ('carrera_campus.csv', 'carrera_campus', 'ID_Carrera_Campus', _carrera_campus),
+    ('area.csv', 'areas', 'ID_Area', _area),
+    ('tema.csv', 'temas', 'ID_Tema', _tema),
+    ('video.csv', 'videos', 'ID_Video', _video),
+    ('pregunta.csv', 'preguntas', 'ID_Pregunta', _pregunta),
+    ('csv_ing_civ_comp.xlsx', 'preguntas', None, _pregunta),
+    ('simulador.csv', 'simuladores', 'ID_Simulador', _simulador),
+    ('sopa.csv', 'sopa', 'ID_Sopa', _juego),
+    ('crucigrama.csv', 'crucigrama', 'ID_Crucigrama', _juego),
+    ('palabra.csv', 'palabras', 'ID_Palabra', _palabra),
+    ('comentario.csv', 'comentarios', 'ID_Comentario', _comentario),
+]
+
+# Colecciones que se muestrean con _muestra_aleatoria
+CON_ALEATORIO = {'preguntas', 'palabras'}
+
+# Campos que no se sobrescriben si el documento ya existe
+CONTADORES = {'videos': ('visualizaciones', 'cantidad_likes', 'cantidad_dislikes')}
+
+
+# ==========================================
+#      LECTURA EN STREAMING
+# ==========================================
+
+def _leer_csv(ruta):
+    with open(ruta, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        encabezados = [reparar_texto(h) for h in next(reader)]
+        for row in reader:
+            if any(v.strip() for v in row):
+                yield dict(zip(encabezados, (reparar_texto(v) for v in row)))
+
+
+_NS_XLSX = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def _columna(referencia):
+    # 'K12' -> 10
+    indice = 0
+    for letra in referencia:
+        if not letra.isalpha():
+            break
+        indice = indice * 26 + ord(letra.upper()) - 64
+    return indice - 1
+
+
+def _leer_xlsx(ruta):
+    """Lee la primera hoja fila por fila con la biblioteca estándar (sin openpyxl)."""
+    with zipfile.ZipFile(ruta) as z:
+        compartidas = []
+        if 'xl/sharedStrings.xml' in z.namelist():
+            with z.open('xl/sharedStrings.xml') as f:
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == _NS_XLSX + 'si':
+                        compartidas.append(''.join(t.text or '' for t in elem.iter(_NS_XLSX + 't')))
+                        elem.clear()
+
+        encabezados = None
+        with z.open('xl/worksheets/sheet1.xml') as f:
+            for _, elem in ET.iterparse(f):
+                if elem.tag != _NS_XLSX + 'row':
+                    continue
+                valores = {}
+                for celda in elem.iter(_NS_XLSX + 'c'):
+                    v = celda.find(_NS_XLSX + 'v')
+                    if celda.get('t') == 's' and v is not None:
+                        valor = compartidas[int(v.text)]
+                    elif celda.get('t') == 'inlineStr':
+                        valor = ''.join(t.text or '' for t in celda.iter(_NS_XLSX + 't'))
+                    else:
+                        valor = v.text if v is not None else ''
+                    valores[_columna(celda.get('r'))] = valor.strip()
+                elem.clear()
+
+                if encabezados is None:
+                    encabezados = {i: nombre for i, nombre in valores.items() if nombre}
+                elif any(valores.values()):
+                    yield {nombre: valores.get(i, '') for i, nombre in encabezados.items()}
+
+
+def _leer(ruta):
+    return _leer_xlsx(ruta) if ruta.endswith('.xlsx') else _leer_csv(ruta)
+
+
+# ==========================================
+#      ESCRITURA
+# ==========================================
+
+class _Escritor:
+    """
+    Envía los set(merge=True) con BulkWriter (paralelo y con reintentos) o, si
+    la versión de google-cloud-firestore no lo trae, con WriteBatch de 500 en
+    varios hilos. Con db=None solo cuenta (modo --simular).
+    """
+
+    def __init__(self, db, hilos=8):
+        self.db = db
+        self.errores = 0
+        self._bulk = None
+        self._executor = None
+        self._lote = []
+        self._futuros = []
+        if db is None:
+            return
+        if hasattr(db, 'bulk_writer'):
+            self._bulk = db.bulk_writer()
+            self._bulk.on_write_error(self._on_error)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="importador")
+
+    def _on_error(self, error, bulk_writer):
+        # Reintentamos hasta 3 veces; después se cuenta como error
+        if error.attempts < 3:
+            return True
+        self.errores += 1
+        print(f"ERROR al escribir {error.document_reference.path}: {error.message}")
+        return False
+
+    def set(self, ref, datos):
+        if self.db is None:
+            return
+        if self._bulk is not None:
+            self._bulk.set(ref, datos, merge=True)
+            return
+        self._lote.append((ref, datos))
+        if len(self._lote) >= MAX_OPERACIONES_BATCH:
+            self._enviar_lote()
+
+    def _enviar_lote(self):
+        lote, self._lote = self._lote, []
+        if lote:
+            self._futuros.append(self._executor.submit(self._commit, lote))
+
+    def _commit(self, lote):
+        batch = self.db.batch()
+        for ref, datos in lote:
+            batch.set(ref, datos, merge=True)
+        try:
+            batch.commit()
+        except Exception as e:
+            self.errores += len(lote)
+            print(f"ERROR al enviar un lote de {len(lote)} documentos: {e}")
+
+    def flush(self):
+        if self._bulk is not None:
+            self._bulk.flush()
+        elif self._executor is not None:
+            self._enviar_lote()
+            for futuro in self._futuros:
+                futuro.result()
+            self._futuros = []
+
+    def close(self):
+        self.flush()
+        if self._bulk is not None:
+            self._bulk.close()
+        elif self._executor is not None:
+            self._executor.shutdown()
+
+
+def _huella(datos):
+    return hashlib.sha1(json.dumps(datos, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _huellas_existentes(db, refs):
+    """{doc_id: huella} de los documentos que ya existen (huella None si no la tienen)."""
+    if db is None or not refs:
+        return {}
+    return {doc.id: (doc.to_dict() or {}).get('huella')
+            for doc in db.get_all(refs, field_paths=['huella']) if doc.exists}
+
+
+def importar_fuente(db, escritor, archivo, coleccion, columna_id, mapear, csv_dir=CSV_DIR):
+    """Importa un archivo. Devuelve (documentos enviados, documentos sin cambios)."""
+    ruta = os.path.join(csv_dir, archivo)
+    if not os.path.exists(ruta):
+        print(f" - ADVERTENCIA: No se encontró '{os.path.abspath(ruta)}'. Se omitirá.")
+        return 0, 0
+
+    contadores = CONTADORES.get(coleccion, ())
+    vistos = set()
+    enviados = 0
+    sin_cambios = 0
+    pendientes = []  # (doc_id, datos); se comparan con Firestore de 500 en 500
+
+    def enviar():
+        nonlocal enviados, sin_cambios
+        refs = {doc_id: db.collection(coleccion).document(doc_id) for doc_id, _ in pendientes} if db else {}
+        existentes = _huellas_existentes(db, list(refs.values()))
+        for doc_id, datos in pendientes:
+            huella = _huella(datos)
+            if existentes.get(doc_id) == huella:
+                sin_cambios += 1
+                continue
+            if doc_id in existentes:
+                datos = {k: v for k, v in datos.items() if k not in contadores}
+            datos['huella'] = huella
+            if db is not None:
+                datos['actualizado_en'] = firestore.SERVER_TIMESTAMP
+            escritor.set(refs.get(doc_id), datos)
+            enviados += 1
+        pendientes.clear()
+
+    for fila in _leer(ruta):
+        datos = mapear(fila)
+        if columna_id:
+            doc_id = fila.get(columna_id)
+        else:
+            huella = hashlib.sha1((datos.get('pregunta') or repr(sorted(fila.items()))).encode('utf-8'))
+            doc_id = f"{fila.get('ID_Pregunta') or coleccion}-{huella.hexdigest()[:12]}"
+        if not doc_id or doc_id in vistos:
+            continue
+        vistos.add(doc_id)
+
+        if coleccion in CON_ALEATORIO:
+            datos['aleatorio'] = _aleatorio_estable(doc_id)
+
+        pendientes.append((doc_id, datos))
+        if len(pendientes) >= MAX_OPERACIONES_BATCH:
+            enviar()
+
+    if pendientes:
+        enviar()
+    return enviados, sin_cambios
+
+
+def importar(csv_dir=CSV_DIR, solo=None, simular=False, db=None):
+    """Importa todas las fuentes (o las de las colecciones en `solo`) e imprime el rendimiento."""
+    if not simular and db is None:
+        db = get_firestore_client()
+    escritor = _Escritor(None if simular else db)
+
+    resumen = []
+    inicio_total = time.perf_counter()
+    try:
+        for archivo, coleccion, columna_id, mapear in FUENTES:
+            if solo and coleccion not in solo:
+                continue
+            inicio = time.perf_counter()
+            cantidad, sin_cambios = importar_fuente(None if simular else db, escritor, archivo, coleccion,
+                                                    columna_id, mapear, csv_dir)
+            escritor.flush()
+            segundos = time.perf_counter() - inicio
+            resumen.append((archivo, coleccion, cantidad, segundos))
+            print(f" - {archivo} -> {coleccion}: {cantidad} docs en {segundos:.2f} s "
+                  f"({cantidad / segundos if segundos else 0:.0f} docs/s), {sin_cambios} sin cambios")
+    finally:
+        escritor.close()
+
+    total = sum(cantidad for _, _, cantidad, _ in resumen)
+    segundos = time.perf_counter() - inicio_total
+    modo = "simulación" if simular else "Firestore"
+    print(f"Importación ({modo}) terminada: {total} documentos en {segundos:.2f} s "
+          f"({total / segundos if segundos else 0:.0f} docs/s), {escritor.errores} errores.")
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa assets/csv y el .xlsx a Firestore.")
+    parser.add_argument('--csv-dir', default=CSV_DIR, help="Carpeta con los CSV y el .xlsx")
+    parser.add_argument('--solo', help="Colecciones a importar, separadas por coma (p. ej. preguntas,videos)")
+    parser.add_argument('--simular', action='store_true', help="Lee y mapea sin escribir en Firestore")
+    args = parser.parse_args(argv)
+
+    solo = {c.strip() for c in args.solo.split(',') if c.strip()} if args.solo else None
+    importar(csv_dir=args.csv_dir, solo=solo, simular=args.simular)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,644 @@
+"""
+Métricas de acceso a datos: tiempo de cada método del helper, documentos
+leídos y escritos en Firestore, bytes recibidos y la pantalla que hizo la llamada.
+
+    RUTA_LINCE_METRICAS=0              desactiva la medición
+    RUTA_LINCE_METRICAS_PUERTO=9464    sirve /metrics (texto Prometheus) y /metrics.json
+    RUTA_LINCE_METRICAS_DIR=ruta       al cerrar la base escribe metricas.prom y metricas.json
+
+Hay dos capas:
+- @medir_metodos envuelve cada método público de un helper y abre una
+  "medición" (método + pantalla) mientras corre.
+- instrumentar_firestore() parcha las pocas funciones del SDK que leen o
+  escriben (Query.stream, DocumentReference.get, Client.get_all, commits) y
+  suma documentos y bytes a la medición abierta. Lo que ocurre fuera de un
+  método del helper (write-behind, sincronización) se registra con el método
+  '(directo)' y el nombre del hilo o clase que lo hizo.
+
+contar(evento) suma sucesos sin duración propia (p. ej. una muestra completada
+con documentos sin 'aleatorio'); salen en "eventos" y en ruta_lince_eventos_total.
+
+Los "vigilantes" (ver vigilar) reciben los mismos conteos por sesión y pueden
+negar una lectura antes de hacerla; así se aplica el presupuesto de presupuesto.py.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ACTIVAS = os.environ.get("RUTA_LINCE_METRICAS", "1").strip() != "0"
+
+# Límites superiores de los buckets del histograma, en milisegundos
+LIMITES_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Módulos que no cuentan como "quien llama" al buscar la pantalla en la pila
+_MODULOS_INTERNOS = {
+    __name__,
+    'src.database.database',
+    'src.database.async_database',
+    'src.database.consultas',
+    'src.database.sqlite_helper',
+    'src.database.backend',
+    'src.database.cache',
+    'src.database.registros',
+    'src.database.bundle',
+}
+
+
+class _Serie:
+    __slots__ = ('buckets', 'llamadas', 'errores', 'suma_ms', 'lecturas', 'escrituras', 'bytes')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LIMITES_MS) + 1)  # el último es +Inf
+        self.llamadas = 0
+        self.errores = 0
+        self.suma_ms = 0.0
+        self.lecturas = 0
+        self.escrituras = 0
+        self.bytes = 0
+
+    def percentil(self, p):
+        """Estimación por buckets (límite superior del bucket que contiene el percentil)."""
+        if not self.llamadas:
+            return None
+        objetivo = p * self.llamadas
+        acumulado = 0
+        for limite, cantidad in zip(LIMITES_MS + (None,), self.buckets):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return limite
+        return None
+
+    def a_dict(self):
+        return {
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "tiempo_total_ms": round(self.suma_ms, 3),
+            "tiempo_medio_ms": round(self.suma_ms / self.llamadas, 3) if self.llamadas else None,
+            "p50_ms": self.percentil(0.5),
+            "p95_ms": self.percentil(0.95),
+            "lecturas": self.lecturas,
+            "escrituras": self.escrituras,
+            "bytes_recibidos": self.bytes,
+            "buckets_ms": dict(zip([str(l) for l in LIMITES_MS] + ["+Inf"], self.buckets)),
+        }
+
+
+class Metricas:
+    """Registro de series por (método, pantalla) y de eventos. Seguro entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._eventos = {}  # (evento, pantalla) -> cantidad
+
+    def _serie(self, metodo, pantalla):
+        clave = (metodo, pantalla)
+        serie = self._series.get(clave)
+        if serie is None:
+            serie = self._series.setdefault(clave, _Serie())
+        return serie
+
+    def registrar_llamada(self, metodo, pantalla, ms, error=False):
+        indice = len(LIMITES_MS)
+        for i, limite in enumerate(LIMITES_MS):
+            if ms <= limite:
+                indice = i
+                break
+        with self._lock:
+            serie = self._serie(metodo, pantalla)
+            serie.llamadas += 1
+            serie.suma_ms += ms
+            serie.buckets[indice] += 1
+            if error:
+                serie.errores += 1
+
+    def registrar_acceso(self, metodo, pantalla, lecturas=0, escrituras=0, bytes_recibidos=0):
+        with self._lock:
+            serie = self._serie(metodo, pantalla)
+            serie.lecturas += lecturas
+            serie.escrituras += escrituras
+            serie.bytes += bytes_recibidos
+
+    def registrar_evento(self, evento, pantalla, cantidad=1):
+        # Sucesos sin duración propia: lecturas degradadas, datos vencidos servidos, ...
+        with self._lock:
+            clave = (evento, pantalla)
+            self._eventos[clave] = self._eventos.get(clave, 0) + cantidad
+
+    def reiniciar(self):
+        with self._lock:
+            self._series.clear()
+            self._eventos.clear()
+
+    def _copia(self):
+        with self._lock:
+            return sorted(((clave, serie.a_dict()) for clave, serie in self._series.items()), key=lambda x: x[0])
+
+    def _copia_eventos(self):
+        with self._lock:
+            return sorted(self._eventos.items())
+
+    # --- EXPORTACIÓN ---
+
+    def a_json(self):
+        series = [dict(metodo=metodo, pantalla=pantalla, **datos) for (metodo, pantalla), datos in self._copia()]
+        return {
+            "generado_en": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "totales": {
+                "llamadas": sum(s["llamadas"] for s in series),
+                "lecturas": sum(s["lecturas"] for s in series),
+                "escrituras": sum(s["escrituras"] for s in series),
+                "bytes_recibidos": sum(s["bytes_recibidos"] for s in series),
+            },
+            "series": series,
+            "eventos": [{"evento": evento, "pantalla": pantalla, "cantidad": cantidad}
+                        for (evento, pantalla), cantidad in self._copia_eventos()],
+        }
+
+    def a_prometheus(self):
+        copia = self._copia()
+        lineas = [
+            "# HELP ruta_lince_db_duracion_segundos Duración de los métodos del helper de datos.",
+            "# TYPE ruta_lince_db_duracion_segundos histogram",
+        ]
+        for (metodo, pantalla), datos in copia:
+            if not datos["llamadas"]:
+                continue  # Series '(directo)': solo tienen contadores
+            etiquetas = f'metodo="{_escapar(metodo)}",pantalla="{_escapar(pantalla)}"'
+            acumulado = 0
+            for limite, cantidad in datos["buckets_ms"].items():
+                acumulado += cantidad
+                le = "+Inf" if limite == "+Inf" else repr(int(limite) / 1000)
+                lineas.append(f'ruta_lince_db_duracion_segundos_bucket{{{etiquetas},le="{le}"}} {acumulado}')
+            lineas.append(f"ruta_lince_db_duracion_segundos_sum{{{etiquetas}}} {datos['tiempo_total_ms'] / 1000}")
+            lineas.append(f"ruta_lince_db_duracion_segundos_count{{{etiquetas}}} {datos['llamadas']}")
+
+        for nombre, campo, ayuda in (
+                ("ruta_lince_db_lecturas_total", "lecturas", "Documentos leídos en Firestore."),
+                ("ruta_lince_db_escrituras_total", "escrituras", "Documentos escritos en Firestore."),
+                ("ruta_lince_db_bytes_recibidos_total", "bytes_recibidos", "Bytes de documentos recibidos (estimado)."),
+                ("ruta_lince_db_errores_total", "errores", "Llamadas que terminaron en excepción.")):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} counter")
+            for (metodo, pantalla), datos in copia:
+                lineas.append(f'{nombre}{{metodo="{_escapar(metodo)}",pantalla="{_escapar(pantalla)}"}} '
+                              f'{datos[campo]}')
+
+        lineas.append("# HELP ruta_lince_eventos_total Sucesos de la capa de datos (ver contar).")
+        lineas.append("# TYPE ruta_lince_eventos_total counter")
+        for (evento, pantalla), cantidad in self._copia_eventos():
+            lineas.append(f'ruta_lince_eventos_total{{evento="{_escapar(evento)}",pantalla="{_escapar(pantalla)}"}} '
+                          f'{cantidad}')
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, directorio):
+        """Escribe metricas.prom y metricas.json en el directorio. Devuelve sus rutas."""
+        os.makedirs(directorio, exist_ok=True)
+        ruta_prom = os.path.join(directorio, "metricas.prom")
+        ruta_json = os.path.join(directorio, "metricas.json")
+        for ruta, contenido in ((ruta_prom, self.a_prometheus()),
+                                (ruta_json, json.dumps(self.a_json(), ensure_ascii=False, indent=2))):
+            temporal = ruta + ".tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                f.write(contenido)
+            os.replace(temporal, ruta)
+        return ruta_prom, ruta_json
+
+    def resumen(self, n=5):
+        """Texto corto con los métodos más caros en lecturas y en tiempo."""
+        series = self.a_json()["series"]
+        por_lecturas = sorted(series, key=lambda s: s["lecturas"], reverse=True)[:n]
+        por_tiempo = sorted(series, key=lambda s: s["tiempo_total_ms"], reverse=True)[:n]
+        lineas = ["Más lecturas:"]
+        lineas += [f"  {s['lecturas']:>6} lect  {s['metodo']} [{s['pantalla']}]" for s in por_lecturas if s["lecturas"]]
+        lineas.append("Más tiempo:")
+        lineas += [f"  {s['tiempo_total_ms']:>9.0f} ms  {s['metodo']} [{s['pantalla']}] x{s['llamadas']}"
+                   for s in por_tiempo if s["llamadas"]]
+        return "\n".join(lineas)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICAS = Metricas()
+
+
+def get_metricas():
+    return METRICAS
+
+
+# ==========================================
+#      MEDICIÓN DE MÉTODOS DEL HELPER
+# ==========================================
+
+# (metodo, pantalla, sesion) de la llamada al helper en curso; None fuera de una
+_medicion = contextvars.ContextVar("ruta_lince_medicion", default=None)
+
+# Objetos con autorizar_lectura(sesion) y registrar(sesion, lecturas, escrituras),
+# p. ej. GestorPresupuesto
+_vigilantes = []
+
+
+def vigilar(vigilante):
+    if vigilante not in _vigilantes:
+        _vigilantes.append(vigilante)
+
+
+def sesion_actual():
+    """session_id de la página que originó la llamada al helper en curso (o None)."""
+    medicion = _medicion.get()
+    return medicion[2] if medicion is not None else None
+
+
+@contextlib.contextmanager
+def en_sesion(sesion, pantalla):
+    """
+    Atribuye a una sesión las llamadas al helper que se hacen desde otro hilo
+    (la precarga de videos): cuentan para su presupuesto y sus métricas.
+    """
+    token = _medicion.set(('(hilo)', pantalla, sesion))
+    try:
+        yield
+    finally:
+        _medicion.reset(token)
+
+
+def _quien_llama(profundidad=2):
+    """
+    (pantalla, sesion) del primer marco de la pila fuera de la capa de datos:
+    la clase (o el módulo) y el session_id de su página de Flet, si tiene.
+    """
+    marco = sys._getframe(profundidad)
+    while marco is not None:
+        modulo = marco.f_globals.get('__name__', '')
+        if modulo.startswith('src.') and modulo not in _MODULOS_INTERNOS:
+            codigo = marco.f_code
+            propio = marco.f_locals.get(codigo.co_varnames[0]) if codigo.co_argcount else None
+            if propio is None or not hasattr(propio, '__dict__'):
+                return modulo.rsplit('.', 1)[-1], None
+            try:
+                sesion = getattr(getattr(propio, 'page', None), 'session_id', None)
+            except Exception:
+                sesion = None
+            return type(propio).__name__, sesion
+        marco = marco.f_back
+    return f"({threading.current_thread().name})", None
+
+
+def _envolver(nombre, funcion):
+    if asyncio.iscoroutinefunction(funcion):
+        @functools.wraps(funcion)
+        async def medido_async(self, *args, **kwargs):
+            if not ACTIVAS and not _vigilantes:
+                return await funcion(self, *args, **kwargs)
+            padre = _medicion.get()
+            pantalla, sesion = padre[1:] if padre is not None else _quien_llama()
+            token = _medicion.set((nombre, pantalla, sesion))
+            inicio = time.perf_counter()
+            error = False
+            try:
+                return await funcion(self, *args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                _medicion.reset(token)
+                if ACTIVAS:
+                    METRICAS.registrar_llamada(nombre, pantalla, (time.perf_counter() - inicio) * 1000, error)
+        return medido_async
+
+    @functools.wraps(funcion)
+    def medido(self, *args, **kwargs):
+        if not ACTIVAS and not _vigilantes:
+            return funcion(self, *args, **kwargs)
+        padre = _medicion.get()
+        # Las llamadas anidadas heredan pantalla y sesión; solo la externa recorre la pila
+        pantalla, sesion = padre[1:] if padre is not None else _quien_llama()
+        token = _medicion.set((nombre, pantalla, sesion))
+        inicio = time.perf_counter()
+        error = False
+        try:
+            return funcion(self, *args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            _medicion.reset(token)
+            if ACTIVAS:
+                METRICAS.registrar_llamada(nombre, pantalla, (time.perf_counter() - inicio) * 1000, error)
+    return medido
+
+
+def medir_metodos(cls):
+    """Decorador de clase: mide cada método público (propio o heredado) salvo close."""
+    for nombre in dir(cls):
+        if nombre.startswith('_') or nombre == 'close':
+            continue
+        funcion = getattr(cls, nombre)
+        if not callable(funcion) or isinstance(cls.__dict__.get(nombre), (staticmethod, classmethod)):
+            continue
+        if getattr(funcion, '_medido', False):
+            continue  # Ya medido en la clase base
+        envoltura = _envolver(nombre, funcion)
+        envoltura._medido = True
+        setattr(cls, nombre, envoltura)
+    return cls
+
+
+# ==========================================
+#      CONTEO DE LECTURAS / ESCRITURAS (SDK)
+# ==========================================
+
+# Evita contar dos veces cuando una función parchada llama a otra (get -> get_all)
+_en_sdk = contextvars.ContextVar("ruta_lince_en_sdk", default=False)
+
+
+def _tamano(valor):
+    """Tamaño aproximado según las reglas de almacenamiento de Firestore."""
+    if valor is None or isinstance(valor, bool):
+        return 1
+    if isinstance(valor, (int, float)):
+        return 8
+    if isinstance(valor, str):
+        return len(valor.encode('utf-8')) + 1
+    if isinstance(valor, bytes):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sum(len(str(k).encode('utf-8')) + 1 + _tamano(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sum(_tamano(v) for v in valor)
+    ruta = getattr(valor, 'path', None)
+    if isinstance(ruta, str):
+        return len(ruta.encode('utf-8')) + 1
+    return 8  # Timestamps, GeoPoint, etc.
+
+
+def _tamano_documento(snapshot):
+    datos = getattr(snapshot, '_data', None)
+    if datos is None and getattr(snapshot, 'exists', False):
+        datos = snapshot.to_dict()
+    ruta = getattr(getattr(snapshot, 'reference', None), 'path', '') or ''
+    return len(ruta.encode('utf-8')) + 16 + (_tamano(datos) if datos else 0)
+
+
+def _medicion_o_directa():
+    medicion = _medicion.get()
+    return medicion if medicion is not None else ('(directo)',) + _quien_llama(3)
+
+
+def _autorizar_lectura():
+    # Un vigilante puede negar la lectura (PresupuestoAgotado) antes de pedirla
+    if _vigilantes:
+        sesion = _medicion_o_directa()[2]
+        for vigilante in _vigilantes:
+            vigilante.autorizar_lectura(sesion)
+
+
+def contar(evento, cantidad=1):
+    """Suma `cantidad` al evento, atribuido a la pantalla de la llamada en curso."""
+    if ACTIVAS:
+        METRICAS.registrar_evento(evento, _medicion_o_directa()[1], cantidad)
+
+
+def _anotar(lecturas=0, escrituras=0, bytes_recibidos=0):
+    metodo, pantalla, sesion = _medicion_o_directa()
+    if ACTIVAS:
+        METRICAS.registrar_acceso(metodo, pantalla, lecturas, escrituras, bytes_recibidos)
+    for vigilante in _vigilantes:
+        vigilante.registrar(sesion, lecturas, escrituras)
+
+
+def _parche_lectura_iter(original):
+    # El guardia solo se activa mientras el SDK avanza: entre un yield y otro el
+    # código de quien itera (que puede hacer más lecturas) corre sin él.
+    @functools.wraps(original)
+    def envoltura(*args, **kwargs):
+        if _en_sdk.get():
+            yield from original(*args, **kwargs)
+            return
+        _autorizar_lectura()
+        leidos = 0
+        tamano = 0
+        try:
+            token = _en_sdk.set(True)
+            try:
+                iterador = iter(original(*args, **kwargs))
+            finally:
+                _en_sdk.reset(token)
+            while True:
+                token = _en_sdk.set(True)
+                try:
+                    doc = next(iterador)
+                except StopIteration:
+                    break
+                finally:
+                    _en_sdk.reset(token)
+                leidos += 1
+                tamano += _tamano_documento(doc)
+                yield doc
+        finally:
+            # Una consulta sin resultados se cobra como una lectura
+            _anotar(lecturas=max(leidos, 1), bytes_recibidos=tamano)
+    return envoltura
+
+
+def _parche_lectura_aiter(original):
+    @functools.wraps(original)
+    async def envoltura(*args, **kwargs):
+        if _en_sdk.get():
+            async for doc in original(*args, **kwargs):
+                yield doc
+            return
+        _autorizar_lectura()
+        leidos = 0
+        tamano = 0
+        try:
+            iterador = original(*args, **kwargs).__aiter__()
+            while True:
+                token = _en_sdk.set(True)
+                try:
+                    doc = await iterador.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    _en_sdk.reset(token)
+                leidos += 1
+                tamano += _tamano_documento(doc)
+                yield doc
+        finally:
+            _anotar(lecturas=max(leidos, 1), bytes_recibidos=tamano)
+    return envoltura
+
+
+def _parche_lectura_doc(original):
+    @functools.wraps(original)
+    def envoltura(*args, **kwargs):
+        if _en_sdk.get():
+            return original(*args, **kwargs)
+        _autorizar_lectura()
+        token = _en_sdk.set(True)
+        try:
+            doc = original(*args, **kwargs)
+        finally:
+            _en_sdk.reset(token)
+        _anotar(lecturas=1, bytes_recibidos=_tamano_documento(doc))
+        return doc
+    return envoltura
+
+
+def _parche_lectura_adoc(original):
+    @functools.wraps(original)
+    async def envoltura(*args, **kwargs):
+        if _en_sdk.get():
+            return await original(*args, **kwargs)
+        _autorizar_lectura()
+        token = _en_sdk.set(True)
+        try:
+            doc = await original(*args, **kwargs)
+        finally:
+            _en_sdk.reset(token)
+        _anotar(lecturas=1, bytes_recibidos=_tamano_documento(doc))
+        return doc
+    return envoltura
+
+
+def _parche_escritura(original):
+    @functools.wraps(original)
+    def envoltura(self, *args, **kwargs):
+        escrituras = len(getattr(self, '_write_pbs', ()) or ())
+        if _en_sdk.get():
+            return original(self, *args, **kwargs)
+        token = _en_sdk.set(True)
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            _en_sdk.reset(token)
+            _anotar(escrituras=escrituras)
+    return envoltura
+
+
+def _parche_escritura_async(original):
+    @functools.wraps(original)
+    async def envoltura(self, *args, **kwargs):
+        escrituras = len(getattr(self, '_write_pbs', ()) or ())
+        if _en_sdk.get():
+            return await original(self, *args, **kwargs)
+        token = _en_sdk.set(True)
+        try:
+            return await original(self, *args, **kwargs)
+        finally:
+            _en_sdk.reset(token)
+            _anotar(escrituras=escrituras)
+    return envoltura
+
+
+# (módulo, clase, método, parche). Si la versión del SDK no trae alguno, se omite.
+_PARCHES = (
+    ('google.cloud.firestore_v1.query', 'Query', 'stream', _parche_lectura_iter),
+    ('google.cloud.firestore_v1.collection', 'CollectionReference', 'stream', _parche_lectura_iter),
+    ('google.cloud.firestore_v1.client', 'Client', 'get_all', _parche_lectura_iter),
+    ('google.cloud.firestore_v1.document', 'DocumentReference', 'get', _parche_lectura_doc),
+    ('google.cloud.firestore_v1.batch', 'WriteBatch', 'commit', _parche_escritura),
+    ('google.cloud.firestore_v1.bulk_batch', 'BulkWriteBatch', 'commit', _parche_escritura),
+    ('google.cloud.firestore_v1.transaction', 'Transaction', '_commit', _parche_escritura),
+    ('google.cloud.firestore_v1.async_query', 'AsyncQuery', 'stream', _parche_lectura_aiter),
+    ('google.cloud.firestore_v1.async_collection', 'AsyncCollectionReference', 'stream', _parche_lectura_aiter),
+    ('google.cloud.firestore_v1.async_client', 'AsyncClient', 'get_all', _parche_lectura_aiter),
+    ('google.cloud.firestore_v1.async_document', 'AsyncDocumentReference', 'get', _parche_lectura_adoc),
+    ('google.cloud.firestore_v1.async_batch', 'AsyncWriteBatch', 'commit', _parche_escritura_async),
+    ('google.cloud.firestore_v1.async_transaction', 'AsyncTransaction', '_commit', _parche_escritura_async),
+)
+
+_lock_sdk = threading.Lock()
+_sdk_instrumentado = False
+
+
+def instrumentar_firestore():
+    """Parcha el SDK de Firestore una sola vez por proceso."""
+    global _sdk_instrumentado
+    if _sdk_instrumentado:
+        return
+    with _lock_sdk:
+        if _sdk_instrumentado:
+            return
+        for nombre_modulo, nombre_clase, nombre_metodo, parche in _PARCHES:
+            try:
+                clase = getattr(importlib.import_module(nombre_modulo), nombre_clase)
+            except (ImportError, AttributeError):
+                continue
+            original = clase.__dict__.get(nombre_metodo)
+            if original is None or getattr(original, '__wrapped__', None) is not None:
+                continue
+            setattr(clase, nombre_metodo, parche(original))
+        _sdk_instrumentado = True
+
+
+# ==========================================
+#      ENDPOINT PROMETHEUS
+# ==========================================
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            cuerpo = json.dumps(METRICAS.a_json(), ensure_ascii=False).encode('utf-8')
+            tipo = "application/json; charset=utf-8"
+        elif self.path.startswith("/metrics"):
+            cuerpo = METRICAS.a_prometheus().encode('utf-8')
+            tipo = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea por cada scrape
+
+
+_servidor = None
+
+
+def servir_metricas(puerto, host="127.0.0.1"):
+    """Sirve /metrics y /metrics.json en un hilo aparte (una vez por proceso)."""
+    global _servidor
+    with _lock_sdk:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer((host, int(puerto)), _ManejadorMetricas)
+            threading.Thread(target=_servidor.serve_forever, name="metricas-http", daemon=True).start()
+            print(f"INFO: Métricas en http://{host}:{_servidor.server_address[1]}/metrics")
+    return _servidor
+
+
+def iniciar_desde_entorno():
+    """Hook de arranque: abre el endpoint si RUTA_LINCE_METRICAS_PUERTO está definido."""
+    puerto = os.environ.get("RUTA_LINCE_METRICAS_PUERTO")
+    if ACTIVAS and puerto:
+        try:
+            servir_metricas(puerto)
+        except OSError as e:
+            print(f"ERROR al abrir el endpoint de métricas en el puerto {puerto}: {e}")
+
+
+def volcar_desde_entorno():
+    """Hook de apagado: escribe los archivos si RUTA_LINCE_METRICAS_DIR está definido."""
+    if not ACTIVAS:
+        return
+    directorio = os.environ.get("RUTA_LINCE_METRICAS_DIR")
+    if directorio:
+        ruta_prom, ruta_json = METRICAS.exportar(directorio)
+        print(f"INFO: Métricas escritas en {ruta_prom} y {ruta_json}")
+    if METRICAS.a_json()["series"]:
+        print(f"INFO: {METRICAS.resumen()}")
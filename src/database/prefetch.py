@@ -0,0 +1,113 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database.metricas import contar, en_sesion
+
+
+# Los widgets de comentarios piden esta misma página
+TAMANO_PAGINA_COMENTARIOS = 20
+
+
+class VideoPrefetcher:
+    """
+    Precarga en segundo plano lo que necesitan los widgets de un video (datos
+    con contadores, reacción del usuario, quiz y primera página de comentarios).
+
+    InicioScreen llama a `precargar` con el video actual y sus vecinos (en ese
+    orden de prioridad) y los widgets usan `tomar` al abrirse. `tomar` nunca
+    espera: si la precarga no terminó entrega las partes ya leídas, la carga se
+    detiene ahí y el widget lee por su cuenta lo que falte. Cada paquete se
+    entrega una sola vez: tras usarlo, la siguiente apertura vuelve a leer de la
+    base y nunca muestra reacciones o comentarios que el propio usuario ya cambió.
+
+    `sesion` (page.session_id) hace que las lecturas de los hilos de precarga
+    se carguen al presupuesto y a las métricas de la sesión que las pidió.
+    Aciertos, entregas parciales y fallos se cuentan como eventos
+    'precarga_*' en metricas.py.
+    """
+
+    def __init__(self, db_helper, id_usuario, max_hilos=2, sesion=None, pantalla="VideoPrefetcher"):
+        self.db_helper = db_helper
+        self.id_usuario = id_usuario
+        self.sesion = sesion
+        self.pantalla = pantalla
+
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="prefetch-video")
+        self._lock = threading.Lock()
+        self._futuros = {}  # id_video -> Future con el paquete
+        self._paquetes = {}  # id_video -> paquete que se va llenando mientras carga
+
+    def precargar(self, ids_videos):
+        """
+        Programa la carga de los videos indicados (el primero sale antes) y
+        descarta los que ya no están. Devuelve los futuros de los vigentes.
+        """
+        vigentes = list(dict.fromkeys(i for i in ids_videos if i))
+        with self._lock:
+            for id_video in list(self._futuros):
+                if id_video not in vigentes:
+                    self._futuros.pop(id_video).cancel()
+                    self._paquetes.pop(id_video, None)
+            for id_video in vigentes:
+                if id_video not in self._futuros:
+                    paquete = self._paquetes[id_video] = {}
+                    self._futuros[id_video] = self._executor.submit(self._cargar, id_video, paquete)
+            return [self._futuros[id_video] for id_video in vigentes]
+
+    def tomar(self, id_video):
+        """
+        Devuelve el paquete precargado del video, solo con las partes ya leídas
+        si la carga sigue en curso, o None si no hay nada. No bloquea el hilo de
+        la UI; lo que falte en el paquete lo lee el widget.
+        """
+        with self._lock:
+            futuro = self._futuros.pop(id_video, None)
+            paquete = self._paquetes.pop(id_video, None)  # Sin él, _cargar no lee más
+            parcial = dict(paquete) if paquete else None
+        if futuro is None or futuro.cancelled():
+            contar('precarga_fallo')
+            return None
+        if not futuro.done():
+            futuro.cancel()  # Si todavía no empezó, no se lee nada
+            contar('precarga_parcial' if parcial else 'precarga_fallo')
+            return parcial
+        paquete = futuro.result()
+        contar('precarga_fallo' if paquete is None else 'precarga_acierto')
+        return paquete
+
+    def close(self):
+        with self._lock:
+            for futuro in self._futuros.values():
+                futuro.cancel()
+            self._futuros.clear()
+            self._paquetes.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------
+    #      INTERNOS
+    # ------------------------------------------
+
+    def _cargar(self, id_video, paquete):
+        try:
+            with en_sesion(self.sesion, self.pantalla):
+                for leer in self._partes(id_video):
+                    with self._lock:
+                        if self._paquetes.get(id_video) is not paquete:
+                            return paquete  # Ya se entregó o se descartó: no se lee más
+                    valores = leer()
+                    with self._lock:
+                        paquete.update(valores)
+            return paquete
+        except Exception as e:
+            print(f"ERROR al precargar el video '{id_video}': {e}")
+            return None
+
+    def _partes(self, id_video):
+        # Video y reacción van juntos: el widget usa la reacción solo si tiene el video
+        h = self.db_helper
+        return (
+            lambda: {"video": h.get_video_by_id(id_video),
+                     "reaccion": h.get_user_reaction_for_video(id_video, self.id_usuario)},
+            lambda: {"preguntas": h.get_preguntas_por_id_video(id_video)},
+            lambda: {"comentarios": h.get_comments_page(id_video, limite=TAMANO_PAGINA_COMENTARIOS)},
+        )
@@ -0,0 +1,252 @@
+"""
+Presupuesto de lecturas y escrituras de Firestore, por sesión y por proceso.
+
+    RUTA_LINCE_PRESUPUESTO_LECTURAS_SESION=300
+    RUTA_LINCE_PRESUPUESTO_ESCRITURAS_SESION=100
+    RUTA_LINCE_PRESUPUESTO_LECTURAS_PROCESO=20000
+    RUTA_LINCE_PRESUPUESTO_ESCRITURAS_PROCESO=5000
+    RUTA_LINCE_PRESUPUESTO_VENTANA=3600        # segundos; las cuotas se renuevan cada ventana
+
+Una cuota en 0 (o sin definir) no tiene límite; sin ninguna cuota no se crea
+el gestor. Qué pasa al agotarse:
+- Lecturas: el SDK levanta PresupuestoAgotado antes de pedir nada (ver
+  metricas.instrumentar_firestore) y CatalogCache responde con el último valor
+  conocido aunque esté vencido. Las lecturas sin caché (video, comentarios,
+  preguntas) llevan @si_agotado y devuelven un resultado vacío que la pantalla
+  ya sabe mostrar. Si no hay nada de eso, la excepción sigue. Cada respuesta
+  degradada o vencida se cuenta como evento en metricas.py.
+- Contadores (vistas, likes): los de una sesión sin cuota se guardan aquí y
+  se sueltan a la cola diferida cuando se renueva su ventana; la cola no envía
+  mientras la cuota del proceso esté agotada.
+- Comentarios, reacciones y resultados se cuentan pero no se bloquean: perder
+  el resultado de un examen es peor que pasarse de la cuota.
+El control es previo a cada consulta: una consulta que empieza con cuota
+puede pasarse por los documentos que traiga.
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+
+from src.database.metricas import contar
+
+
+_lock = threading.Lock()
+_gestor = None
+_gestor_leido = False
+
+
+class PresupuestoAgotado(Exception):
+    """No queda cuota de lecturas para la sesión o para el proceso."""
+
+
+def si_agotado(defecto=None):
+    """
+    Decorador para las lecturas sin caché de los helpers: si se agotó la cuota
+    devuelve defecto() (o defecto, si no es llamable) en lugar de propagar
+    PresupuestoAgotado hasta el handler de la pantalla.
+    """
+    def degradado(nombre):
+        contar(f"lectura_degradada.{nombre}")
+        return defecto() if callable(defecto) else defecto
+
+    def decorador(funcion):
+        if asyncio.iscoroutinefunction(funcion):
+            @functools.wraps(funcion)
+            async def envoltura_async(*args, **kwargs):
+                try:
+                    return await funcion(*args, **kwargs)
+                except PresupuestoAgotado:
+                    return degradado(funcion.__name__)
+            return envoltura_async
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            try:
+                return funcion(*args, **kwargs)
+            except PresupuestoAgotado:
+                return degradado(funcion.__name__)
+        return envoltura
+    return decorador
+
+
+class Cuota:
+    """Contador de ventana fija: `limite` unidades cada `ventana` segundos (0 = sin límite)."""
+
+    __slots__ = ('limite', 'ventana', 'usado', 'inicio')
+
+    def __init__(self, limite, ventana):
+        self.limite = limite
+        self.ventana = ventana
+        self.usado = 0
+        self.inicio = time.monotonic()
+
+    def _renovar(self, ahora):
+        if ahora - self.inicio >= self.ventana:
+            self.inicio = ahora
+            self.usado = 0
+
+    def alcanza(self, n, ahora):
+        self._renovar(ahora)
+        return self.limite <= 0 or self.usado + n <= self.limite
+
+    def cargar(self, n, ahora):
+        self._renovar(ahora)
+        self.usado += n
+
+    def a_dict(self):
+        return {"limite": self.limite or None, "usado": self.usado}
+
+
+class _Sesion:
+    __slots__ = ('lecturas', 'escrituras', 'diferidos', 'ultimo_uso')
+
+    def __init__(self, limite_lecturas, limite_escrituras, ventana):
+        self.lecturas = Cuota(limite_lecturas, ventana)
+        self.escrituras = Cuota(limite_escrituras, ventana)
+        self.diferidos = {}  # (id_video, campo) -> delta retenido
+        self.ultimo_uso = time.monotonic()
+
+
+class GestorPresupuesto:
+    """Lleva las cuotas del proceso y de cada sesión de Flet (page.session_id)."""
+
+    def __init__(self, lecturas_sesion=0, escrituras_sesion=0, lecturas_proceso=0, escrituras_proceso=0,
+                 ventana=3600):
+        self.lecturas_sesion = lecturas_sesion
+        self.escrituras_sesion = escrituras_sesion
+        self.ventana = ventana
+
+        self._lock = threading.Lock()
+        self.lecturas = Cuota(lecturas_proceso, ventana)
+        self.escrituras = Cuota(escrituras_proceso, ventana)
+        self._sesiones = {}
+
+        # Métricas
+        self.lecturas_negadas = 0
+        self.contadores_diferidos = 0
+
+    @classmethod
+    def desde_entorno(cls):
+        """Gestor configurado con RUTA_LINCE_PRESUPUESTO_*; None si no hay ninguna cuota."""
+        def entero(nombre, defecto=0):
+            try:
+                return int(os.environ.get(f"RUTA_LINCE_PRESUPUESTO_{nombre}", defecto))
+            except ValueError:
+                print(f"ERROR: RUTA_LINCE_PRESUPUESTO_{nombre} no es un número, se ignora.")
+                return defecto
+
+        cuotas = {
+            "lecturas_sesion": entero("LECTURAS_SESION"),
+            "escrituras_sesion": entero("ESCRITURAS_SESION"),
+            "lecturas_proceso": entero("LECTURAS_PROCESO"),
+            "escrituras_proceso": entero("ESCRITURAS_PROCESO"),
+        }
+        if not any(valor > 0 for valor in cuotas.values()):
+            return None
+        gestor = cls(ventana=entero("VENTANA", 3600), **cuotas)
+        print(f"INFO: Presupuesto de Firestore activo: {cuotas}, ventana={gestor.ventana} s")
+        return gestor
+
+    def _sesion(self, sesion, ahora):
+        # Se llama con el lock tomado
+        datos = self._sesiones.get(sesion)
+        if datos is None:
+            # Sesiones sin uso en dos ventanas ya no cuentan (y no tienen nada retenido)
+            for clave in [c for c, s in self._sesiones.items()
+                          if ahora - s.ultimo_uso > 2 * self.ventana and not s.diferidos]:
+                del self._sesiones[clave]
+            datos = self._sesiones[sesion] = _Sesion(self.lecturas_sesion, self.escrituras_sesion, self.ventana)
+        datos.ultimo_uso = ahora
+        return datos
+
+    # --- LECTURAS ---
+
+    def autorizar_lectura(self, sesion=None):
+        """Levanta PresupuestoAgotado si la sesión o el proceso ya no tienen lecturas."""
+        ahora = time.monotonic()
+        with self._lock:
+            if not self.lecturas.alcanza(1, ahora):
+                motivo = "del proceso"
+            elif sesion is not None and not self._sesion(sesion, ahora).lecturas.alcanza(1, ahora):
+                motivo = f"de la sesión {sesion}"
+            else:
+                return
+            self.lecturas_negadas += 1
+        raise PresupuestoAgotado(f"Se agotó la cuota de lecturas {motivo}.")
+
+    # --- ESCRITURAS ---
+
+    def puede_escribir(self, n=1, sesion=None):
+        ahora = time.monotonic()
+        with self._lock:
+            if sesion is not None:
+                return self._sesion(sesion, ahora).escrituras.alcanza(n, ahora)
+            return self.escrituras.alcanza(n, ahora)
+
+    def diferir(self, sesion, id_video, campo, delta):
+        """Retiene un incremento de contador de una sesión sin cuota."""
+        with self._lock:
+            diferidos = self._sesion(sesion, time.monotonic()).diferidos
+            diferidos[(id_video, campo)] = diferidos.get((id_video, campo), 0) + delta
+            self.contadores_diferidos += 1
+
+    def liberar(self, todos=False):
+        """
+        Saca los incrementos retenidos de las sesiones que ya tienen cuota (o de
+        todas, al cerrar). Devuelve [(id_video, campo, delta)].
+        """
+        ahora = time.monotonic()
+        liberados = []
+        with self._lock:
+            for datos in self._sesiones.values():
+                if not datos.diferidos:
+                    continue
+                if not todos and not datos.escrituras.alcanza(len(datos.diferidos), ahora):
+                    continue
+                liberados.extend((id_video, campo, delta) for (id_video, campo), delta in datos.diferidos.items())
+                if not todos:
+                    datos.escrituras.cargar(len(datos.diferidos), ahora)
+                datos.diferidos = {}
+        return liberados
+
+    # --- CONTABILIDAD ---
+
+    def registrar(self, sesion=None, lecturas=0, escrituras=0, solo_sesion=False):
+        """
+        Carga lo que de verdad se leyó o escribió (lo llama metricas tras cada
+        acceso). solo_sesion=True para los contadores encolados: al proceso se
+        le cargan cuando la cola hace el commit.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            if not solo_sesion:
+                self.lecturas.cargar(lecturas, ahora)
+                self.escrituras.cargar(escrituras, ahora)
+            if sesion is not None:
+                datos = self._sesion(sesion, ahora)
+                datos.lecturas.cargar(lecturas, ahora)
+                datos.escrituras.cargar(escrituras, ahora)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "lecturas_proceso": self.lecturas.a_dict(),
+                "escrituras_proceso": self.escrituras.a_dict(),
+                "sesiones": len(self._sesiones),
+                "lecturas_negadas": self.lecturas_negadas,
+                "contadores_diferidos": self.contadores_diferidos,
+                "contadores_retenidos": sum(len(s.diferidos) for s in self._sesiones.values()),
+            }
+
+
+def get_presupuesto():
+    """Gestor del proceso (compartido por todos los helpers); None si no hay cuotas."""
+    global _gestor, _gestor_leido
+    if not _gestor_leido:
+        with _lock:
+            if not _gestor_leido:
+                _gestor = GestorPresupuesto.desde_entorno()
+                _gestor_leido = True
+    return _gestor
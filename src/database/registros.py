@@ -0,0 +1,208 @@
+"""
+Registros compactos (con __slots__) para lo que más se repite en memoria:
+preguntas, videos, juegos y comentarios.
+
+Cada tipo declara en CAMPOS de dónde sale cada atributo en el documento de
+Firestore ('opciones.a' = campo anidado). Al definir la clase esas rutas se
+compilan una sola vez, y `desde_firestore` llena el registro en un solo paso,
+sin copiar cada valor en una clave minúscula y otra mayúscula.
+
+Para no romper las pantallas que todavía usan diccionarios, los registros
+aceptan r['Nombre'] / r.get('Nombre') / r['Nombre'] = ...: ALIAS traduce esas
+claves al atributo correspondiente.
+"""
+
+
+class Registro:
+    __slots__ = ()
+
+    CAMPOS = {}    # atributo -> ruta en el documento de Firestore
+    ESTADO = ()    # atributos que solo usa la UI (no vienen de la base)
+    DEFECTOS = {}  # valor inicial cuando el documento no trae el campo
+    ALIAS = {}     # clave de diccionario -> atributo
+
+    _RUTAS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # "Compilación" del mapa declarativo: rutas ya partidas y alias con los nombres propios
+        cls._RUTAS = tuple((atributo, tuple(ruta.split('.'))) for atributo, ruta in cls.CAMPOS.items())
+        alias = {atributo: atributo for atributo in cls.__slots__}
+        alias.update(cls.ALIAS)
+        cls.ALIAS = alias
+
+    def __init__(self, **valores):
+        for atributo in self.__slots__:
+            setattr(self, atributo, self.DEFECTOS.get(atributo))
+        self.actualizar(valores)
+
+    @classmethod
+    def desde_firestore(cls, doc_id, data):
+        registro = cls.__new__(cls)
+        registro.id = doc_id
+        defectos = cls.DEFECTOS
+        for atributo, ruta in cls._RUTAS:
+            valor = data
+            for clave in ruta:
+                valor = valor.get(clave) if valor else None
+            setattr(registro, atributo, defectos.get(atributo) if valor is None else valor)
+        for atributo in cls.ESTADO:
+            setattr(registro, atributo, defectos.get(atributo))
+        return registro
+
+    def actualizar(self, valores):
+        """Asigna varios valores a la vez; acepta nombres de atributo o claves de ALIAS."""
+        for clave, valor in valores.items():
+            self[clave] = valor
+
+    def a_dict(self):
+        return {atributo: getattr(self, atributo) for atributo in self.__slots__}
+
+    def copia(self):
+        """Copia superficial: los valores son de Firestore (texto, números) y no se modifican en sitio."""
+        otro = type(self).__new__(type(self))
+        for atributo in self.__slots__:
+            setattr(otro, atributo, getattr(self, atributo))
+        return otro
+
+    # --- Compatibilidad con el acceso tipo diccionario ---
+
+    def __getitem__(self, clave):
+        atributo = self.ALIAS.get(clave)
+        if atributo is None:
+            raise KeyError(clave)
+        return getattr(self, atributo)
+
+    def __setitem__(self, clave, valor):
+        atributo = self.ALIAS.get(clave)
+        if atributo is None:
+            raise KeyError(clave)
+        setattr(self, atributo, valor)
+
+    def __contains__(self, clave):
+        return clave in self.ALIAS
+
+    def get(self, clave, defecto=None):
+        atributo = self.ALIAS.get(clave)
+        return defecto if atributo is None else getattr(self, atributo)
+
+    def __eq__(self, otro):
+        return type(otro) is type(self) and otro.a_dict() == self.a_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.a_dict()!r})"
+
+
+class Pregunta(Registro):
+    CAMPOS = {
+        'pregunta': 'pregunta',
+        'opcion_a': 'opciones.a',
+        'opcion_b': 'opciones.b',
+        'opcion_c': 'opciones.c',
+        'opcion_correcta': 'opcion_correcta',
+        'comentario_a': 'comentarios.a',
+        'comentario_b': 'comentarios.b',
+        'comentario_c': 'comentarios.c',
+        'comentario_correcta': 'comentarios.correcta',
+        'id_tema': 'id_tema',
+    }
+    ESTADO = ('opciones_mezcladas', 'nombre_tema')
+    __slots__ = ('id',) + tuple(CAMPOS) + ESTADO
+
+    ALIAS = {
+        'ID_Pregunta': 'id',
+        'Pregunta': 'pregunta',
+        'Opcion_A': 'opcion_a',
+        'Opcion_B': 'opcion_b',
+        'Opcion_C': 'opcion_c',
+        'Opcion_Correcta': 'opcion_correcta',
+        'Comentario_A': 'comentario_a',
+        'Comentario_B': 'comentario_b',
+        'Comentario_C': 'comentario_c',
+        'Comentario_Correcta': 'comentario_correcta',
+        'ID_Tema': 'id_tema',
+        'Nombre_Tema': 'nombre_tema',
+    }
+
+    def comentario_para(self, opcion):
+        """Retroalimentación de la opción elegida ('' si no hay)."""
+        if opcion == self.opcion_correcta:
+            return self.comentario_correcta or ''
+        if opcion == self.opcion_a:
+            return self.comentario_a or ''
+        if opcion == self.opcion_b:
+            return self.comentario_b or ''
+        if opcion == self.opcion_c:
+            return self.comentario_c or ''
+        return ''
+
+
+class Video(Registro):
+    CAMPOS = {
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'url_video': 'url_video',
+        'id_area': 'id_area',
+        'visualizaciones': 'visualizaciones',
+        'cantidad_likes': 'cantidad_likes',
+        'cantidad_dislikes': 'cantidad_dislikes',
+    }
+    DEFECTOS = {'visualizaciones': 0, 'cantidad_likes': 0, 'cantidad_dislikes': 0}
+    __slots__ = ('id',) + tuple(CAMPOS)
+
+    ALIAS = {
+        'ID_Video': 'id',
+        'Nombre': 'nombre',
+        'Descripción': 'descripcion',
+        'URL_Video': 'url_video',
+        'ID_Area': 'id_area',
+        'Visualizaciones': 'visualizaciones',
+        'Cantidad_Likes': 'cantidad_likes',
+        'Cantidad_Dislikes': 'cantidad_dislikes',
+    }
+
+
+class Juego(Registro):
+    """Sopa de letras, crucigrama o simulador; `tipo` dice cuál."""
+
+    CAMPOS = {
+        'id_area': 'id_area',
+        'id_carrera': 'id_carrera',
+        'estado': 'estado',
+        'cantidad_palabras': 'cantidad_palabras',
+        'longitud': 'longitud',
+    }
+    ESTADO = ('tipo', 'nombre_area')
+    __slots__ = ('id',) + tuple(CAMPOS) + ESTADO
+
+    ALIAS = {
+        'ID_Sopa': 'id',
+        'ID_Crucigrama': 'id',
+        'ID_Simulador': 'id',
+        'ID_Area': 'id_area',
+        'Cantidad_Palabras': 'cantidad_palabras',
+        'Longitud': 'longitud',
+        'NombreArea': 'nombre_area',
+    }
+
+    @classmethod
+    def desde_firestore(cls, doc_id, data, tipo=None):
+        juego = super().desde_firestore(doc_id, data)
+        juego.tipo = tipo
+        return juego
+
+
+class Comentario(Registro):
+    CAMPOS = {
+        'comentario': 'comentario',
+        'fecha': 'fecha',
+        'id_usuario': 'id_usuario',
+    }
+    __slots__ = ('id',) + tuple(CAMPOS)
+
+    ALIAS = {
+        'ID_Comentario': 'id',
+        'Comentario': 'comentario',
+        'Fecha': 'fecha',
+        'ID_Usuario': 'id_usuario',
+    }
@@ -0,0 +1,116 @@
+"""
+Contadores distribuidos (fragmentos) de los videos.
+
+totales() lee los fragmentos de varios videos a la vez con
+collection_group('contadores').where('id_video', 'in', ...). Firestore no crea
+solo los índices de alcance grupo de colecciones: la exención de
+contadores.id_video está en firestore.indexes.json, en la raíz del repositorio
+(firebase deploy --only firestore:indexes). Sin ella la consulta falla con
+FAILED_PRECONDITION y un enlace para crear el índice.
+"""
+import random
+import threading
+import time
+
+from src.arranque import modulo_diferido
+
+firestore = modulo_diferido("firebase_admin.firestore")
+
+
+CAMPOS_CONTADOR = ("cantidad_likes", "cantidad_dislikes", "visualizaciones")
+
+# Firestore limita el operador 'in' a 30 valores por consulta
+MAX_VALORES_IN = 30
+
+
+class ShardedCounters:
+    """
+    Contadores distribuidos para videos.
+
+    Cada video tiene `num_fragmentos` documentos en videos/{id}/contadores/{n}.
+    Las escrituras caen en un fragmento al azar, así un video popular no choca
+    con el límite de ~1 escritura por segundo por documento. Al leer se suman
+    los fragmentos (más lo que ya tuviera el documento principal) y el total se
+    guarda unos segundos para no releer los fragmentos en cada pantalla.
+    """
+
+    def __init__(self, db, num_fragmentos=10, ttl=30.0):
+        self.db = db
+        self.num_fragmentos = num_fragmentos
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._totales = {}  # id_video -> (expira_en, {campo: suma})
+
+    # ------------------------------------------
+    #      ESCRITURA
+    # ------------------------------------------
+
+    def ref_aleatoria(self, id_video, db=None):
+        # db: otro cliente sobre la misma base (el AsyncClient en sus transacciones)
+        n = random.randrange(self.num_fragmentos)
+        return (db or self.db).collection('videos').document(id_video).collection('contadores').document(str(n))
+
+    def datos_incremento(self, id_video, campos):
+        """
+        Datos para batch.set(..., merge=True) sobre un fragmento. Incluye id_video
+        para poder leer los fragmentos de varios videos con un collection_group.
+        """
+        datos = {campo: firestore.Increment(delta) for campo, delta in campos.items() if delta != 0}
+        datos["id_video"] = id_video
+        return datos
+
+    def registrar_local(self, id_video, campos):
+        # Tras un commit, sumamos los deltas al total en caché para no mostrar números viejos
+        with self._lock:
+            entrada = self._totales.get(id_video)
+            if entrada is None:
+                return
+            for campo, delta in campos.items():
+                entrada[1][campo] = entrada[1].get(campo, 0) + delta
+
+    # ------------------------------------------
+    #      LECTURA
+    # ------------------------------------------
+
+    def totales(self, ids_videos):
+        """Devuelve {id_video: {campo: suma}} leyendo solo los videos sin total vigente."""
+        ahora = time.monotonic()
+        resultado = {}
+        faltantes = []
+        with self._lock:
+            for id_video in dict.fromkeys(ids_videos):
+                entrada = self._totales.get(id_video)
+                if entrada and entrada[0] > ahora:
+                    resultado[id_video] = dict(entrada[1])
+                else:
+                    faltantes.append(id_video)
+
+        for inicio in range(0, len(faltantes), MAX_VALORES_IN):
+            bloque = faltantes[inicio:inicio + MAX_VALORES_IN]
+            sumas = {id_video: dict.fromkeys(CAMPOS_CONTADOR, 0) for id_video in bloque}
+            docs = self.db.collection_group('contadores').where('id_video', 'in', bloque).stream()
+            for doc in docs:
+                d = doc.to_dict()
+                suma = sumas.get(d.get('id_video'))
+                if suma is None:
+                    continue
+                for campo in CAMPOS_CONTADOR:
+                    suma[campo] += d.get(campo, 0)
+
+            with self._lock:
+                expira_en = time.monotonic() + self.ttl
+                for id_video, suma in sumas.items():
+                    self._totales[id_video] = (expira_en, suma)
+                    resultado[id_video] = dict(suma)
+        return resultado
+
+    def aplicar(self, videos):
+        """Suma los fragmentos a los campos en minúscula de cada video (dicts de Firestore)."""
+        if not videos:
+            return videos
+        totales = self.totales(v['ID_Video'] for v in videos)
+        for video in videos:
+            for campo, suma in totales.get(video['ID_Video'], {}).items():
+                video[campo] = video.get(campo, 0) + suma
+        return videos
@@ -0,0 +1,218 @@
+"""
+Sincronización delta por marcas de agua (`actualizado_en`).
+
+    python -m src.database.sincronizacion CA002       # actualiza el espejo SQLite local
+    python -m src.database.sincronizacion --rellenar  # pone actualizado_en a lo que no lo tiene
+
+Cada documento de contenido guarda `actualizado_en` (SERVER_TIMESTAMP, lo pone
+el importador). Para cada colección y carrera, el almacén local recuerda la
+marca más alta que ya aplicó, y SincronizadorDelta solo pide los documentos
+con actualizado_en >= marca - SOLAPE_SEGUNDOS. Así refrescar una carrera
+cuesta tantas lecturas como documentos cambiaron (más una por consulta vacía),
+no tantas como tenga el catálogo.
+
+Las bajas son bajas lógicas: el documento cambia su `estado` y se sincroniza
+como cualquier otro cambio; cada almacén lo deja fuera de sus consultas.
+
+Un almacén es cualquier objeto con:
+    ids_areas(id_carrera)
+    leer_marca(coleccion, id_carrera) / guardar_marca(coleccion, id_carrera, marca)
+    aplicar_cambios(coleccion, [(doc_id, datos), ...])
+Lo implementan ContenidoOffline (paquetes en memoria) y SQLiteHelper.
+
+Índices compuestos necesarios en Firestore: (id_carrera, actualizado_en) y
+(id_area, actualizado_en) en cada colección de ALCANCE_CARRERA; están en
+firestore.indexes.json.
+"""
+import argparse
+import datetime
+import threading
+import time
+
+from src.database.metricas import contar
+from src.database.sharded_counter import MAX_VALORES_IN
+
+
+CAMPO_MARCA = 'actualizado_en'
+
+# Margen hacia atrás en cada consulta: SERVER_TIMESTAMP es la hora del commit y
+# una escritura en vuelo puede confirmarse con una hora anterior a la marca.
+# Reaplicar un documento repetido no cambia nada.
+SOLAPE_SEGUNDOS = 5
+
+# No se vuelve a consultar la misma carrera antes de este intervalo
+INTERVALO_MINIMO_SEGUNDOS = 60
+
+# (colección, campo que la liga a la carrera); 'id_area' se filtra con las áreas
+# de la carrera. Las áreas van primero para que un área nueva ya cuente.
+ALCANCE_CARRERA = (
+    ('areas', 'id_carrera'),
+    ('temas', 'id_area'),
+    ('videos', 'id_area'),
+    ('preguntas', 'id_area'),
+    ('palabras', 'id_area'),
+    ('simuladores', 'id_carrera'),
+    ('sopa', 'id_carrera'),
+    ('crucigrama', 'id_carrera'),
+)
+
+
+def _a_fecha(marca):
+    if marca is None or isinstance(marca, datetime.datetime):
+        return marca
+    try:
+        fecha = datetime.datetime.fromisoformat(str(marca))
+    except ValueError:
+        return None
+    return fecha if fecha.tzinfo else fecha.replace(tzinfo=datetime.timezone.utc)
+
+
+class SincronizadorDelta:
+    """Trae de Firestore lo que cambió desde la última marca y lo aplica al almacén."""
+
+    def __init__(self, almacen, db=None, tam_pagina=500, solape=SOLAPE_SEGUNDOS,
+                 intervalo_minimo=INTERVALO_MINIMO_SEGUNDOS):
+        if db is None:
+            from src.database.database import get_firestore_client
+            db = get_firestore_client()
+        self.db = db
+        self.almacen = almacen
+        self.tam_pagina = tam_pagina
+        self.solape = datetime.timedelta(seconds=solape)
+        self.intervalo_minimo = intervalo_minimo
+
+        self._lock = threading.Lock()
+        self._en_curso = set()
+        self._ultima = {}  # id_carrera -> time.monotonic() de la última sincronización
+        self.lecturas = 0
+        self.aplicados = 0
+
+    def sincronizar_carrera(self, id_carrera, forzar=False):
+        """Devuelve {coleccion: documentos aplicados}. No hace nada si ya corre o es muy pronto."""
+        with self._lock:
+            ultima = self._ultima.get(id_carrera)
+            if id_carrera in self._en_curso or (
+                    not forzar and ultima is not None and time.monotonic() - ultima < self.intervalo_minimo):
+                return {}
+            self._en_curso.add(id_carrera)
+
+        resumen = {}
+        try:
+            for coleccion, campo in ALCANCE_CARRERA:
+                valores = [id_carrera] if campo == 'id_carrera' else self.almacen.ids_areas(id_carrera)
+                resumen[coleccion] = self._sincronizar(coleccion, campo, valores, id_carrera)
+        except Exception as e:
+            print(f"ERROR en la sincronización de {id_carrera}: {e}")
+        finally:
+            with self._lock:
+                self._en_curso.discard(id_carrera)
+                self._ultima[id_carrera] = time.monotonic()
+
+        # Las lecturas ya las cuenta metricas.instrumentar_firestore
+        for coleccion, aplicados in resumen.items():
+            if aplicados:
+                contar(f"sincronizados.{coleccion}", aplicados)
+        return resumen
+
+    def refrescar_en_segundo_plano(self, id_carrera):
+        hilo = threading.Thread(target=self.sincronizar_carrera, args=(id_carrera,),
+                                name=f"sync-{id_carrera}", daemon=True)
+        hilo.start()
+        return hilo
+
+    def _sincronizar(self, coleccion, campo, valores, id_carrera):
+        valores = [v for v in dict.fromkeys(valores) if v]
+        if not valores:
+            return 0
+        marca = _a_fecha(self.almacen.leer_marca(coleccion, id_carrera))
+        desde = marca - self.solape if marca is not None else None
+
+        aplicados = 0
+        nueva_marca = marca
+        for inicio in range(0, len(valores), MAX_VALORES_IN):
+            consulta = self.db.collection(coleccion).where(campo, 'in', valores[inicio:inicio + MAX_VALORES_IN])
+            if desde is not None:
+                consulta = consulta.where(CAMPO_MARCA, '>=', desde)
+            consulta = consulta.order_by(CAMPO_MARCA).limit(self.tam_pagina)
+
+            ultimo = None
+            while True:
+                pagina = list((consulta.start_after(ultimo) if ultimo is not None else consulta).stream())
+                # Una consulta vacía también se cobra como una lectura
+                self.lecturas += max(len(pagina), 1)
+                if not pagina:
+                    break
+                cambios = [(doc.id, doc.to_dict()) for doc in pagina]
+                self.almacen.aplicar_cambios(coleccion, cambios)
+                aplicados += len(cambios)
+
+                fecha = _a_fecha(cambios[-1][1].get(CAMPO_MARCA))
+                if fecha is not None and (nueva_marca is None or fecha > nueva_marca):
+                    nueva_marca = fecha
+                if len(pagina) < self.tam_pagina:
+                    break
+                ultimo = pagina[-1]
+
+        if nueva_marca is not None and nueva_marca != marca:
+            self.almacen.guardar_marca(coleccion, id_carrera, nueva_marca.isoformat())
+        self.aplicados += aplicados
+        return aplicados
+
+
+# ==========================================
+#      MANTENIMIENTO
+# ==========================================
+
+def rellenar_actualizado_en(db, colecciones=None):
+    """Pone actualizado_en a los documentos que no lo tienen (cargados antes de existir el campo)."""
+    from src.database.database import firestore
+    from src.database.write_behind import MAX_OPERACIONES_BATCH
+
+    total = 0
+    for coleccion in colecciones or [c for c, _ in ALCANCE_CARRERA] + ['carreras']:
+        batch = db.batch()
+        pendientes = 0
+        for doc in db.collection(coleccion).select([CAMPO_MARCA]).stream():
+            if (doc.to_dict() or {}).get(CAMPO_MARCA) is not None:
+                continue
+            batch.update(doc.reference, {CAMPO_MARCA: firestore.SERVER_TIMESTAMP})
+            pendientes += 1
+            total += 1
+            if pendientes >= MAX_OPERACIONES_BATCH:
+                batch.commit()
+                batch = db.batch()
+                pendientes = 0
+        if pendientes:
+            batch.commit()
+        print(f" - {coleccion}: listo")
+    print(f"INFO: {total} documentos sin {CAMPO_MARCA} actualizados.")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sincronización delta del contenido local.")
+    parser.add_argument('carreras', nargs='*', help="IDs de carrera a sincronizar en la base SQLite local")
+    parser.add_argument('--rellenar', action='store_true', help=f"Pone {CAMPO_MARCA} a los documentos sin él")
+    args = parser.parse_args(argv)
+
+    from src.database.database import get_firestore_client
+    db = get_firestore_client()
+    if args.rellenar:
+        rellenar_actualizado_en(db)
+    if not args.carreras:
+        return
+
+    # La primera vez (sin marca) trae todo lo que tenga actualizado_en; después, solo lo nuevo
+    from src.database.sqlite_helper import SQLiteHelper
+    espejo = SQLiteHelper()
+    try:
+        sincronizador = SincronizadorDelta(espejo, db=db)
+        for id_carrera in dict.fromkeys(args.carreras):
+            resumen = sincronizador.sincronizar_carrera(id_carrera, forzar=True)
+            print(f"INFO: {id_carrera}: {resumen}")
+    finally:
+        espejo.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,572 @@
+import sqlite3
+import os
+import datetime
+import threading
+import uuid
+
+from src.database.backend import StorageBackend
+from src.database.csv_loader import cargar_csv, populate_from_csv_if_empty, reparar_texto
+from src.database.metricas import medir_metodos
+from src.database.registros import Comentario, Juego, Pregunta, Video
+
+
+# --- ESQUEMA LOCAL ---
+# Las columnas siguen los encabezados de assets/csv para que csv_loader pueda
+# insertar cada fila tal cual. Los índices cubren los filtros de cada pantalla.
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS Campus (
+    ID_Campus TEXT PRIMARY KEY, Nombre TEXT, Estado TEXT
+);
+CREATE TABLE IF NOT EXISTS Carrera (
+    ID_Carrera TEXT PRIMARY KEY, Nombre TEXT, Estado TEXT
+);
+CREATE TABLE IF NOT EXISTS Carrera_Campus (
+    ID_Carrera_Campus TEXT PRIMARY KEY, ID_Carrera TEXT, ID_Campus TEXT
+);
+CREATE TABLE IF NOT EXISTS Area (
+    ID_Area TEXT PRIMARY KEY, Nombre TEXT, Estado TEXT, ID_Carrera TEXT
+);
+CREATE TABLE IF NOT EXISTS Tema (
+    ID_Tema TEXT PRIMARY KEY, Nombre TEXT, ID_Area TEXT, Estado TEXT
+);
+CREATE TABLE IF NOT EXISTS Video (
+    ID_Video TEXT PRIMARY KEY, Nombre TEXT, Descripcion TEXT, URL_Video TEXT, Duracion INTEGER,
+    Visualizaciones INTEGER DEFAULT 0, Cantidad_Likes INTEGER DEFAULT 0, Cantidad_Dislikes INTEGER DEFAULT 0,
+    Estado TEXT, ID_Area TEXT
+);
+CREATE TABLE IF NOT EXISTS Pregunta (
+    ID_Pregunta TEXT PRIMARY KEY, Pregunta TEXT, Opcion_A TEXT, Opcion_B TEXT, Opcion_C TEXT,
+    Opcion_Correcta TEXT, Comentario_A TEXT, Comentario_B TEXT, Comentario_C TEXT, Comentario_Correcta TEXT,
+    Estado TEXT, ID_Video TEXT, ID_Area TEXT, ID_Tema TEXT
+);
+CREATE TABLE IF NOT EXISTS Simulador (
+    ID_Simulador TEXT PRIMARY KEY, Longitud INTEGER, Estado TEXT, ID_Carrera TEXT, ID_Area TEXT
+);
+CREATE TABLE IF NOT EXISTS Sopa (
+    ID_Sopa TEXT PRIMARY KEY, Cantidad_Palabras INTEGER, Estado TEXT, ID_Area TEXT, ID_Carrera TEXT
+);
+CREATE TABLE IF NOT EXISTS Crucigrama (
+    ID_Crucigrama TEXT PRIMARY KEY, Cantidad_Palabras INTEGER, Estado TEXT, ID_Area TEXT, ID_Carrera TEXT
+);
+CREATE TABLE IF NOT EXISTS Palabra (
+    ID_Palabra TEXT PRIMARY KEY, Longitud INTEGER, Palabra TEXT, Descripcion TEXT, Estado TEXT,
+    ID_Area TEXT, ID_Sopa TEXT, ID_Crucigrama TEXT
+);
+CREATE TABLE IF NOT EXISTS Comentario (
+    ID_Comentario TEXT PRIMARY KEY, Comentario TEXT, Fecha TEXT, Estado TEXT, ID_Usuario TEXT, ID_Video TEXT
+);
+CREATE TABLE IF NOT EXISTS Reaccion (
+    ID_Reaccion TEXT PRIMARY KEY, ID_Video TEXT, ID_Usuario TEXT, Tipo TEXT, Fecha TEXT, Estado TEXT
+);
+CREATE TABLE IF NOT EXISTS Usuario (
+    ID_Usuario TEXT PRIMARY KEY, ID_Campus TEXT, ID_Carrera TEXT
+);
+CREATE TABLE IF NOT EXISTS Resultado (
+    ID_Resultado TEXT PRIMARY KEY, Calificacion REAL, Tiempo INTEGER, Fecha TEXT,
+    ID_Tema TEXT, ID_Usuario TEXT, ID_Simulador TEXT
+);
+CREATE TABLE IF NOT EXISTS Intento (
+    ID_Intento TEXT PRIMARY KEY, ID_Usuario TEXT, ID_Simulador TEXT, Calificacion REAL,
+    Correctas INTEGER, Total INTEGER, Tiempo INTEGER, Fecha TEXT
+);
+CREATE TABLE IF NOT EXISTS Sync_Marca (
+    Coleccion TEXT, ID_Carrera TEXT, Marca TEXT, PRIMARY KEY (Coleccion, ID_Carrera)
+);
+
+CREATE INDEX IF NOT EXISTS idx_campus_estado ON Campus (Estado);
+CREATE INDEX IF NOT EXISTS idx_carrera_nombre ON Carrera (Nombre);
+CREATE INDEX IF NOT EXISTS idx_carrera_campus ON Carrera_Campus (ID_Campus);
+CREATE INDEX IF NOT EXISTS idx_area_carrera ON Area (ID_Carrera, Estado);
+CREATE INDEX IF NOT EXISTS idx_video_area ON Video (ID_Area, Estado);
+CREATE INDEX IF NOT EXISTS idx_pregunta_video ON Pregunta (ID_Video, Estado);
+CREATE INDEX IF NOT EXISTS idx_pregunta_area ON Pregunta (ID_Area, Estado);
+CREATE INDEX IF NOT EXISTS idx_simulador_carrera ON Simulador (ID_Carrera, Estado);
+CREATE INDEX IF NOT EXISTS idx_sopa_carrera ON Sopa (ID_Carrera, Estado);
+CREATE INDEX IF NOT EXISTS idx_crucigrama_carrera ON Crucigrama (ID_Carrera, Estado);
+CREATE INDEX IF NOT EXISTS idx_palabra_sopa ON Palabra (ID_Sopa);
+CREATE INDEX IF NOT EXISTS idx_palabra_crucigrama ON Palabra (ID_Crucigrama, Estado);
+CREATE INDEX IF NOT EXISTS idx_comentario_video ON Comentario (ID_Video, Estado, Fecha);
+CREATE INDEX IF NOT EXISTS idx_reaccion_video_usuario ON Reaccion (ID_Video, ID_Usuario);
+"""
+
+# Mapeo de nombres de columnas de la app a columnas de la tabla Video
+CAMPOS_CONTADOR = {
+    "Cantidad_Likes": "Cantidad_Likes",
+    "Cantidad_Dislikes": "Cantidad_Dislikes",
+    "Visualizaciones": "Visualizaciones",
+}
+
+
+# Colección de Firestore -> tabla local, para aplicar la sincronización delta
+TABLAS_FIRESTORE = {
+    'carreras': 'Carrera',
+    'areas': 'Area',
+    'temas': 'Tema',
+    'videos': 'Video',
+    'preguntas': 'Pregunta',
+    'simuladores': 'Simulador',
+    'sopa': 'Sopa',
+    'crucigrama': 'Crucigrama',
+    'palabras': 'Palabra',
+}
+
+# Columnas cuyo campo en Firestore no es el nombre en minúscula
+RUTAS_FIRESTORE = {
+    'Opcion_A': 'opciones.a',
+    'Opcion_B': 'opciones.b',
+    'Opcion_C': 'opciones.c',
+    'Comentario_A': 'comentarios.a',
+    'Comentario_B': 'comentarios.b',
+    'Comentario_C': 'comentarios.c',
+    'Comentario_Correcta': 'comentarios.correcta',
+}
+
+
+@medir_metodos
+class SQLiteHelper(StorageBackend):
+    """
+    Implementación local de StorageBackend sobre SQLite.
+    La base se crea junto a este archivo y se llena desde assets/csv la
+    primera vez que se abre (ver csv_loader.populate_from_csv_if_empty).
+    """
+
+    def __init__(self, db_name="ruta_lince.db"):
+        self.base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.db_path = db_name if os.path.isabs(db_name) or db_name == ":memory:" \
+            else os.path.join(self.base_dir, db_name)
+
+        # Flet atiende eventos desde varios hilos: una conexión protegida por lock
+        self._lock = threading.RLock()
+        self._conn = None
+        self._ensure_tables_exist_and_populate()
+
+    # ==========================================
+    #      CONEXIÓN
+    # ==========================================
+
+    def _get_connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def _ensure_tables_exist_and_populate(self):
+        with self._lock:
+            conn = self._get_connection()
+            conn.executescript(ESQUEMA)
+            populate_from_csv_if_empty(self, conn)
+            # Bases creadas antes de que csv_loader cargara comentario.csv
+            if conn.execute("SELECT COUNT(*) FROM Comentario").fetchone()[0] == 0:
+                cargar_csv(self, conn, {'comentario.csv': self.insert_comentario})
+
+    def _execute_query(self, query, params=()):
+        with self._lock:
+            return self._get_connection().execute(query, params).fetchall()
+
+    def _execute_commit(self, query, params=()):
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute(query, params)
+            conn.commit()
+
+    def _insert_row(self, tabla, row):
+        # Usado por csv_loader: el commit se hace una sola vez al final de la carga
+        valores = [reparar_texto(v) for v in row]
+        marcas = ",".join("?" * len(valores))
+        self._get_connection().execute(f"INSERT OR REPLACE INTO {tabla} VALUES ({marcas})", valores)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==========================================
+    #      INSERCIÓN DESDE CSV
+    # ==========================================
+
+    def insert_campus(self, row):
+        self._insert_row("Campus", row)
+
+    def insert_carrera(self, row):
+        self._insert_row("Carrera", row)
+
+    def insert_carrera_campus(self, row):
+        self._insert_row("Carrera_Campus", row)
+
+    def insert_area(self, row):
+        self._insert_row("Area", row)
+
+    def insert_tema(self, row):
+        self._insert_row("Tema", row)
+
+    def insert_video(self, row):
+        self._insert_row("Video", row)
+
+    def insert_pregunta(self, row):
+        self._insert_row("Pregunta", row)
+
+    def insert_simulador(self, row):
+        self._insert_row("Simulador", row)
+
+    def insert_sopa(self, row):
+        self._insert_row("Sopa", row)
+
+    def insert_crucigrama(self, row):
+        self._insert_row("Crucigrama", row)
+
+    def insert_palabra(self, row):
+        self._insert_row("Palabra", row)
+
+    def insert_comentario(self, row):
+        self._insert_row("Comentario", row)
+
+    # ==========================================
+    #      MÉTODOS DE LECTURA (GET)
+    # ==========================================
+
+    def get_campus(self):
+        rows = self._execute_query("SELECT ID_Campus, Nombre FROM Campus WHERE Estado = 'Activo'")
+        return [{"ID_Campus": r["ID_Campus"], "Nombre": r["Nombre"]} for r in rows]
+
+    def get_campus_by_id(self, id_campus):
+        rows = self._execute_query("SELECT ID_Campus, Nombre FROM Campus WHERE ID_Campus = ?", (id_campus,))
+        return {"ID_Campus": rows[0]["ID_Campus"], "Nombre": rows[0]["Nombre"]} if rows else None
+
+    def get_carrera(self):
+        rows = self._execute_query("SELECT * FROM Carrera")
+        return [{"ID_Carrera": r["ID_Carrera"], "Nombre": r["Nombre"], "nombre": r["Nombre"], "estado": r["Estado"]}
+                for r in rows]
+
+    def get_carrera_by_id(self, id_carrera):
+        rows = self._execute_query("SELECT ID_Carrera, Nombre FROM Carrera WHERE ID_Carrera = ?", (id_carrera,))
+        return {"ID_Carrera": rows[0]["ID_Carrera"], "Nombre": rows[0]["Nombre"]} if rows else None
+
+    def get_carreras_por_id_campus(self, id_campus):
+        rows = self._execute_query(
+            "SELECT c.ID_Carrera, c.Nombre FROM Carrera_Campus cc "
+            "JOIN Carrera c ON c.ID_Carrera = cc.ID_Carrera "
+            "WHERE cc.ID_Campus = ? ORDER BY cc.ID_Carrera_Campus", (id_campus,))
+        return [(r["ID_Carrera"], r["Nombre"]) for r in rows]
+
+    def get_id_carrera_by_nombre(self, nombre_carrera):
+        rows = self._execute_query("SELECT ID_Carrera FROM Carrera WHERE Nombre = ? LIMIT 1", (nombre_carrera,))
+        return rows[0]["ID_Carrera"] if rows else None
+
+    def get_areas_id_carrera(self, id_carrera):
+        rows = self._execute_query(
+            "SELECT ID_Area, Nombre FROM Area WHERE ID_Carrera = ? AND Estado = 'Activo'", (id_carrera,))
+        return [{"ID_Area": r["ID_Area"], "Nombre": r["Nombre"]} for r in rows]
+
+    def get_nombres_areas_por_ids(self, ids_areas):
+        ids_unicos = list(dict.fromkeys(i for i in ids_areas if i))
+        if not ids_unicos:
+            return {}
+        marcas = ",".join("?" * len(ids_unicos))
+        rows = self._execute_query(f"SELECT ID_Area, Nombre FROM Area WHERE ID_Area IN ({marcas})", ids_unicos)
+        return {r["ID_Area"]: r["Nombre"] for r in rows}
+
+    def get_tema_by_id(self, id_tema):
+        rows = self._execute_query("SELECT * FROM Tema WHERE ID_Tema = ?", (id_tema,))
+        if not rows:
+            return None
+        r = rows[0]
+        return {"ID_Tema": r["ID_Tema"], "Nombre": r["Nombre"], "nombre": r["Nombre"],
+                "id_area": r["ID_Area"], "estado": r["Estado"]}
+
+    def _fila_video(self, r):
+        # Mismo tipo que devuelve DatabaseHelper
+        return Video(
+            id=r["ID_Video"],
+            nombre=r["Nombre"],
+            descripcion=r["Descripcion"],
+            url_video=r["URL_Video"],
+            id_area=r["ID_Area"],
+            visualizaciones=r["Visualizaciones"] or 0,
+            cantidad_likes=max(0, r["Cantidad_Likes"] or 0),
+            cantidad_dislikes=max(0, r["Cantidad_Dislikes"] or 0),
+        )
+
+    def get_videos_by_id_area(self, id_area):
+        rows = self._execute_query("SELECT * FROM Video WHERE ID_Area = ? AND Estado = 'Activo'", (id_area,))
+        return [self._fila_video(r) for r in rows]
+
+    def get_video_by_id(self, video_id):
+        rows = self._execute_query("SELECT * FROM Video WHERE ID_Video = ?", (video_id,))
+        return self._fila_video(rows[0]) if rows else None
+
+    def get_preguntas_por_id_video(self, video_id):
+        rows = self._execute_query(
+            "SELECT * FROM Pregunta WHERE ID_Video = ? AND Estado = 'Activo'", (video_id,))
+        return [Pregunta(
+            id=r["ID_Pregunta"],
+            pregunta=r["Pregunta"],
+            opcion_a=r["Opcion_A"],
+            opcion_b=r["Opcion_B"],
+            opcion_c=r["Opcion_C"],
+            opcion_correcta=r["Opcion_Correcta"],
+            comentario_correcta=r["Comentario_Correcta"],
+        ) for r in rows]
+
+    def get_preguntas_por_id_area_activo(self, id_area, con_comentarios=True):
+        rows = self._execute_query(
+            "SELECT * FROM Pregunta WHERE ID_Area = ? AND Estado = 'Activo'", (id_area,))
+        return [self._fila_pregunta(r, con_comentarios) for r in rows]
+
+    def get_preguntas_aleatorias(self, id_area, k, con_comentarios=False):
+        rows = self._execute_query(
+            "SELECT * FROM Pregunta WHERE ID_Area = ? AND Estado = 'Activo' ORDER BY RANDOM() LIMIT ?",
+            (id_area, k))
+        return [self._fila_pregunta(r, con_comentarios) for r in rows]
+
+    def _fila_pregunta(self, r, con_comentarios):
+        pregunta = Pregunta(
+            id=r["ID_Pregunta"],
+            pregunta=r["Pregunta"],
+            opcion_a=r["Opcion_A"],
+            opcion_b=r["Opcion_B"],
+            opcion_c=r["Opcion_C"],
+            opcion_correcta=r["Opcion_Correcta"],
+            id_tema=r["ID_Tema"],
+        )
+        if con_comentarios:
+            pregunta.actualizar(self._fila_comentarios(r))
+        return pregunta
+
+    def get_comentarios_preguntas(self, ids_preguntas):
+        ids_unicos = list(dict.fromkeys(i for i in ids_preguntas if i))
+        if not ids_unicos:
+            return {}
+        marcas = ",".join("?" * len(ids_unicos))
+        rows = self._execute_query(
+            f"SELECT ID_Pregunta, Comentario_A, Comentario_B, Comentario_C, Comentario_Correcta "
+            f"FROM Pregunta WHERE ID_Pregunta IN ({marcas})", ids_unicos)
+        return {r["ID_Pregunta"]: self._fila_comentarios(r) for r in rows}
+
+    @staticmethod
+    def _fila_comentarios(r):
+        return {
+            "Comentario_A": r["Comentario_A"],
+            "Comentario_B": r["Comentario_B"],
+            "Comentario_C": r["Comentario_C"],
+            "Comentario_Correcta": r["Comentario_Correcta"],
+        }
+
+    def get_user_reaction_for_video(self, video_id, user_id):
+        rows = self._execute_query(
+            "SELECT Tipo FROM Reaccion WHERE ID_Video = ? AND ID_Usuario = ? LIMIT 1", (video_id, user_id))
+        return rows[0]["Tipo"] if rows else None
+
+    def get_comments_by_id_video(self, video_id):
+        rows = self._execute_query(
+            "SELECT * FROM Comentario WHERE ID_Video = ? AND Estado = 'Activo' ORDER BY Fecha DESC", (video_id,))
+        return [self._fila_comentario(r) for r in rows]
+
+    def get_comments_page(self, video_id, limite=20, cursor=None):
+        # El cursor es (Fecha, ID_Comentario) del último comentario de la página anterior
+        if cursor is None:
+            rows = self._execute_query(
+                "SELECT * FROM Comentario WHERE ID_Video = ? AND Estado = 'Activo' "
+                "ORDER BY Fecha DESC, ID_Comentario DESC LIMIT ?", (video_id, limite + 1))
+        else:
+            rows = self._execute_query(
+                "SELECT * FROM Comentario WHERE ID_Video = ? AND Estado = 'Activo' "
+                "AND (Fecha < ? OR (Fecha = ? AND ID_Comentario < ?)) "
+                "ORDER BY Fecha DESC, ID_Comentario DESC LIMIT ?",
+                (video_id, cursor[0], cursor[0], cursor[1], limite + 1))
+        hay_mas = len(rows) > limite
+        rows = rows[:limite]
+        siguiente = (rows[-1]["Fecha"], rows[-1]["ID_Comentario"]) if hay_mas and rows else None
+        return [self._fila_comentario(r) for r in rows], siguiente
+
+    @staticmethod
+    def _fila_comentario(r):
+        return Comentario(id=r["ID_Comentario"], comentario=r["Comentario"], fecha=r["Fecha"],
+                          id_usuario=r["ID_Usuario"])
+
+    # --- JUEGOS Y SIMULADORES ---
+
+    def _juegos_con_area(self, tabla, id_columna, tipo, id_carrera):
+        rows = self._execute_query(
+            f"SELECT j.*, a.Nombre AS NombreArea FROM {tabla} j "
+            f"LEFT JOIN Area a ON a.ID_Area = j.ID_Area "
+            f"WHERE j.ID_Carrera = ? AND j.Estado = 'Activo'", (id_carrera,))
+        resultado = []
+        for r in rows:
+            columnas = r.keys()
+            resultado.append(Juego(
+                id=r[id_columna],
+                id_area=r["ID_Area"],
+                id_carrera=r["ID_Carrera"],
+                estado=r["Estado"],
+                cantidad_palabras=r["Cantidad_Palabras"] if "Cantidad_Palabras" in columnas else None,
+                longitud=r["Longitud"] if "Longitud" in columnas else None,
+                tipo=tipo,
+                nombre_area=r["NombreArea"] or "N/A",
+            ))
+        return resultado
+
+    def get_sopas_con_area_by_id_carrera(self, id_carrera):
+        return self._juegos_con_area("Sopa", "ID_Sopa", "sopa", id_carrera)
+
+    def get_crucigramas_con_area_by_id_carrera(self, id_carrera):
+        return self._juegos_con_area("Crucigrama", "ID_Crucigrama", "crucigrama", id_carrera)
+
+    def get_simuladores_con_area_by_id_carrera(self, id_carrera):
+        return self._juegos_con_area("Simulador", "ID_Simulador", "simulador", id_carrera)
+
+    def get_palabras_por_sopa(self, id_sopa):
+        rows = self._execute_query("SELECT Palabra FROM Palabra WHERE ID_Sopa = ?", (id_sopa,))
+        return [r["Palabra"] for r in rows]
+
+    def palabra_crucigrama(self, id_crucigrama):
+        rows = self._execute_query(
+            "SELECT Palabra, Descripcion FROM Palabra WHERE ID_Crucigrama = ? AND Estado = 'Activo' "
+            "ORDER BY RANDOM() LIMIT 1", (id_crucigrama,))
+        if rows:
+            elegida = rows[0]
+            return {'palabra': elegida["Palabra"], 'descripcion': elegida["Descripcion"]}
+        raise Exception("No se encontró una palabra para este crucigrama.")
+
+    # ==========================================
+    #      MÉTODOS DE ESCRITURA (INSERT/UPDATE)
+    # ==========================================
+
+    def insert_reaction(self, reaction_id, video_id, user_id, tipo):
+        ahora = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("INSERT OR REPLACE INTO Reaccion VALUES (?, ?, ?, ?, ?, 'Activo')",
+                         (reaction_id, video_id, user_id, tipo, ahora))
+            # Mismo comportamiento que DatabaseHelper
+            if tipo == 'like':
+                conn.execute("UPDATE Video SET Cantidad_Likes = Cantidad_Likes + 1 WHERE ID_Video = ?", (video_id,))
+            elif tipo == 'dislike':
+                conn.execute("UPDATE Video SET Cantidad_Dislikes = Cantidad_Dislikes + 1 WHERE ID_Video = ?",
+                             (video_id,))
+            conn.commit()
+
+    def delete_reaction(self, video_id, user_id):
+        with self._lock:
+            conn = self._get_connection()
+            rows = conn.execute("SELECT ID_Reaccion, Tipo FROM Reaccion WHERE ID_Video = ? AND ID_Usuario = ?",
+                                (video_id, user_id)).fetchall()
+            for r in rows:
+                conn.execute("DELETE FROM Reaccion WHERE ID_Reaccion = ?", (r["ID_Reaccion"],))
+                campo = "Cantidad_Likes" if r["Tipo"] == "like" else "Cantidad_Dislikes"
+                conn.execute(f"UPDATE Video SET {campo} = {campo} - 1 WHERE ID_Video = ?", (video_id,))
+            conn.commit()
+
+    def toggle_reaction(self, video_id, user_id, tipo):
+        # Misma semántica que DatabaseHelper.toggle_reaction, en una sola transacción local
+        ahora = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+        with self._lock:
+            conn = self._get_connection()
+            fila = conn.execute("SELECT ID_Reaccion, Tipo FROM Reaccion WHERE ID_Video = ? AND ID_Usuario = ? LIMIT 1",
+                                (video_id, user_id)).fetchone()
+            anterior = fila["Tipo"] if fila else None
+
+            deltas = {}
+            if anterior:
+                columna = "Cantidad_Likes" if anterior.lower() == "like" else "Cantidad_Dislikes"
+                deltas[columna] = -1
+                conn.execute("DELETE FROM Reaccion WHERE ID_Video = ? AND ID_Usuario = ?", (video_id, user_id))
+
+            nuevo = None
+            if not anterior or anterior.lower() != tipo.lower():
+                conn.execute("INSERT INTO Reaccion VALUES (?, ?, ?, ?, ?, 'Activo')",
+                             (f"{video_id}_{user_id}", video_id, user_id, tipo, ahora))
+                columna = "Cantidad_Likes" if tipo.lower() == "like" else "Cantidad_Dislikes"
+                deltas[columna] = deltas.get(columna, 0) + 1
+                nuevo = tipo
+
+            for columna, delta in deltas.items():
+                if delta:
+                    conn.execute(f"UPDATE Video SET {columna} = {columna} + ? WHERE ID_Video = ?", (delta, video_id))
+            conn.commit()
+        return nuevo
+
+    def incrementar_visualizacion(self, id_video):
+        self._execute_commit("UPDATE Video SET Visualizaciones = Visualizaciones + 1 WHERE ID_Video = ?",
+                             (id_video,))
+
+    def update_video_counter(self, video_id, field, delta):
+        columna = CAMPOS_CONTADOR.get(field)
+        if columna:
+            self._execute_commit(f"UPDATE Video SET {columna} = {columna} + ? WHERE ID_Video = ?",
+                                 (delta, video_id))
+        else:
+            print(f"ERROR: Campo desconocido para contador: {field}")
+
+    def add_comment(self, comment_id, video_id, user_id, comment_text):
+        ahora = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+        self._execute_commit("INSERT OR REPLACE INTO Comentario VALUES (?, ?, ?, 'Activo', ?, ?)",
+                             (comment_id, comment_text, ahora, user_id, video_id))
+
+    def insert_or_update_usuario(self, id_usuario, id_campus, id_carrera):
+        self._execute_commit("INSERT OR REPLACE INTO Usuario VALUES (?, ?, ?)", (id_usuario, id_campus, id_carrera))
+
+    def guardar_calificacion_por_tema(self, id_usuario, id_tema, calificacion, id_simulador, tiempo, id_resultado,
+                                      fecha):
+        self._execute_commit("INSERT OR REPLACE INTO Resultado VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (id_resultado, calificacion, tiempo, fecha, id_tema, id_usuario, id_simulador))
+
+    def guardar_resultados_simulador(self, id_usuario, id_simulador, tiempo, fecha, calificaciones, resumen=None):
+        filas = [(str(uuid.uuid4()), calificacion, tiempo, fecha, id_tema, id_usuario, id_simulador)
+                 for id_tema, calificacion in calificaciones.items()]
+        id_intento = str(uuid.uuid4()) if resumen is not None else None
+        with self._lock:
+            conn = self._get_connection()
+            conn.executemany("INSERT INTO Resultado VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+            if resumen is not None:
+                conn.execute("INSERT INTO Intento VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             (id_intento, id_usuario, id_simulador, resumen.get("calificacion"),
+                              resumen.get("correctas"), resumen.get("total"), tiempo, fecha))
+            conn.commit()
+        return id_intento
+
+    # ==========================================
+    #      SINCRONIZACIÓN DELTA (ver sincronizacion.py)
+    # ==========================================
+
+    def ids_areas(self, id_carrera):
+        rows = self._execute_query(
+            "SELECT ID_Area FROM Area WHERE ID_Carrera = ? AND Estado = 'Activo'", (id_carrera,))
+        return [r["ID_Area"] for r in rows]
+
+    def leer_marca(self, coleccion, id_carrera):
+        rows = self._execute_query("SELECT Marca FROM Sync_Marca WHERE Coleccion = ? AND ID_Carrera = ?",
+                                   (coleccion, id_carrera))
+        return rows[0]["Marca"] if rows else None
+
+    def guardar_marca(self, coleccion, id_carrera, marca):
+        self._execute_commit("INSERT OR REPLACE INTO Sync_Marca VALUES (?, ?, ?)", (coleccion, id_carrera, marca))
+
+    def aplicar_cambios(self, coleccion, cambios):
+        """
+        Escribe documentos de Firestore como filas. Las bajas (estado != 'Activo')
+        se guardan tal cual: las consultas ya filtran por Estado = 'Activo'.
+        """
+        tabla = TABLAS_FIRESTORE.get(coleccion)
+        if tabla is None or not cambios:
+            return
+        with self._lock:
+            conn = self._get_connection()
+            columnas = [fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")]
+            filas = []
+            for doc_id, datos in cambios:
+                fila = [doc_id]  # La primera columna es siempre el ID
+                for columna in columnas[1:]:
+                    valor = datos
+                    for clave in RUTAS_FIRESTORE.get(columna, columna.lower()).split('.'):
+                        valor = valor.get(clave) if isinstance(valor, dict) else None
+                    if valor is None and columna in CAMPOS_CONTADOR:
+                        valor = 0
+                    fila.append(valor)
+                filas.append(fila)
+            marcas = ",".join("?" * len(columnas))
+            conn.executemany(f"INSERT OR REPLACE INTO {tabla} ({','.join(columnas)}) VALUES ({marcas})", filas)
+            conn.commit()
@@ -0,0 +1,250 @@
+import json
+import os
+import threading
+import time
+
+from src.arranque import modulo_diferido
+from src.database.bundle import BUNDLES_DIR
+from src.database.metricas import contar
+
+firestore = modulo_diferido("firebase_admin.firestore")
+
+
+# Firestore acepta como máximo 500 operaciones por WriteBatch
+MAX_OPERACIONES_BATCH = 500
+
+# Tope de la espera entre reintentos cuando un commit falla (se duplica en cada fallo)
+MAX_ESPERA_REINTENTO = 60.0
+
+# Al cerrar: intentos del último flush y espera antes del primer reintento (se duplica)
+INTENTOS_CIERRE = 3
+ESPERA_CIERRE = 0.5
+
+# Deltas que no se pudieron enviar al cerrar; se vuelven a encolar al arrancar
+RUTA_PENDIENTES = os.environ.get(
+    "RUTA_LINCE_CONTADORES_PENDIENTES", os.path.join(BUNDLES_DIR, "contadores_pendientes.json"))
+
+
+class CounterWriteBehind:
+    """
+    Cola de escritura diferida para contadores de videos.
+
+    Los incrementos se acumulan por (video, campo) y se envían juntos en un
+    WriteBatch cada `intervalo` segundos o cuando hay `max_pendientes` videos
+    distintos esperando. Mil vistas del mismo video entre dos flush se
+    convierten en un solo update con Increment(1000).
+
+    Si se pasa `fragmentos` (ShardedCounters), cada video se escribe en uno de
+    sus fragmentos en lugar del documento principal.
+
+    Con `presupuesto` (GestorPresupuesto), los flush periódicos esperan mientras
+    la cuota de escrituras del proceso esté agotada; close() envía todo igual.
+
+    Los incrementos se escriben con set(merge=True), así un video borrado no
+    hace fallar el batch. Si un commit falla, sus deltas regresan a la cola y
+    el hilo reintenta con espera exponencial (intervalo * 2^fallos).
+
+    Con `ruta_pendientes`, lo que close() no logra enviar tras INTENTOS_CIERRE
+    se guarda en ese JSON y la siguiente cola creada con la misma ruta lo
+    vuelve a encolar al arrancar.
+    """
+
+    def __init__(self, db, coleccion='videos', intervalo=2.0, max_pendientes=200, fragmentos=None,
+                 presupuesto=None, ruta_pendientes=None):
+        self.db = db
+        self.coleccion = coleccion
+        self.fragmentos = fragmentos
+        self.presupuesto = presupuesto
+        self.intervalo = intervalo
+        self.max_pendientes = max_pendientes
+        self.ruta_pendientes = ruta_pendientes
+
+        self._cond = threading.Condition()
+        self._pendientes = {}  # id_video -> {campo: delta}
+        self._hilo = None
+        self._detenido = False
+        self._fallos_seguidos = 0
+
+        # Métricas
+        self.eventos = 0
+        self.escrituras = 0
+
+        if ruta_pendientes is not None:
+            self._recuperar_pendientes()
+
+    def incrementar(self, id_video, campo, delta=1):
+        """Registra un incremento y regresa de inmediato."""
+        with self._cond:
+            if self._detenido:
+                raise RuntimeError("La cola de contadores ya fue cerrada.")
+            campos = self._pendientes.setdefault(id_video, {})
+            campos[campo] = campos.get(campo, 0) + delta
+            self.eventos += 1
+            self._iniciar_hilo()
+            if len(self._pendientes) >= self.max_pendientes:
+                self._cond.notify()
+
+    def pendientes(self, id_video):
+        """Deltas aún no enviados de un video, para mostrar conteos al día."""
+        with self._cond:
+            return dict(self._pendientes.get(id_video, {}))
+
+    def flush(self, forzar=True):
+        """
+        Envía todo lo acumulado. Devuelve cuántos documentos se actualizaron.
+        Con forzar=False no envía nada si el presupuesto de escrituras no alcanza.
+        """
+        lote = self._tomar_lote(forzar)
+        return self._enviar(lote) if lote else 0
+
+    def close(self):
+        """
+        Detiene el hilo y hace el último flush, con INTENTOS_CIERRE intentos.
+        Lo que aun así no se envía se guarda en ruta_pendientes.
+        """
+        with self._cond:
+            self._detenido = True
+            self._cond.notify()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+        for intento in range(INTENTOS_CIERRE):
+            if intento:
+                time.sleep(ESPERA_CIERRE * 2 ** (intento - 1))
+            self.flush()
+            with self._cond:
+                if not self._pendientes:
+                    return
+        self._guardar_pendientes()
+
+    # ------------------------------------------
+    #      INTERNOS
+    # ------------------------------------------
+
+    def _recuperar_pendientes(self):
+        # Lo que dejó sin enviar un cierre anterior vuelve a la cola; el archivo se
+        # borra porque, si tampoco sale esta vez, close() lo escribe de nuevo
+        try:
+            with open(self.ruta_pendientes, 'r', encoding='utf-8') as f:
+                guardados = json.load(f)
+            os.remove(self.ruta_pendientes)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"ERROR al leer los contadores pendientes de {self.ruta_pendientes}: {e}")
+            return
+        if guardados:
+            self._reencolar(guardados.items())
+            with self._cond:
+                self._iniciar_hilo()
+            contar('contadores_recuperados', len(guardados))
+
+    def _guardar_pendientes(self):
+        with self._cond:
+            lote, self._pendientes = self._pendientes, {}
+        if self.ruta_pendientes is None:
+            print(f"ERROR: se cerraron los contadores con {len(lote)} videos sin enviar")
+            return
+        try:
+            # Otro proceso pudo dejar los suyos: se suman
+            if os.path.exists(self.ruta_pendientes):
+                with open(self.ruta_pendientes, 'r', encoding='utf-8') as f:
+                    for id_video, campos in json.load(f).items():
+                        destino = lote.setdefault(id_video, {})
+                        for campo, delta in campos.items():
+                            destino[campo] = destino.get(campo, 0) + delta
+            os.makedirs(os.path.dirname(os.path.abspath(self.ruta_pendientes)), exist_ok=True)
+            temporal = self.ruta_pendientes + ".tmp"
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(lote, f, ensure_ascii=False)
+            os.replace(temporal, self.ruta_pendientes)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: se perdieron los contadores de {len(lote)} videos ({self.ruta_pendientes}): {e}")
+            return
+        print(f"ERROR: {len(lote)} videos con contadores sin enviar; se guardaron en {self.ruta_pendientes}")
+
+    def _iniciar_hilo(self):
+        # Se llama con el lock tomado; el hilo solo existe si alguien escribe
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ciclo, name="contadores-write-behind", daemon=True)
+            self._hilo.start()
+
+    def _tomar_lote(self, forzar):
+        # Saca los pendientes de un golpe bajo el lock; None si el presupuesto los retiene
+        with self._cond:
+            if not forzar and self.presupuesto is not None and self._pendientes \
+                    and not self.presupuesto.puede_escribir(len(self._pendientes)):
+                return None  # Se queda acumulado (y fusionado) hasta la siguiente ventana
+            lote, self._pendientes = self._pendientes, {}
+            return lote
+
+    def _reencolar(self, bloque):
+        # Los deltas de un commit fallido se suman a lo que llegó mientras tanto
+        with self._cond:
+            for id_video, campos in bloque:
+                destino = self._pendientes.setdefault(id_video, {})
+                for campo, delta in campos.items():
+                    destino[campo] = destino.get(campo, 0) + delta
+
+    def _ciclo(self):
+        espera = 0.0  # > 0: el último flush quedó retenido o falló, se espera completa
+        while True:
+            with self._cond:
+                limite = time.monotonic() + max(espera, self.intervalo)
+                while not self._detenido and (espera or len(self._pendientes) < self.max_pendientes):
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                if self._detenido:
+                    return
+                lote = self._tomar_lote(forzar=False)
+            if lote is None:
+                espera = self.intervalo
+                continue
+            if lote:
+                self._enviar(lote)
+            with self._cond:
+                fallos = self._fallos_seguidos
+            espera = min(self.intervalo * 2 ** fallos, MAX_ESPERA_REINTENTO) if fallos else 0.0
+
+    def _enviar(self, lote):
+        items = [(id_video, campos) for id_video, campos in lote.items()
+                 if any(delta != 0 for delta in campos.values())]
+        enviados = 0
+        for inicio in range(0, len(items), MAX_OPERACIONES_BATCH):
+            batch = self.db.batch()
+            bloque = items[inicio:inicio + MAX_OPERACIONES_BATCH]
+            for id_video, campos in bloque:
+                if self.fragmentos is not None:
+                    batch.set(self.fragmentos.ref_aleatoria(id_video),
+                              self.fragmentos.datos_incremento(id_video, campos), merge=True)
+                    continue
+                ref = self.db.collection(self.coleccion).document(id_video)
+                batch.set(ref, {campo: firestore.Increment(delta)
+                                for campo, delta in campos.items() if delta != 0}, merge=True)
+            try:
+                batch.commit()
+            except Exception as e:
+                self._reencolar(bloque)
+                with self._cond:
+                    self._fallos_seguidos += 1
+                print(f"ERROR al enviar contadores diferidos ({len(bloque)} videos), se reintentarán: {e}")
+                continue
+            enviados += len(bloque)
+            with self._cond:
+                self.escrituras += 1
+                self._fallos_seguidos = 0
+            if self.fragmentos is not None:
+                for id_video, campos in bloque:
+                    self.fragmentos.registrar_local(id_video, campos)
+        return enviados
+
+    def stats(self):
+        with self._cond:
+            return {
+                "eventos": self.eventos,
+                "commits": self.escrituras,
+                "videos_pendientes": len(self._pendientes),
+                "fallos_seguidos": self._fallos_seguidos,
+            }
@@ -1,8 +1,7 @@
+from src.arranque import ReporteArranque  # primero: marca el inicio del proceso
 import flet as ft
-from src.database.database import DatabaseHelper
-from src.screens.welcome_section.bienvenida_screen import WelcomeScreen
-from src.screens.welcome_section.seleccion_carrera_screen import SeleccionCarreraScreen
-from src.screens.inicio_screen import InicioScreen
+from src.database.async_database import cerrar_async_database
+from src.database.database import close_database, init_database
 
 
 def main(page: ft.Page):
@@ -17,16 +16,28 @@ def main(page: ft.Page):
 
     initial_screen = None
 
+    # Cada caso importa solo sus pantallas y solo los casos 1 y 2 abren la base.
+    # El reporte separa import / init / primer page.add para medir el arranque.
+
     # CASO 1: Usuario totalmente configurado
     if saved_campus_id and saved_carrera_id:
         print("INFO: Usuario ya configurado. Cargando InicioScreen.")
+        reporte = ReporteArranque("inicio")
+        from src.screens.inicio_screen import InicioScreen
+        reporte.marcar("import")
+        init_database()
+        reporte.marcar("init")
         initial_screen = InicioScreen(page, id_carrera=saved_carrera_id, id_campus=saved_campus_id)
 
     # CASO 2: Usuario eligió campus pero no carrera (A medio camino)
     elif saved_campus_id:
         print("INFO: Usuario a medio configurar. Cargando SeleccionCarreraScreen.")
-        db = DatabaseHelper()
+        reporte = ReporteArranque("seleccion_carrera")
+        from src.screens.welcome_section.seleccion_carrera_screen import SeleccionCarreraScreen
+        reporte.marcar("import")
+        db = init_database()
         campus_data = db.get_campus_by_id(saved_campus_id)
+        reporte.marcar("init")
 
         # Validación de seguridad: ¿Qué pasa si el ID guardado ya no existe en la nube?
         if campus_data:
@@ -34,16 +45,30 @@ def main(page: ft.Page):
             initial_screen = SeleccionCarreraScreen(page, id_campus=saved_campus_id, campus_nombre=campus_nombre)
         else:
             print("ALERTA: El ID de campus guardado no existe en la BD. Reiniciando a Bienvenida.")
+            from src.screens.welcome_section.bienvenida_screen import WelcomeScreen
             page.client_storage.clear()  # Limpiamos datos corruptos
             initial_screen = WelcomeScreen(page)
 
     # CASO 3: Usuario nuevo
     else:
         print("INFO: Nuevo usuario. Cargando WelcomeScreen.")
+        reporte = ReporteArranque("bienvenida")
+        from src.screens.welcome_section.bienvenida_screen import WelcomeScreen
+        reporte.marcar("import")
+        # Sin init: la base se abre cuando el usuario elige campus
+        reporte.marcar("init")
         initial_screen = WelcomeScreen(page)
 
     page.add(initial_screen)
+    reporte.marcar("page.add")
+    reporte.imprimir()
 
 
 # Asegúrate de que 'assets' esté en la ruta correcta
-ft.app(target=main, assets_dir="../assets")
+try:
+    ft.app(target=main, assets_dir="../assets")
+finally:
+    # Cerramos los clientes compartidos de Firestore al terminar el proceso;
+    # primero el async, que usa la caché y la cola de contadores del síncrono
+    cerrar_async_database()
+    close_database()
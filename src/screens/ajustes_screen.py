@@ -1,5 +1,7 @@
+import asyncio
+
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.async_database import get_async_database_helper
 
 
 # Nota: Las importaciones de las pantallas de navegación se mantienen
@@ -17,7 +19,7 @@ class AjustesScreen(ft.Column):
         self.id_campus = id_campus
         self.id_usuario = id_usuario
 
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_async_database_helper()
         self.nombre_campus = ""
         self.nombre_carrera = ""
 
@@ -65,13 +67,15 @@ class AjustesScreen(ft.Column):
             page=self.page, selected_index=3, id_carrera=self.id_carrera, id_campus=self.id_campus,
             id_usuario=self.id_usuario
         )
-        self._cargar_datos()
         self.page.update()
+        self.page.run_task(self._cargar_datos)
 
-    def _cargar_datos(self):
-        # Ahora estos métodos ya existen en el Helper
-        campus = self.db_helper.get_campus_by_id(self.id_campus)
-        carrera = self.db_helper.get_carrera_by_id(self.id_carrera)
+    async def _cargar_datos(self):
+        # Las dos lecturas van en paralelo sin bloquear el hilo de la UI
+        campus, carrera = await asyncio.gather(
+            self.db_helper.get_campus_by_id(self.id_campus),
+            self.db_helper.get_carrera_by_id(self.id_carrera),
+        )
 
         if campus and carrera:
             # Usamos .get() por seguridad, aunque el Helper ya debería devolver 'Nombre'
@@ -1,5 +1,5 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 import random
 
 
@@ -8,7 +8,7 @@ class CrucigramaScreen(ft.Column):
         super().__init__(expand=True, scroll=ft.ScrollMode.AUTO)
         self.page = page
         self.id_crucigrama = id_crucigrama
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         # --- Game State ---
         self.max_rows = 6
@@ -1,10 +1,14 @@
 import flet as ft
-import flet_video as fv
 import uuid
-from src.database.database import DatabaseHelper
+from src.arranque import modulo_diferido
+from src.database.database import get_database_helper
+from src.database.prefetch import VideoPrefetcher
 from src.widgets.comments_widget import CommentsWidget
 import traceback
 
+# flet_video carga el reproductor nativo; lo importamos cuando se crea el primer video
+fv = modulo_diferido("flet_video")
+
 
 class InicioScreen(ft.Column):
     def __init__(self, page: ft.Page, id_carrera: str, id_campus: str):
@@ -14,12 +18,13 @@ class InicioScreen(ft.Column):
         self.id_carrera = id_carrera
         self.id_campus = id_campus
 
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
         self.id_usuario = None
         self.current_area_index = 0
         self.areas = []
         self.videos = []
         self.video_index = 0
+        self.prefetcher = None
 
         self.area_tabs = ft.Row(scroll=ft.ScrollMode.AUTO)
 
@@ -101,8 +106,18 @@ class InicioScreen(ft.Column):
             id_carrera=self.id_carrera, id_campus=self.id_campus, id_usuario=self.id_usuario
         )
         self.page.update()
+        # Las lecturas de la precarga cuentan para el presupuesto de esta sesión
+        self.prefetcher = VideoPrefetcher(self.db_helper, self.id_usuario, sesion=self.page.session_id,
+                                          pantalla=type(self).__name__)
+        # Contenido de paquetes offline: solo se traen los cambios (en segundo plano)
+        self.db_helper.refrescar_carrera(self.id_carrera)
         self._load_areas()
 
+    def will_unmount(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+
     def _get_or_create_user_id(self):
         user_id = self.page.client_storage.get("idUsuario")
         if not user_id:
@@ -215,6 +230,16 @@ class InicioScreen(ft.Column):
         self.comments_button.on_click = lambda _, vid=video_id: self._show_comments(vid)
 
         self.page.update()
+        self._precargar_vecinos()
+
+    def _precargar_vecinos(self):
+        """Mientras se reproduce el video n, trae en segundo plano los datos de n+1 y n-1."""
+        if self.prefetcher is None or not self.videos:
+            return
+        total = len(self.videos)
+        # El actual va primero: es el que se abre antes (comentarios, quiz)
+        indices = [self.video_index, (self.video_index + 1) % total, (self.video_index - 1) % total]
+        self.prefetcher.precargar([self.videos[i].get('ID_Video') for i in indices])
 
     def _show_comments(self, video_id: str):
         print(f"--- DEBUG: _show_comments() para video_id='{video_id}' ---")
@@ -223,10 +248,12 @@ class InicioScreen(ft.Column):
                 self.page.bottom_sheet.open = False
                 self.page.update()
 
+            precargado = self.prefetcher.tomar(video_id) if self.prefetcher is not None else None
             comments_widget = CommentsWidget(
                 page=self.page,
                 video_id=video_id,
-                id_usuario=self.id_usuario
+                id_usuario=self.id_usuario,
+                precargado=precargado
             )
 
             bottom_sheet = ft.BottomSheet(
@@ -1,22 +1,33 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 import random
-import uuid
 import datetime
+import threading
 import time
 import traceback
 
 
+# Preguntas con controles a la vez; 0 = todas en una sola lista. Con un EGEL de
+# 120 preguntas, construirlas todas manda miles de controles en un solo update.
+PREGUNTAS_POR_PAGINA = 5
+
+# Filas de la revisión de respuestas por página (colapsadas hasta que se tocan)
+RESULTADOS_POR_PAGINA = 10
+
+
 class PreguntasScreen(ft.Column):
-    def __init__(self, page: ft.Page, id_area: str, longitud: int, id_usuario: str, id_simulador: str):
+    def __init__(self, page: ft.Page, id_area: str, longitud: int, id_usuario: str, id_simulador: str,
+                 preguntas_por_pagina: int = PREGUNTAS_POR_PAGINA):
         super().__init__(expand=True, scroll=ft.ScrollMode.ADAPTIVE)
         self.page = page
         self.id_area = id_area
         self.longitud = longitud
         self.id_usuario = id_usuario
         self.id_simulador = id_simulador
+        self.preguntas_por_pagina = preguntas_por_pagina
+        self.pagina = 0
 
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
         self.preguntas = []
         self.opciones_seleccionadas = {}
         self.inicio_tiempo = time.time()
@@ -39,6 +50,25 @@ class PreguntasScreen(ft.Column):
                 padding=ft.padding.symmetric(horizontal=30, vertical=15)
             )
         )
+        self.texto_progreso = ft.Text(size=14, color=ft.Colors.GREY_600)
+
+        # Página actual y navegación (ver _mostrar_pagina)
+        self.contenedor_pagina = ft.Column(spacing=0)
+        self.texto_pagina = ft.Text(size=14, color=ft.Colors.GREY_600)
+        self.boton_anterior = ft.OutlinedButton(
+            "Anterior", icon=ft.Icons.CHEVRON_LEFT,
+            on_click=lambda e: self._mostrar_pagina(self.pagina - 1)
+        )
+        self.boton_siguiente = ft.OutlinedButton(
+            "Siguiente", icon=ft.Icons.CHEVRON_RIGHT,
+            on_click=lambda e: self._mostrar_pagina(self.pagina + 1)
+        )
+        self.navegacion = ft.Column([
+            ft.Row([self.boton_anterior, self.texto_pagina, self.boton_siguiente],
+                   alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            ft.Row([ft.TextButton("Ir a la primera sin responder", on_click=self._ir_a_sin_responder)],
+                   alignment=ft.MainAxisAlignment.CENTER),
+        ])
 
         self.controls = [self.loading_view]
 
@@ -55,25 +85,23 @@ class PreguntasScreen(ft.Column):
     def _cargar_preguntas_aleatorias(self):
         try:
             print(f"--- DEBUG (Preguntas): Cargando preguntas para id_area='{self.id_area}' ---")
-            todas_preguntas = self.db_helper.get_preguntas_por_id_area_activo(self.id_area)
-            print(f"--- DEBUG (Preguntas): {len(todas_preguntas)} preguntas encontradas en total ---")
+            # Muestra aleatoria del lado del servidor: se leen solo 'longitud' documentos.
+            # Sin retroalimentación: los comentarios se piden al mostrar resultados
+            preguntas_limitadas = self.db_helper.get_preguntas_aleatorias(
+                self.id_area, int(self.longitud or 0), con_comentarios=False
+            )
 
-            if not todas_preguntas:
+            if not preguntas_limitadas:
                 self._mostrar_error("No hay preguntas disponibles para esta área.")
                 return
 
-            random.shuffle(todas_preguntas)
-            # Aseguramos no pedir más preguntas de las que existen
-            limite = min(len(todas_preguntas), self.longitud)
-            preguntas_limitadas = todas_preguntas[:limite]
-
             print(f"--- DEBUG (Preguntas): Seleccionadas {len(preguntas_limitadas)} preguntas ---")
 
             # Obtener nombres de temas
             # CORRECCIÓN 2: Eliminé la llamada a 'get_nombres_temas_por_ids' que no existe en FirebaseHelper
             # y usamos directamente la lógica iterativa que es más segura en esta migración.
             nombres_temas = {}
-            ids_temas = list({p.get('ID_Tema') for p in preguntas_limitadas if p.get('ID_Tema')})
+            ids_temas = list({p.id_tema for p in preguntas_limitadas if p.id_tema})
 
             print(f"--- DEBUG (Preguntas): Buscando nombres para temas: {ids_temas} ---")
 
@@ -85,32 +113,21 @@ class PreguntasScreen(ft.Column):
                 else:
                     nombres_temas[id_tema] = "General"
 
-            # Preparar preguntas
+            # Preparar preguntas (registros Pregunta: solo se llenan sus atributos de UI)
             for p in preguntas_limitadas:
-                # Usamos .get() para seguridad
-                correcta_texto = p.get('Opcion_Correcta', '')
-
                 # Crear lista de opciones
-                opciones = [
-                    p.get('Opcion_A', ''),
-                    p.get('Opcion_B', ''),
-                    correcta_texto
-                ]
+                opciones = [p.opcion_a, p.opcion_b, p.opcion_correcta]
 
                 # Solo agregar Opcion_C si existe
-                op_c = p.get('Opcion_C')
-                if op_c and str(op_c).strip():
-                    opciones.append(op_c)
+                if p.opcion_c and str(p.opcion_c).strip():
+                    opciones.append(p.opcion_c)
 
                 # Eliminar vacíos y duplicados
                 opciones = list(set([opt for opt in opciones if opt]))
                 random.shuffle(opciones)
 
-                p['opciones_mezcladas'] = opciones
-                p['_respuesta_correcta_texto'] = correcta_texto
-
-                id_tema_actual = p.get('ID_Tema')
-                p['Nombre_Tema'] = nombres_temas.get(id_tema_actual, 'General')
+                p.opciones_mezcladas = opciones
+                p.nombre_tema = nombres_temas.get(p.id_tema, 'General')
 
             self.preguntas = preguntas_limitadas
             self._build_quiz_view()
@@ -171,55 +188,10 @@ class PreguntasScreen(ft.Column):
                 )
             )
 
-            for i, p in enumerate(self.preguntas):
-                # Título de la pregunta
-                question_widgets.append(
-                    ft.Container(
-                        padding=15,
-                        border=ft.border.all(1, ft.Colors.GREY_300),
-                        border_radius=8,
-                        margin=ft.margin.only(bottom=15),
-                        content=ft.Column([
-                            ft.Row([
-                                ft.Container(
-                                    width=30,
-                                    height=30,
-                                    border_radius=15,
-                                    bgcolor=ft.Colors.BLUE_900,
-                                    alignment=ft.alignment.center,
-                                    content=ft.Text(f"{i + 1}", color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD)
-                                ),
-                                ft.Text(f"{p.get('Pregunta', 'Pregunta sin texto')}",
-                                        weight=ft.FontWeight.BOLD, size=16, expand=True),
-                            ]),
-                            ft.Container(
-                                padding=ft.padding.only(left=35),
-                                content=ft.Text(f"Tema: {p.get('Nombre_Tema', 'General')}",
-                                                size=14, color=ft.Colors.GREY_600),
-                            ),
-                        ])
-                    )
-                )
-
-                # Opciones de respuesta
-                opciones_radio = ft.RadioGroup(
-                    content=ft.Column([
-                        ft.Container(
-                            margin=ft.margin.only(bottom=8),
-                            padding=10,
-                            border=ft.border.all(1, ft.Colors.GREY_200),
-                            border_radius=6,
-                            content=ft.Radio(
-                                value=str(opt),
-                                label=str(opt),
-                                fill_color=ft.Colors.BLUE_900
-                            )
-                        ) for opt in p['opciones_mezcladas']
-                    ], spacing=0),
-                    on_change=lambda e, index=i: self._on_option_selected(index, e.control.value)
-                )
-                question_widgets.append(opciones_radio)
-                question_widgets.append(ft.Divider(height=20, color=ft.Colors.TRANSPARENT))
+            # Solo las preguntas de la página actual tienen controles (ver _mostrar_pagina)
+            question_widgets.append(self.contenedor_pagina)
+            if self._num_paginas() > 1:
+                question_widgets.append(self.navegacion)
 
             # Botón de enviar
             question_widgets.append(
@@ -228,17 +200,15 @@ class PreguntasScreen(ft.Column):
                     content=ft.Column([
                         ft.Divider(),
                         ft.Row([
-                            ft.Text(
-                                f"Progreso: {len(self.opciones_seleccionadas)}/{len(self.preguntas)} preguntas respondidas",
-                                size=14,
-                                color=ft.Colors.GREY_600
-                            ),
+                            self.texto_progreso,
                             self.submit_button
                         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
                     ])
                 )
             )
 
+            self._mostrar_pagina(0, actualizar=False)
+            self._actualizar_progreso()
             self.controls.clear()
             self.controls.extend(question_widgets)
             self.update()
@@ -248,20 +218,96 @@ class PreguntasScreen(ft.Column):
             traceback.print_exc()
             self._mostrar_error(f"Error al construir el cuestionario: {str(e)}")
 
+    def _construir_pregunta(self, i, p):
+        # Título, opciones y separador de una pregunta; la opción ya elegida se conserva al volver de página
+        return ft.Column([
+            ft.Container(
+                padding=15,
+                border=ft.border.all(1, ft.Colors.GREY_300),
+                border_radius=8,
+                margin=ft.margin.only(bottom=15),
+                content=ft.Column([
+                    ft.Row([
+                        ft.Container(
+                            width=30,
+                            height=30,
+                            border_radius=15,
+                            bgcolor=ft.Colors.BLUE_900,
+                            alignment=ft.alignment.center,
+                            content=ft.Text(f"{i + 1}", color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD)
+                        ),
+                        ft.Text(f"{p.pregunta or 'Pregunta sin texto'}",
+                                weight=ft.FontWeight.BOLD, size=16, expand=True),
+                    ]),
+                    ft.Container(
+                        padding=ft.padding.only(left=35),
+                        content=ft.Text(f"Tema: {p.nombre_tema or 'General'}",
+                                        size=14, color=ft.Colors.GREY_600),
+                    ),
+                ])
+            ),
+            # Opciones de respuesta
+            ft.RadioGroup(
+                value=self.opciones_seleccionadas.get(i),
+                content=ft.Column([
+                    ft.Container(
+                        margin=ft.margin.only(bottom=8),
+                        padding=10,
+                        border=ft.border.all(1, ft.Colors.GREY_200),
+                        border_radius=6,
+                        content=ft.Radio(
+                            value=str(opt),
+                            label=str(opt),
+                            fill_color=ft.Colors.BLUE_900
+                        )
+                    ) for opt in p.opciones_mezcladas
+                ], spacing=0),
+                on_change=lambda e, index=i: self._on_option_selected(index, e.control.value)
+            ),
+            ft.Divider(height=20, color=ft.Colors.TRANSPARENT),
+        ], spacing=0)
+
+    # ==========================================
+    #      PAGINACIÓN
+    # ==========================================
+
+    def _num_paginas(self):
+        if not self.preguntas_por_pagina:
+            return 1
+        return max(1, -(-len(self.preguntas) // self.preguntas_por_pagina))
+
+    def _mostrar_pagina(self, pagina, actualizar=True):
+        """Reemplaza los controles de la página anterior por los de `pagina` y solo envía esa parte."""
+        por_pagina = self.preguntas_por_pagina or len(self.preguntas)
+        self.pagina = max(0, min(pagina, self._num_paginas() - 1))
+        inicio = self.pagina * por_pagina
+        fin = min(inicio + por_pagina, len(self.preguntas))
+        self.contenedor_pagina.controls = [self._construir_pregunta(i, self.preguntas[i]) for i in range(inicio, fin)]
+
+        self.texto_pagina.value = f"Preguntas {inicio + 1}-{fin} de {len(self.preguntas)}"
+        self.boton_anterior.disabled = self.pagina == 0
+        self.boton_siguiente.disabled = self.pagina >= self._num_paginas() - 1
+        if actualizar:
+            self.contenedor_pagina.update()
+            self.navegacion.update()
+            self.scroll_to(offset=0, duration=0)
+
+    def _ir_a_sin_responder(self, e=None):
+        pendientes = [i for i in range(len(self.preguntas)) if i not in self.opciones_seleccionadas]
+        if pendientes:
+            self._mostrar_pagina(pendientes[0] // (self.preguntas_por_pagina or len(self.preguntas)))
+
+    def _actualizar_progreso(self):
+        respondidas = len(self.opciones_seleccionadas)
+        self.texto_progreso.value = f"Progreso: {respondidas}/{len(self.preguntas)} preguntas respondidas"
+        self.submit_button.disabled = respondidas < len(self.preguntas)
+
     def _on_option_selected(self, question_index, selected_value):
         self.opciones_seleccionadas[question_index] = selected_value
-        self.submit_button.disabled = len(self.opciones_seleccionadas) < len(self.preguntas)
-        self.update()
-
-    def _obtener_comentario_por_opcion(self, pregunta, opcion_seleccionada):
-        """Obtiene el comentario específico para la opción seleccionada"""
-        comentarios_map = {
-            pregunta.get('Opcion_A', ''): pregunta.get('Comentario_A', ''),
-            pregunta.get('Opcion_B', ''): pregunta.get('Comentario_B', ''),
-            pregunta.get('Opcion_C', ''): pregunta.get('Comentario_C', ''),
-            pregunta.get('Opcion_Correcta', ''): pregunta.get('Comentario_Correcta', '¡Respuesta correcta!')
-        }
-        return comentarios_map.get(opcion_seleccionada, '')
+        # El RadioGroup ya muestra la opción elegida: solo viajan el progreso y el botón
+        self._actualizar_progreso()
+        self.texto_progreso.update()
+        self.submit_button.update()
 
     def _mostrar_resultado_popup(self, e):
         try:
@@ -269,83 +315,33 @@ class PreguntasScreen(ft.Column):
             fin_tiempo = time.time()
             tiempo_total = int(fin_tiempo - self.inicio_tiempo)
 
+            # Primero la calificación: solo compara respuestas, no lee nada de la base
             correctas = 0
-            detalles_respuestas = []
             aciertos_por_tema = {}
             total_por_tema = {}
+            nombres_temas = {}
+            self.respuestas = []  # (seleccion, es_correcta) por pregunta, para la revisión
 
             for i, p in enumerate(self.preguntas):
                 seleccion = self.opciones_seleccionadas.get(i, "No respondida")
-                es_correcta = seleccion == p['_respuesta_correcta_texto']
+                es_correcta = seleccion == p.opcion_correcta
+                self.respuestas.append((seleccion, es_correcta))
 
                 if es_correcta:
                     correctas += 1
 
-                id_tema = p.get('ID_Tema', 'General')
+                id_tema = p.id_tema or 'General'
+                nombres_temas[id_tema] = p.nombre_tema or 'General'
                 total_por_tema[id_tema] = total_por_tema.get(id_tema, 0) + 1
                 if es_correcta:
                     aciertos_por_tema[id_tema] = aciertos_por_tema.get(id_tema, 0) + 1
 
-                comentario_seleccion = self._obtener_comentario_por_opcion(p, seleccion)
-                comentario_correcto = p.get('Comentario_Correcta', '¡Respuesta correcta!')
-
-                # Detalle visual de la respuesta
-                detalles_respuestas.append(
-                    ft.Container(
-                        padding=12,
-                        margin=ft.margin.symmetric(vertical=4),
-                        bgcolor=ft.Colors.GREEN_50 if es_correcta else ft.Colors.RED_50,
-                        border=ft.border.all(2, ft.Colors.GREEN if es_correcta else ft.Colors.RED),
-                        border_radius=8,
-                        content=ft.Column([
-                            ft.Row([
-                                ft.Icon(
-                                    ft.Icons.CHECK_CIRCLE if es_correcta else ft.Icons.CANCEL,
-                                    color=ft.Colors.GREEN if es_correcta else ft.Colors.RED,
-                                    size=20
-                                ),
-                                ft.Text(f"Pregunta {i + 1}", weight=ft.FontWeight.BOLD, size=14, expand=True),
-                            ]),
-                            ft.Text(f"Tu respuesta: {seleccion}", size=12, weight=ft.FontWeight.BOLD),
-
-                            ft.Container(
-                                padding=ft.padding.only(left=10, top=5, bottom=5),
-                                content=ft.Column([
-                                    ft.Text("Retroalimentación:", size=12, weight=ft.FontWeight.BOLD,
-                                            color=ft.Colors.BLUE_700),
-                                    ft.Text(
-                                        comentario_seleccion if not es_correcta else comentario_correcto,
-                                        size=11,
-                                        color=ft.Colors.GREY_700
-                                    )
-                                ])
-                            ) if comentario_seleccion or comentario_correcto else ft.Container(),
-
-                            ft.Text(f"Respuesta correcta: {p['_respuesta_correcta_texto']}",
-                                    size=12, color=ft.Colors.GREEN, weight=ft.FontWeight.BOLD),
-                        ], spacing=6)
-                    )
-                )
-
-            # Guardar resultados
-            print("--- DEBUG (Preguntas): Guardando resultados en BD ---")
-            fecha_actual = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
+            # Calificación por tema
+            # Nota: id_tema puede ser 'General' si no se encontró, la BD lo aceptará
+            calificaciones = {}
             for id_tema, total in total_por_tema.items():
                 aciertos = aciertos_por_tema.get(id_tema, 0)
-                porcentaje = (aciertos / total) * 100 if total > 0 else 0
-
-                # Guardamos usando el helper de Firebase
-                # Nota: id_tema puede ser 'General' si no se encontró, la BD lo aceptará
-                self.db_helper.guardar_calificacion_por_tema(
-                    id_usuario=self.id_usuario,
-                    id_tema=id_tema,
-                    calificacion=porcentaje,
-                    id_simulador=self.id_simulador,
-                    tiempo=tiempo_total,
-                    id_resultado=str(uuid.uuid4()),
-                    fecha=fecha_actual
-                )
+                calificaciones[id_tema] = (aciertos / total) * 100 if total > 0 else 0
 
             porcentaje_total = (correctas / len(self.preguntas)) * 100
 
@@ -353,6 +349,36 @@ class PreguntasScreen(ft.Column):
             color_resultado = ft.Colors.GREEN if porcentaje_total >= 70 else ft.Colors.ORANGE if porcentaje_total >= 50 else ft.Colors.RED
             icono_resultado = ft.Icons.EMOJI_EVENTS if porcentaje_total >= 70 else ft.Icons.WARNING if porcentaje_total >= 50 else ft.Icons.SENTIMENT_DISSATISFIED
 
+            desglose_temas = [
+                ft.Row([
+                    ft.Text(nombres_temas[id_tema], size=13, expand=True),
+                    ft.Text(f"{aciertos_por_tema.get(id_tema, 0)}/{total}  ({calificaciones[id_tema]:.0f}%)",
+                            size=13, weight=ft.FontWeight.BOLD),
+                ])
+                for id_tema, total in sorted(total_por_tema.items(), key=lambda t: calificaciones[t[0]])
+            ]
+
+            # Revisión por pregunta: filas colapsadas, de a una página; el detalle se arma al expandir
+            self._retroalimentacion = None  # None = cargando, True = lista, False = falló
+            self._detalles = {}             # índice -> Container del detalle (solo las expandidas)
+            self.pagina_revision = 0
+            self.lista_revision = ft.Column(spacing=4)
+            self.texto_pagina_revision = ft.Text(size=12, color=ft.Colors.GREY_600)
+            self.boton_revision_anterior = ft.IconButton(
+                ft.Icons.CHEVRON_LEFT, on_click=lambda e: self._mostrar_revision(self.pagina_revision - 1))
+            self.boton_revision_siguiente = ft.IconButton(
+                ft.Icons.CHEVRON_RIGHT, on_click=lambda e: self._mostrar_revision(self.pagina_revision + 1))
+            self.navegacion_revision = ft.Row(
+                [self.boton_revision_anterior, self.texto_pagina_revision, self.boton_revision_siguiente],
+                alignment=ft.MainAxisAlignment.CENTER
+            )
+            self.filtro_incorrectas = ft.Switch(
+                label="Solo incorrectas",
+                value=correctas < len(self.preguntas),
+                on_change=lambda e: self._mostrar_revision(0)
+            )
+            self._mostrar_revision(0, actualizar=False)
+
             def close_and_go_back(e):
                 if hasattr(self.page, 'bottom_sheet') and self.page.bottom_sheet:
                     self.page.bottom_sheet.open = False
@@ -384,15 +410,15 @@ class PreguntasScreen(ft.Column):
                         ),
                         ft.Text(f"Tiempo total: {tiempo_total} segundos", size=14, color=ft.Colors.GREY_600),
                         ft.Divider(height=20),
-                        ft.Text("Detalle de respuestas:", weight=ft.FontWeight.BOLD, size=16),
-                        ft.Container(
-                            content=ft.ListView(
-                                controls=detalles_respuestas,
-                                expand=True,
-                                spacing=4
-                            ),
-                            height=300,
-                        ),
+                        ft.Text("Resultado por tema:", weight=ft.FontWeight.BOLD, size=16),
+                        ft.Column(desglose_temas, spacing=4),
+                        ft.Divider(height=20),
+                        ft.Row([
+                            ft.Text("Detalle de respuestas:", weight=ft.FontWeight.BOLD, size=16, expand=True),
+                            self.filtro_incorrectas,
+                        ]),
+                        self.lista_revision,
+                        self.navegacion_revision,
                         ft.Container(
                             padding=ft.padding.only(top=20),
                             content=ft.ElevatedButton(
@@ -416,7 +442,159 @@ class PreguntasScreen(ft.Column):
             self.page.bottom_sheet = bottom_sheet_content
             self.page.update()
 
+            # Retroalimentación y guardado en segundo plano: el resultado ya está en pantalla
+            threading.Thread(target=self._cargar_retroalimentacion, daemon=True).start()
+            resumen = {
+                "calificacion": porcentaje_total,
+                "correctas": correctas,
+                "total": len(self.preguntas)
+            }
+            threading.Thread(
+                target=self._guardar_resultados,
+                args=(calificaciones, tiempo_total, resumen),
+                daemon=True
+            ).start()
+
         except Exception as ex:
             print(f"--- DEBUG ERROR: {ex} ---")
             traceback.print_exc()
-            self.page.show_snack_bar(ft.SnackBar(content=ft.Text(f"Error: {str(ex)}")))
\ No newline at end of file
+            self.page.show_snack_bar(ft.SnackBar(content=ft.Text(f"Error: {str(ex)}")))
+
+    # ==========================================
+    #      REVISIÓN DE RESPUESTAS
+    # ==========================================
+
+    def _indices_revision(self):
+        if self.filtro_incorrectas.value:
+            return [i for i, (_, es_correcta) in enumerate(self.respuestas) if not es_correcta]
+        return list(range(len(self.respuestas)))
+
+    def _mostrar_revision(self, pagina, actualizar=True):
+        """Muestra una página de filas colapsadas (RESULTADOS_POR_PAGINA) según el filtro."""
+        indices = self._indices_revision()
+        num_paginas = max(1, -(-len(indices) // RESULTADOS_POR_PAGINA))
+        self.pagina_revision = max(0, min(pagina, num_paginas - 1))
+        inicio = self.pagina_revision * RESULTADOS_POR_PAGINA
+
+        self._detalles = {}
+        visibles = indices[inicio:inicio + RESULTADOS_POR_PAGINA]
+        self.lista_revision.controls = [self._fila_revision(i) for i in visibles] or [
+            ft.Text("¡Todas las respuestas son correctas!", size=13, color=ft.Colors.GREEN)
+        ]
+        self.texto_pagina_revision.value = f"Página {self.pagina_revision + 1} de {num_paginas}"
+        self.boton_revision_anterior.disabled = self.pagina_revision == 0
+        self.boton_revision_siguiente.disabled = self.pagina_revision >= num_paginas - 1
+        self.navegacion_revision.visible = num_paginas > 1
+        if actualizar:
+            self.lista_revision.update()
+            self.navegacion_revision.update()
+
+    def _fila_revision(self, i):
+        seleccion, es_correcta = self.respuestas[i]
+        detalle = ft.Container(visible=False, padding=ft.padding.only(left=12, right=12, bottom=10))
+        flecha = ft.Icon(ft.Icons.EXPAND_MORE, size=20)
+        fila = ft.Container(
+            bgcolor=ft.Colors.GREEN_50 if es_correcta else ft.Colors.RED_50,
+            border=ft.border.all(2, ft.Colors.GREEN if es_correcta else ft.Colors.RED),
+            border_radius=8,
+            content=ft.Column([
+                ft.Container(
+                    padding=12,
+                    on_click=lambda e: self._alternar_detalle(i, fila, detalle, flecha),
+                    content=ft.Row([
+                        ft.Icon(
+                            ft.Icons.CHECK_CIRCLE if es_correcta else ft.Icons.CANCEL,
+                            color=ft.Colors.GREEN if es_correcta else ft.Colors.RED,
+                            size=20
+                        ),
+                        ft.Column([
+                            ft.Text(f"Pregunta {i + 1}", weight=ft.FontWeight.BOLD, size=14),
+                            ft.Text(f"Tu respuesta: {seleccion}", size=12),
+                        ], spacing=2, expand=True),
+                        flecha,
+                    ])
+                ),
+                detalle,
+            ], spacing=0)
+        )
+        return fila
+
+    def _alternar_detalle(self, i, fila, detalle, flecha):
+        if detalle.visible:
+            detalle.visible = False
+            detalle.content = None
+            self._detalles.pop(i, None)
+            flecha.name = ft.Icons.EXPAND_MORE
+        else:
+            detalle.visible = True
+            detalle.content = self._contenido_detalle(i)
+            self._detalles[i] = detalle
+            flecha.name = ft.Icons.EXPAND_LESS
+        fila.update()
+
+    def _contenido_detalle(self, i):
+        p = self.preguntas[i]
+        seleccion, es_correcta = self.respuestas[i]
+        if self._retroalimentacion is None:
+            retro = ft.Row([ft.ProgressRing(width=14, height=14, stroke_width=2),
+                            ft.Text("Cargando retroalimentación...", size=11, color=ft.Colors.GREY_700)])
+        elif self._retroalimentacion is False:
+            retro = ft.Text("No se pudo cargar la retroalimentación.", size=11, color=ft.Colors.GREY_700)
+        else:
+            comentario_seleccion = p.comentario_para(seleccion)
+            comentario_correcto = p.comentario_correcta or '¡Respuesta correcta!'
+            retro = ft.Text(
+                comentario_seleccion if not es_correcta else comentario_correcto,
+                size=11,
+                color=ft.Colors.GREY_700
+            )
+
+        return ft.Column([
+            ft.Text(p.pregunta or 'Pregunta sin texto', size=12),
+            ft.Container(
+                padding=ft.padding.only(left=10, top=5, bottom=5),
+                content=ft.Column([
+                    ft.Text("Retroalimentación:", size=12, weight=ft.FontWeight.BOLD,
+                            color=ft.Colors.BLUE_700),
+                    retro,
+                ])
+            ),
+            ft.Text(f"Respuesta correcta: {p.opcion_correcta}",
+                    size=12, color=ft.Colors.GREEN, weight=ft.FontWeight.BOLD),
+        ], spacing=6)
+
+    def _cargar_retroalimentacion(self):
+        try:
+            # Retroalimentación solo de las preguntas usadas, en una sola lectura
+            comentarios = self.db_helper.get_comentarios_preguntas(p.id for p in self.preguntas)
+            for p in self.preguntas:
+                p.actualizar(comentarios.get(p.id, {}))
+            self._retroalimentacion = True
+        except Exception as ex:
+            print(f"--- DEBUG (Preguntas): ERROR al cargar retroalimentación: {ex} ---")
+            self._retroalimentacion = False
+
+        # Las filas que ya estaban abiertas muestran "Cargando...": se rehacen solo esas
+        for i, detalle in list(self._detalles.items()):
+            try:
+                detalle.content = self._contenido_detalle(i)
+                detalle.update()
+            except Exception as ex:
+                print(f"--- DEBUG (Preguntas): No se pudo refrescar el detalle {i + 1}: {ex} ---")
+
+    def _guardar_resultados(self, calificaciones, tiempo_total, resumen):
+        try:
+            print("--- DEBUG (Preguntas): Guardando resultados en BD ---")
+            fecha_actual = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            # Un solo WriteBatch con todos los temas y el resumen del intento
+            self.db_helper.guardar_resultados_simulador(
+                id_usuario=self.id_usuario,
+                id_simulador=self.id_simulador,
+                tiempo=tiempo_total,
+                fecha=fecha_actual,
+                calificaciones=calificaciones,
+                resumen=resumen
+            )
+        except Exception as ex:
+            print(f"--- DEBUG (Preguntas): ERROR al guardar resultados: {ex} ---")
+            traceback.print_exc()
@@ -1,5 +1,5 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 
 
 class SeleccionarCrucigramaScreen(ft.Column):
@@ -7,7 +7,7 @@ class SeleccionarCrucigramaScreen(ft.Column):
         super().__init__(expand=True)
         self.page = page
         self.id_carrera = id_carrera
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         self.loading_view = ft.Column(
             [ft.ProgressRing(), ft.Text("Cargando palabretas...")],
@@ -1,5 +1,5 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 from src.screens.sopa_de_letras_screen import SopaDeLetrasScreen
 
 
@@ -8,7 +8,7 @@ class SeleccionarSopaScreen(ft.Column):
         super().__init__(expand=True)
         self.page = page
         self.id_carrera = id_carrera
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         # Contenedor para manejar el estado de carga
         self.loading_view = ft.Column(
@@ -1,6 +1,6 @@
 import flet as ft
 # CORRECCIÓN 1: Importar del archivo correcto
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 
 
 class SimuladorScreen(ft.Column):
@@ -11,7 +11,7 @@ class SimuladorScreen(ft.Column):
         self.id_carrera = id_carrera
         self.id_campus = id_campus
         self.id_usuario = id_usuario
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         self.loading_view = ft.Column(
             [ft.ProgressRing(), ft.Text("Cargando simuladores...")],
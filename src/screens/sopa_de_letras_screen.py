@@ -1,6 +1,6 @@
 import flet as ft
 from word_search_generator import WordSearch
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 import math
 
 
@@ -30,7 +30,7 @@ class SopaDeLetrasScreen(ft.Column):
         self.page = page
         self.id_sopa = id_sopa
         self.nombre_area = nombre_area
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         # Variables de estado
         self.words = []
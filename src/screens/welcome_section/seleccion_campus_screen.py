@@ -1,6 +1,6 @@
 import flet as ft
 # CORRECCIÓN: Ajustamos al nombre real del archivo
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 from src.screens.welcome_section.seleccion_carrera_screen import SeleccionCarreraScreen
 
 
@@ -10,7 +10,7 @@ class SeleccionCampusScreen(ft.Column):
         self.page = page
 
         # Instanciamos el helper que ahora conecta a Firebase
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
         self.campus_list = []
         self.selected_campus_id = None
 
@@ -1,6 +1,6 @@
 import flet as ft
 # CORRECCIÓN: Apuntamos al archivo correcto
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 from src.screens.inicio_screen import InicioScreen
 
 
@@ -11,8 +11,8 @@ class SeleccionCarreraScreen(ft.Column):
         self.id_campus = id_campus
         self.campus_nombre = campus_nombre
 
-        self.db_helper = DatabaseHelper()
-        self.selected_carrera_nombre = None
+        self.db_helper = get_database_helper()
+        self.selected_carrera_id = None
 
         # --- Controles de la UI ---
         self.title = ft.Text(
@@ -60,25 +60,25 @@ class SeleccionCarreraScreen(ft.Column):
         self.page.update()
 
     def _fetch_carreras(self):
-        # Esto llamará al método que ya tenías en DatabaseHelper
-        carreras_list = self.db_helper.get_nombres_carrera_por_id_campus(self.id_campus)
+        # Pares (id, nombre): así no hay que volver a buscar el ID por nombre al avanzar
+        carreras_list = self.db_helper.get_carreras_por_id_campus(self.id_campus)
 
         if not carreras_list:
             self.content_area.content = ft.Text("No se encontraron carreras para este campus.",
                                                 text_align=ft.TextAlign.CENTER)
         else:
             self.carreras_grid.controls.clear()
-            for nombre in carreras_list:
-                self.carreras_grid.controls.append(self.create_carrera_card(nombre))
+            for id_carrera, nombre in carreras_list:
+                self.carreras_grid.controls.append(self.create_carrera_card(id_carrera, nombre))
             self.content_area.content = self.carreras_grid
 
         self.update()
 
-    def create_carrera_card(self, nombre_carrera: str):
+    def create_carrera_card(self, id_carrera: str, nombre_carrera: str):
         return ft.GestureDetector(
-            on_tap=lambda e: self._on_carrera_selected(nombre_carrera),
+            on_tap=lambda e: self._on_carrera_selected(id_carrera),
             content=ft.Card(
-                data=nombre_carrera,
+                data=id_carrera,
                 content=ft.Container(
                     content=ft.Text(nombre_carrera, size=16, text_align=ft.TextAlign.CENTER),
                     alignment=ft.alignment.center,
@@ -87,11 +87,11 @@ class SeleccionCarreraScreen(ft.Column):
             ),
         )
 
-    def _on_carrera_selected(self, nombre_carrera: str):
-        self.selected_carrera_nombre = nombre_carrera
+    def _on_carrera_selected(self, id_carrera: str):
+        self.selected_carrera_id = id_carrera
         for card_detector in self.carreras_grid.controls:
             card = card_detector.content
-            is_selected = card.data == nombre_carrera
+            is_selected = card.data == id_carrera
             card.color = ft.Colors.BLUE_900 if is_selected else ft.Colors.WHITE
             text_widget = card.content.content
             text_widget.color = ft.Colors.WHITE if is_selected else ft.Colors.BLACK
@@ -99,18 +99,10 @@ class SeleccionCarreraScreen(ft.Column):
         self.update()
 
     def _on_next_pressed(self, e):
-        if self.selected_carrera_nombre:
-            # AHORA SÍ funcionará esta línea porque agregamos el método en el Paso 1
-            id_carrera = self.db_helper.get_id_carrera_by_nombre(self.selected_carrera_nombre)
-
-            print(f"DEBUG: Nombre '{self.selected_carrera_nombre}' -> ID '{id_carrera}'")
-
-            if not id_carrera:
-                self.page.snack_bar = ft.SnackBar(
-                    ft.Text(f"Error: No se pudo sincronizar la carrera {self.selected_carrera_nombre} con la nube."))
-                self.page.snack_bar.open = True
-                self.page.update()
-                return
+        if self.selected_carrera_id:
+            # El ID ya viene de get_carreras_por_id_campus, no hace falta otra consulta
+            id_carrera = self.selected_carrera_id
+            print(f"DEBUG: Carrera seleccionada -> ID '{id_carrera}'")
 
             # Guardamos y navegamos
             self.page.client_storage.set("idCarrera", id_carrera)
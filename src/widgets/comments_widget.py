@@ -1,27 +1,44 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
+from src.database.prefetch import TAMANO_PAGINA_COMENTARIOS
 from src.widgets.video_interaction_widget import VideoInteractionWidget
 import uuid
+import datetime
 import traceback # <--- AÑADIDO
 
 
+# Comentarios por página y distancia (px) al final de la lista para pedir la siguiente
+TAMANO_PAGINA = TAMANO_PAGINA_COMENTARIOS
+MARGEN_CARGA = 200
+
+
 class CommentsWidget(ft.Column):
-    def __init__(self, page: ft.Page, video_id: str, id_usuario: str):
+    def __init__(self, page: ft.Page, video_id: str, id_usuario: str, precargado: dict = None):
         print("--- DEBUG: CommentsWidget.__init__() - INICIANDO ---")
         try:
             super().__init__(expand=True)
             self.page = page
             self.video_id = video_id
             self.id_usuario = id_usuario
-            self.db_helper = DatabaseHelper()
+            self.db_helper = get_database_helper()
             print(f"--- DEBUG: CommentsWidget para video_id='{video_id}', usuario='{id_usuario}'")
 
+            # --- Estado de la paginación ---
+            self._cursor = None
+            self._hay_mas = True
+            self._cargando = False
+
+            # Primera página que ya trajo el VideoPrefetcher de InicioScreen (si la hay)
+            self._pagina_precargada = precargado.get('comentarios') if precargado else None
+
             # --- UI Controls ---
             self.comments_list_view = ft.ListView(
                 expand=True,
                 spacing=10,
                 padding=16,
-                auto_scroll=False  # Evitar scroll automático al cargar
+                auto_scroll=False,  # Evitar scroll automático al cargar
+                on_scroll=self._on_scroll,
+                on_scroll_interval=100
             )
 
             self.comment_input = ft.TextField(
@@ -51,7 +68,8 @@ class CommentsWidget(ft.Column):
             interaction_widget = VideoInteractionWidget(
                 page=self.page,
                 video_id=self.video_id,
-                id_usuario=self.id_usuario
+                id_usuario=self.id_usuario,
+                precargado=precargado
             )
             print("--- DEBUG: VideoInteractionWidget creado.")
 
@@ -120,39 +138,66 @@ class CommentsWidget(ft.Column):
 
 
     def _load_comments(self):
-        """Carga los comentarios desde la BD y actualiza la lista."""
-        print("--- DEBUG: CommentsWidget._load_comments: Obteniendo comentarios...")
-        comments = self.db_helper.get_comments_by_id_video(self.video_id)
-        print(f"--- DEBUG: CommentsWidget._load_comments: {len(comments)} encontrados.")
-
+        """Carga la primera página de comentarios; las demás llegan al hacer scroll."""
+        print("--- DEBUG: CommentsWidget._load_comments: Obteniendo primera página...")
         self.comments_list_view.controls.clear()
-        if not comments:
-            self.content_area.content = ft.Container(
-                content=ft.Text("No hay comentarios aún."),
-                alignment=ft.alignment.center
-            )
-        else:
-            for comment in comments:
-                raw_date = comment.get('Fecha')
-                date_str = "Fecha desconocida"
-                if raw_date:
-                    date_str = str(raw_date).split(' ')[0]
-
-                self.comments_list_view.controls.append(
-                    ft.Column(
-                        [
-                            ft.Text(comment['Comentario'], size=16, weight=ft.FontWeight.W_500),
-                            ft.Text(date_str, size=12, color=ft.Colors.GREY),
-                        ],
-                        spacing=4
-                    )
+        self._cursor = None
+        self._hay_mas = True
+        self._load_next_page()
+
+    def _load_next_page(self):
+        if self._cargando or not self._hay_mas:
+            return
+        self._cargando = True
+        try:
+            if self._pagina_precargada is not None:
+                comments, self._cursor = self._pagina_precargada
+                self._pagina_precargada = None
+            else:
+                comments, self._cursor = self.db_helper.get_comments_page(
+                    self.video_id, limite=TAMANO_PAGINA, cursor=self._cursor
                 )
-            self.content_area.content = self.comments_list_view
+            self._hay_mas = self._cursor is not None
+            print(f"--- DEBUG: CommentsWidget: {len(comments)} comentarios en esta página.")
 
-        self.update()
+            for comment in comments:
+                self.comments_list_view.controls.append(self._build_comment(comment))
+
+            if not self.comments_list_view.controls:
+                self.content_area.content = ft.Container(
+                    content=ft.Text("No hay comentarios aún."),
+                    alignment=ft.alignment.center
+                )
+                self.update()
+            elif self.content_area.content is not self.comments_list_view:
+                self.content_area.content = self.comments_list_view
+                self.update()
+            else:
+                # Solo se envían los comentarios nuevos de la lista
+                self.comments_list_view.update()
+        finally:
+            self._cargando = False
+
+    def _on_scroll(self, e: ft.OnScrollEvent):
+        if e.max_scroll_extent is not None and e.pixels >= e.max_scroll_extent - MARGEN_CARGA:
+            self._load_next_page()
+
+    def _build_comment(self, comment):
+        raw_date = comment.get('Fecha')
+        date_str = "Fecha desconocida"
+        if raw_date:
+            date_str = str(raw_date).split(' ')[0]
+
+        return ft.Column(
+            [
+                ft.Text(comment['Comentario'], size=16, weight=ft.FontWeight.W_500),
+                ft.Text(date_str, size=12, color=ft.Colors.GREY),
+            ],
+            spacing=4
+        )
 
     def _add_comment(self, e):
-        """Guarda un nuevo comentario y refresca la lista."""
+        """Guarda un nuevo comentario y lo agrega arriba de la lista sin recargarla."""
         comment_text = self.comment_input.value.strip()
         if not comment_text:
             return
@@ -165,4 +210,9 @@ class CommentsWidget(ft.Column):
         )
 
         self.comment_input.value = ""  # Limpiamos el campo de texto
-        self._load_comments()  # Volvemos a cargar los comentarios
\ No newline at end of file
+        self.comments_list_view.controls.insert(0, self._build_comment({
+            'Comentario': comment_text,
+            'Fecha': datetime.datetime.now().strftime('%Y-%m-%d')
+        }))
+        self.content_area.content = self.comments_list_view
+        self.update()
@@ -1,17 +1,18 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 import random
 
 
 class QuizWidget(ft.Column):
-    def __init__(self, page: ft.Page, video_id: str):
+    def __init__(self, page: ft.Page, video_id: str, preguntas: list = None):
         super().__init__(expand=True)
         self.page = page
         self.video_id = video_id
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         # --- Estado del Quiz ---
         self.preguntas = []
+        self._preguntas_precargadas = preguntas
         self.opciones_seleccionadas = {}
         self.quiz_enviado = False
 
@@ -43,15 +44,16 @@ class QuizWidget(ft.Column):
         self._cargar_preguntas()
 
     def _cargar_preguntas(self):
-        preguntas_db = self.db_helper.get_preguntas_por_id_video(self.video_id)
+        if self._preguntas_precargadas is not None:
+            preguntas_db = self._preguntas_precargadas
+        else:
+            preguntas_db = self.db_helper.get_preguntas_por_id_video(self.video_id)
 
-        # Mezclamos las opciones para cada pregunta
+        # Mezclamos las opciones para cada pregunta (registros Pregunta)
         for p in preguntas_db:
-            correcta = p['Opcion_Correcta']
-            opciones = [p['Opcion_A'], p['Opcion_B'], correcta]
+            opciones = [p.opcion_a, p.opcion_b, p.opcion_correcta]
             random.shuffle(opciones)
-            p['opciones_mezcladas'] = opciones
-            p['_respuesta_correcta'] = correcta  # Guardamos la respuesta original
+            p.opciones_mezcladas = opciones
 
         self.preguntas = preguntas_db
         self._build_questions_view()
@@ -65,13 +67,13 @@ class QuizWidget(ft.Column):
         self.questions_column.controls.clear()
         for i, p in enumerate(self.preguntas):
             self.questions_column.controls.append(
-                ft.Text(f"{i + 1}. {p['Pregunta']}", weight=ft.FontWeight.BOLD, size=18)
+                ft.Text(f"{i + 1}. {p.pregunta}", weight=ft.FontWeight.BOLD, size=18)
             )
 
             # Creamos los Radio buttons para las opciones
             opciones_radio = ft.RadioGroup(
                 content=ft.Column([
-                    ft.Radio(value=opt, label=opt) for opt in p['opciones_mezcladas']
+                    ft.Radio(value=opt, label=opt) for opt in p.opciones_mezcladas
                 ]),
                 on_change=lambda e, index=i: self._on_option_selected(index, e.control.value)
             )
@@ -96,7 +98,7 @@ class QuizWidget(ft.Column):
 
         for i, p in enumerate(self.preguntas):
             seleccionada = self.opciones_seleccionadas.get(i)
-            correcta = p['_respuesta_correcta']
+            correcta = p.opcion_correcta
             es_ok = seleccionada == correcta
 
             if es_ok: correctas += 1
@@ -109,7 +111,7 @@ class QuizWidget(ft.Column):
                     border_radius=8,
                     margin=ft.margin.symmetric(vertical=4),
                     content=ft.Column([
-                        ft.Text(f"{i + 1}. {p['Pregunta']}", weight=ft.FontWeight.BOLD),
+                        ft.Text(f"{i + 1}. {p.pregunta}", weight=ft.FontWeight.BOLD),
                         ft.Text(f"Tu respuesta: {seleccionada}"),
                         ft.Text(f"Correcta: {correcta}"),
                     ])
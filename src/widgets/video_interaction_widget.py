@@ -1,22 +1,22 @@
 import flet as ft
-from src.database.database import DatabaseHelper
+from src.database.database import get_database_helper
 from src.widgets.quiz_widget import QuizWidget
-import uuid
 import traceback  # Importamos traceback
 
 
 class VideoInteractionWidget(ft.Row):
-    def __init__(self, page: ft.Page, video_id: str, id_usuario: str):
+    def __init__(self, page: ft.Page, video_id: str, id_usuario: str, precargado: dict = None):
         super().__init__(alignment=ft.MainAxisAlignment.CENTER, spacing=10)
         self.page = page
         self.video_id = video_id
         self.id_usuario = id_usuario
-        self.db_helper = DatabaseHelper()
+        self.db_helper = get_database_helper()
 
         # --- Estado ---
         self.is_liked = False
         self.is_disliked = False
         self.video_data = None
+        self._precargado = precargado
 
         # --- Controles de UI ---
         self.like_count = ft.Text("0")
@@ -60,9 +60,14 @@ class VideoInteractionWidget(ft.Row):
 
     def _init_all(self):
         """Carga todos los datos iniciales y actualiza la UI."""
-        print("--- DEBUG: VideoInteraction._init_all: Obteniendo video y reacción...")
-        self.video_data = self.db_helper.get_video_by_id(self.video_id)
-        user_reaction = self.db_helper.get_user_reaction_for_video(self.video_id, self.id_usuario)
+        if self._precargado and self._precargado.get('video') is not None:
+            print("--- DEBUG: VideoInteraction._init_all: Usando datos precargados...")
+            self.video_data = self._precargado['video']
+            user_reaction = self._precargado.get('reaccion')
+        else:
+            print("--- DEBUG: VideoInteraction._init_all: Obteniendo video y reacción...")
+            self.video_data = self.db_helper.get_video_by_id(self.video_id)
+            user_reaction = self.db_helper.get_user_reaction_for_video(self.video_id, self.id_usuario)
         print(f"--- DEBUG: VideoInteraction._init_all: Video data: {self.video_data}, Reacción: {user_reaction}")
 
         if user_reaction:
@@ -77,26 +82,22 @@ class VideoInteractionWidget(ft.Row):
     def _handle_reaction(self, tipo: str):
         try:
             print(f"--- DEBUG: VideoInteraction._handle_reaction: Tipo: {tipo}")
-            current_reaction = self.db_helper.get_user_reaction_for_video(self.video_id, self.id_usuario)
-            field = 'Cantidad_Likes' if tipo == 'Like' else 'Cantidad_Dislikes'
-
-            if current_reaction == tipo:
-                print("--- DEBUG: Borrando reacción existente.")
-                self.db_helper.delete_reaction(self.video_id, self.id_usuario)
-                self.db_helper.update_video_counter(self.video_id, field, -1)
-            else:
-                if current_reaction:
-                    print("--- DEBUG: Cambiando reacción.")
-                    prev_field = 'Cantidad_Likes' if current_reaction == 'Like' else 'Cantidad_Dislikes'
-                    self.db_helper.delete_reaction(self.video_id, self.id_usuario)
-                    self.db_helper.update_video_counter(self.video_id, prev_field, -1)
-
-                print("--- DEBUG: Insertando nueva reacción.")
-                self.db_helper.insert_reaction(str(uuid.uuid4()), self.video_id, self.id_usuario, tipo)
-                self.db_helper.update_video_counter(self.video_id, field, 1)
-
-            print("--- DEBUG: Refrescando datos post-reacción.")
-            self._init_all()
+            # Una sola transacción: reacción y contadores en el mismo commit
+            nueva_reaccion = self.db_helper.toggle_reaction(self.video_id, self.id_usuario, tipo)
+
+            # Ajustamos los contadores en pantalla sin volver a leer el video
+            if self.video_data:
+                if self.is_liked:
+                    self.video_data['Cantidad_Likes'] = max(0, self.video_data.get('Cantidad_Likes', 0) - 1)
+                if self.is_disliked:
+                    self.video_data['Cantidad_Dislikes'] = max(0, self.video_data.get('Cantidad_Dislikes', 0) - 1)
+                if nueva_reaccion:
+                    campo = 'Cantidad_Likes' if nueva_reaccion == 'Like' else 'Cantidad_Dislikes'
+                    self.video_data[campo] = self.video_data.get(campo, 0) + 1
+
+            self.is_liked = nueva_reaccion == 'Like'
+            self.is_disliked = nueva_reaccion == 'Dislike'
+            self._update_ui()
 
         except Exception as e:
             print(f"\n\n¡¡¡ERROR CATASTRÓFICO EN _handle_reaction!!!")
@@ -128,9 +129,11 @@ class VideoInteractionWidget(ft.Row):
         """Muestra el BottomSheet con el widget del quiz."""
         try:
             print("--- DEBUG: Abriendo quiz sheet...")
+            # Las preguntas precargadas se usan solo la primera vez que se abre el quiz
+            preguntas = self._precargado.pop('preguntas', None) if self._precargado else None
             self.page.bottom_sheet = ft.BottomSheet(
                 ft.Container(
-                    content=QuizWidget(page=self.page, video_id=self.video_id),
+                    content=QuizWidget(page=self.page, video_id=self.video_id, preguntas=preguntas),
                     padding=15,
                     height=self.page.window_height * 0.8  # Ocupa el 80% de la pantalla
                 ),